@@ -0,0 +1,43 @@
+"""best_laps_overall_rows
+
+Revision ID: 0b6f3e8a7d41
+Revises: f2a9d6c4b813
+Create Date: 2026-10-19 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6f3e8a7d41'
+down_revision: Union[str, None] = 'f2a9d6c4b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One '*' row per (configuration, user): their best across all car categories
+    op.execute("""
+        INSERT INTO best_laps (track_configuration_id, user_id, car_category, lap_id, session_id,
+                               car_id, lap_time_ms, top_speed_kmh, session_date)
+        SELECT track_configuration_id, user_id, '*', lap_id, session_id,
+               car_id, lap_time_ms, top_speed_kmh, session_date
+        FROM (
+            SELECT b.*, ROW_NUMBER() OVER (
+                PARTITION BY track_configuration_id, user_id ORDER BY lap_time_ms, lap_id
+            ) AS rn
+            FROM best_laps b
+        ) ranked
+        WHERE rn = 1
+    """)
+    op.drop_index('ix_best_laps_config_time', table_name='best_laps')
+    op.create_index('ix_best_laps_board', 'best_laps',
+                    ['track_configuration_id', 'car_category', 'lap_time_ms', 'user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_best_laps_board', table_name='best_laps')
+    op.create_index('ix_best_laps_config_time', 'best_laps', ['track_configuration_id', 'lap_time_ms'], unique=False)
+    op.execute("DELETE FROM best_laps WHERE car_category = '*'")
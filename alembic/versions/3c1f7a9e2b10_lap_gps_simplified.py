@@ -0,0 +1,51 @@
+"""lap_gps_simplified
+
+Revision ID: 3c1f7a9e2b10
+Revises: 245d6ad9d0d3
+Create Date: 2026-10-19 09:12:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.telemetry.geometry import simplify_levels
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9e2b10'
+down_revision: Union[str, None] = '245d6ad9d0d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 200
+
+
+def upgrade() -> None:
+    op.add_column('laps', sa.Column('gps_simplified', sa.JSON(), nullable=True))
+
+    # Backfill existing laps in id order, a batch at a time
+    laps = sa.table('laps', sa.column('id', sa.Integer), sa.column('gps_track', sa.JSON),
+                    sa.column('gps_simplified', sa.JSON))
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(laps.c.id, laps.c.gps_track)
+            .where(laps.c.id > last_id, laps.c.gps_track.isnot(None))
+            .order_by(laps.c.id)
+            .limit(_BATCH)
+        ).all()
+        if not rows:
+            break
+        for lap_id, gps_track in rows:
+            conn.execute(
+                laps.update().where(laps.c.id == lap_id)
+                .values(gps_simplified=simplify_levels(gps_track))
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_column('laps', 'gps_simplified')
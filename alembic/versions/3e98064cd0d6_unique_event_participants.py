@@ -0,0 +1,38 @@
+"""unique_event_participants
+
+Revision ID: 3e98064cd0d6
+Revises: 7c3e2f9a5b18
+Create Date: 2026-10-20 16:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e98064cd0d6'
+down_revision: Union[str, None] = '7c3e2f9a5b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Racing joins could insert a participant twice; keep the first row and recount
+    op.execute("""
+        DELETE FROM event_participants WHERE id NOT IN (
+            SELECT MIN(id) FROM event_participants GROUP BY event_id, user_id
+        )
+    """)
+    op.execute("""
+        UPDATE events SET participant_count = (
+            SELECT COUNT(*) FROM event_participants WHERE event_participants.event_id = events.id
+        )
+    """)
+    op.drop_index('ix_event_participants_event_user', table_name='event_participants')
+    op.create_index('ix_event_participants_event_user', 'event_participants', ['event_id', 'user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_event_participants_event_user', table_name='event_participants')
+    op.create_index('ix_event_participants_event_user', 'event_participants', ['event_id', 'user_id'], unique=False)
@@ -0,0 +1,35 @@
+"""refresh_token_indexes
+
+Revision ID: 7c3e2f9a5b18
+Revises: d91e4b7c2a60
+Create Date: 2026-10-20 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3e2f9a5b18'
+down_revision: Union[str, None] = 'd91e4b7c2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicates the primary key and costs a write on every login
+    op.drop_index('ix_refresh_tokens_id', table_name='refresh_tokens')
+    # Batches for the sweeper, and the lookup behind deleting a user
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_refresh_tokens_revoked', 'refresh_tokens', ['id'], unique=False,
+                    postgresql_where=sa.text('revoked'), sqlite_where=sa.text('revoked'))
+    op.create_index('ix_refresh_tokens_user_id', 'refresh_tokens', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_refresh_tokens_user_id', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_revoked', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.create_index('ix_refresh_tokens_id', 'refresh_tokens', ['id'], unique=False)
@@ -0,0 +1,97 @@
+"""lap_tracks_table
+
+Revision ID: 8d4e2f6a1c37
+Revises: 3c1f7a9e2b10
+Create Date: 2026-10-19 11:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.telemetry.track_codec import decode_levels, decode_track, encode_levels, encode_track
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2f6a1c37'
+down_revision: Union[str, None] = '3c1f7a9e2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH = 200
+
+laps = sa.table(
+    'laps', sa.column('id', sa.Integer), sa.column('gps_track', sa.JSON), sa.column('gps_simplified', sa.JSON),
+)
+lap_tracks = sa.table(
+    'lap_tracks', sa.column('lap_id', sa.Integer), sa.column('point_count', sa.Integer),
+    sa.column('points', sa.LargeBinary), sa.column('simplified', sa.LargeBinary),
+)
+
+
+def upgrade() -> None:
+    op.create_table('lap_tracks',
+    sa.Column('lap_id', sa.Integer(), nullable=False),
+    sa.Column('point_count', sa.Integer(), nullable=False),
+    sa.Column('points', sa.LargeBinary(), nullable=False),
+    sa.Column('simplified', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['lap_id'], ['laps.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('lap_id')
+    )
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(laps.c.id, laps.c.gps_track, laps.c.gps_simplified)
+            .where(laps.c.id > last_id, laps.c.gps_track.isnot(None))
+            .order_by(laps.c.id)
+            .limit(_BATCH)
+        ).all()
+        if not rows:
+            break
+        values = [
+            {
+                'lap_id': row.id,
+                'point_count': len(row.gps_track),
+                'points': encode_track(row.gps_track),
+                'simplified': encode_levels(row.gps_simplified) if row.gps_simplified else None,
+            }
+            for row in rows if row.gps_track
+        ]
+        if values:
+            conn.execute(lap_tracks.insert(), values)
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('laps') as batch_op:
+        batch_op.drop_column('gps_simplified')
+        batch_op.drop_column('gps_track')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('laps') as batch_op:
+        batch_op.add_column(sa.Column('gps_track', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('gps_simplified', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(lap_tracks.c.lap_id, lap_tracks.c.points, lap_tracks.c.simplified)
+            .where(lap_tracks.c.lap_id > last_id)
+            .order_by(lap_tracks.c.lap_id)
+            .limit(_BATCH)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            conn.execute(
+                laps.update().where(laps.c.id == row.lap_id).values(
+                    gps_track=decode_track(row.points),
+                    gps_simplified=decode_levels(row.simplified) if row.simplified else None,
+                )
+            )
+        last_id = rows[-1].lap_id
+
+    op.drop_table('lap_tracks')
@@ -0,0 +1,59 @@
+"""stats_counters
+
+Revision ID: a4d17c3e9b52
+Revises: 0b6f3e8a7d41
+Create Date: 2026-10-20 09:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d17c3e9b52'
+down_revision: Union[str, None] = '0b6f3e8a7d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'stats_counters',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name', 'shard'),
+    )
+    op.create_table(
+        'stats_daily',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name', 'day'),
+    )
+
+    # Start the counters from the current row counts (shard 0). storage_bytes is
+    # left for POST /admin/stats/recount, which walks the upload directory.
+    op.execute("""
+        INSERT INTO stats_counters (name, shard, value)
+        SELECT 'users', 0, COUNT(*) FROM users
+        UNION ALL SELECT 'sessions', 0, COUNT(*) FROM sessions
+        UNION ALL SELECT 'laps', 0, COUNT(*) FROM laps
+        UNION ALL SELECT 'public_sessions', 0, COUNT(*) FROM sessions WHERE is_public
+        UNION ALL SELECT 'events', 0, COUNT(*) FROM events
+    """)
+    # Session uploads by day; per-lap telemetry uploads have no upload timestamp
+    op.execute("""
+        INSERT INTO stats_daily (name, day, value)
+        SELECT 'uploads', CAST(created_at AT TIME ZONE 'UTC' AS DATE), COUNT(*)
+        FROM sessions
+        WHERE source_file_path IS NOT NULL
+        GROUP BY 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('stats_daily')
+    op.drop_table('stats_counters')
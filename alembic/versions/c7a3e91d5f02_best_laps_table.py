@@ -0,0 +1,66 @@
+"""best_laps_table
+
+Revision ID: c7a3e91d5f02
+Revises: 8d4e2f6a1c37
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a3e91d5f02'
+down_revision: Union[str, None] = '8d4e2f6a1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('best_laps',
+    sa.Column('track_configuration_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('car_category', sa.String(length=64), nullable=False, server_default=''),
+    sa.Column('lap_id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('car_id', sa.Integer(), nullable=True),
+    sa.Column('lap_time_ms', sa.Integer(), nullable=False),
+    sa.Column('top_speed_kmh', sa.Float(), nullable=True),
+    sa.Column('session_date', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['track_configuration_id'], ['track_configurations.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['lap_id'], ['laps.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['car_id'], ['cars.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('track_configuration_id', 'user_id', 'car_category')
+    )
+    op.create_index('ix_best_laps_config_time', 'best_laps', ['track_configuration_id', 'lap_time_ms'], unique=False)
+
+    # Backfill: fastest public, valid, timed lap per (configuration, user, car category)
+    op.execute("""
+        INSERT INTO best_laps (track_configuration_id, user_id, car_category, lap_id, session_id,
+                               car_id, lap_time_ms, top_speed_kmh, session_date)
+        SELECT track_configuration_id, user_id, car_category, lap_id, session_id,
+               car_id, lap_time_ms, max_speed_kmh, date
+        FROM (
+            SELECT s.track_configuration_id, s.user_id, COALESCE(c.category, '') AS car_category,
+                   l.id AS lap_id, s.id AS session_id, s.car_id, l.lap_time_ms, l.max_speed_kmh, s.date,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY s.track_configuration_id, s.user_id, COALESCE(c.category, '')
+                       ORDER BY l.lap_time_ms, l.id
+                   ) AS rn
+            FROM laps l
+            JOIN sessions s ON s.id = l.session_id
+            LEFT JOIN cars c ON c.id = s.car_id
+            WHERE s.is_public AND l.is_valid AND NOT l.is_outlap AND NOT l.is_inlap
+              AND l.lap_time_ms IS NOT NULL
+        ) ranked
+        WHERE rn = 1
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_best_laps_config_time', table_name='best_laps')
+    op.drop_table('best_laps')
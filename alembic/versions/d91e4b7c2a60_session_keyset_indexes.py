@@ -0,0 +1,37 @@
+"""session_keyset_indexes
+
+Revision ID: d91e4b7c2a60
+Revises: a4d17c3e9b52
+Create Date: 2026-10-20 11:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd91e4b7c2a60'
+down_revision: Union[str, None] = 'a4d17c3e9b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Session listings page by (date, id) descending
+    op.drop_index('ix_sessions_user_date', table_name='sessions')
+    op.create_index('ix_sessions_user_date', 'sessions', ['user_id', 'date', 'id'], unique=False)
+    op.drop_index('ix_sessions_public_date', table_name='sessions')
+    op.create_index('ix_sessions_public_date', 'sessions', ['date', 'id'], unique=False,
+                    postgresql_where=sa.text('is_public'), sqlite_where=sa.text('is_public'))
+    op.create_index('ix_sessions_date', 'sessions', ['date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sessions_date', table_name='sessions')
+    op.drop_index('ix_sessions_public_date', table_name='sessions')
+    op.create_index('ix_sessions_public_date', 'sessions', ['date'], unique=False,
+                    postgresql_where=sa.text('is_public'), sqlite_where=sa.text('is_public'))
+    op.drop_index('ix_sessions_user_date', table_name='sessions')
+    op.create_index('ix_sessions_user_date', 'sessions', ['user_id', 'date'], unique=False)
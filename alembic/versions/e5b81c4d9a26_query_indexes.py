@@ -0,0 +1,52 @@
+"""query_indexes
+
+Revision ID: e5b81c4d9a26
+Revises: c7a3e91d5f02
+Create Date: 2026-10-19 16:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b81c4d9a26'
+down_revision: Union[str, None] = 'c7a3e91d5f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TIMED = "is_valid AND NOT is_outlap AND NOT is_inlap AND lap_time_ms IS NOT NULL"
+
+# (name, table, columns, partial predicate)
+_INDEXES = [
+    ('ix_laps_session_lap_number', 'laps', ['session_id', 'lap_number'], None),
+    ('ix_laps_timed', 'laps', ['session_id', 'lap_time_ms'], _TIMED),
+    ('ix_sessions_user_date', 'sessions', ['user_id', 'date'], None),
+    ('ix_sessions_public_config', 'sessions', ['track_configuration_id', 'user_id'], "is_public"),
+    ('ix_sessions_public_date', 'sessions', ['date'], "is_public"),
+    ('ix_sessions_event_id', 'sessions', ['event_id'], "event_id IS NOT NULL"),
+    ('ix_sessions_car_id', 'sessions', ['car_id'], "car_id IS NOT NULL"),
+    ('ix_events_public_date', 'events', ['date_start'], "is_public"),
+    ('ix_event_participants_event_user', 'event_participants', ['event_id', 'user_id'], None),
+    ('ix_best_laps_user', 'best_laps', ['user_id'], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY on Postgres so live tables stay writable; it cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in _INDEXES:
+            predicate = sa.text(where) if where else None
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_where=predicate, sqlite_where=predicate,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,40 @@
+"""event_participant_count
+
+Revision ID: f2a9d6c4b813
+Revises: e5b81c4d9a26
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a9d6c4b813'
+down_revision: Union[str, None] = 'e5b81c4d9a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('events', sa.Column('participant_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE events SET participant_count = (
+            SELECT COUNT(*) FROM event_participants WHERE event_participants.event_id = events.id
+        )
+    """)
+
+    # Keyset pagination orders by (date_start, id)
+    op.drop_index('ix_events_public_date', table_name='events')
+    op.create_index('ix_events_public_date', 'events', ['date_start', 'id'], unique=False,
+                    postgresql_where=sa.text('is_public'), sqlite_where=sa.text('is_public'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_public_date', table_name='events')
+    op.create_index('ix_events_public_date', 'events', ['date_start'], unique=False,
+                    postgresql_where=sa.text('is_public'), sqlite_where=sa.text('is_public'))
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('participant_count')
@@ -1,20 +1,65 @@
-from fastapi import Depends, HTTPException, status, Cookie
+import json
+import math
+from contextlib import contextmanager
+from datetime import datetime
+
+from fastapi import Depends, HTTPException, Request, status, Cookie
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.config import get_settings
 from app.core.security import decode_token
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.user import TokenPayload
+from app.services.compute import ComputeBusy, ComputeTimeout
+from app.services.rate_limit import rate_limiter
+from app.services.response_cache import principal_tag, response_cache
+
+settings = get_settings()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=False)
 
+# User columns kept in the cached principal; credentials and lockout state stay in the database
+_PRINCIPAL_COLUMNS = ("id", "username", "email", "full_name", "is_active", "is_superuser", "created_at")
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> User | None:
+    """The active user `user_id`, or None; cached for PRINCIPAL_CACHE_TTL_S.
+
+    Code that changes a user's columns above must call
+    invalidate_on_commit(db, principal_tag(user_id)).
+    """
+    async def load() -> dict | None:
+        user = await db.get(User, user_id)
+        if user is None or not user.is_active:
+            return None
+        return {column: getattr(user, column) for column in _PRINCIPAL_COLUMNS}
+
+    body, _ = await response_cache.get_or_compute(
+        "principal", {"user_id": user_id}, (principal_tag(user_id),), load, ttl_s=settings.principal_cache_ttl_s,
+    )
+    fields = json.loads(body)
+    if fields is None:
+        return None
+    if fields["created_at"] is not None:
+        fields["created_at"] = datetime.fromisoformat(fields["created_at"])
+    user = User(**fields)
+    make_transient_to_detached(user)  # other columns raise instead of reading as None
+    return user
+
 
-def get_current_user(
+async def get_current_user(
     token: str | None = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
+    """The authenticated user, from the principal cache or the async session.
+
+    The instance is detached and carries only the cached columns: endpoints
+    that modify the user must re-fetch it on their own session.
+    """
     credentials_exc = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,27 +73,65 @@ def get_current_user(
     except (JWTError, KeyError):
         raise credentials_exc
 
-    user = db.get(User, int(token_data.sub))
-    if user is None or not user.is_active:
+    user = await load_principal(db, int(token_data.sub))
+    if user is None:
         raise credentials_exc
     return user
 
 
-def get_optional_user(
+async def get_optional_user(
     token: str | None = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User | None:
     if not token:
         return None
     try:
         payload = decode_token(token)
-        user = db.get(User, int(payload["sub"]))
-        return user if user and user.is_active else None
+        return await load_principal(db, int(payload["sub"]))
     except Exception:
         return None
 
 
-def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_superuser(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     return current_user
+
+
+def rate_limit(route: str):
+    """Dependency taking a token from the caller's `route` bucket (see RATE_LIMITS); 429 when it is empty.
+
+    The caller is the bearer token's user, or the client IP without a valid
+    token. Only the signature is checked, so this runs before any DB lookup.
+    """
+    async def check(request: Request, token: str | None = Depends(oauth2_scheme)) -> None:
+        subject = f"ip:{request.client.host if request.client else 'unknown'}"
+        if token:
+            try:
+                subject = f"user:{decode_token(token)['sub']}"
+            except (JWTError, KeyError):
+                pass
+        wait = await rate_limiter.hit(route, subject)
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, slow down",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    return check
+
+
+@contextmanager
+def password_backpressure():
+    """Map a saturated or stalled password pool (app/services/passwords.py) to HTTP errors."""
+    try:
+        yield
+    except ComputeBusy as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, try again shortly",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except ComputeTimeout:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Password check timed out")
@@ -0,0 +1,45 @@
+"""
+Opaque keyset cursors for list endpoints.
+
+A cursor encodes the sort key of the last row on a page; the next page is every
+row strictly after it in the same order, so deep pages cost the same as the
+first. Endpoints returning a JSON list send the next cursor in the
+X-Next-Cursor header; endpoints returning an object put it in `next_cursor`.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable
+
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode `cursor` into len(types) values converted by `types`; 400 if it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return tuple(datetime.fromisoformat(v) if t is datetime else t(v) for t, v in zip(types, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(rows: list, limit: int, key: Callable[[Any], tuple]) -> tuple[list, str | None]:
+    """Trim a `limit + 1` fetch to one page and build the cursor for the next one."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def set_next_cursor(response: Response, cursor: str | None) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_superuser
-from app.database import get_db
-from app.models.lap import Lap
+from app.api.pagination import decode_cursor, paginate, set_next_cursor
+from app.database import async_engine, engine, get_db, pool_metrics, read_replicas
+from app.models.best_lap import BestLap
 from app.models.session import Session as SessionModel
 from app.models.track import Track
 from app.models.user import User
 from app.models.event import Event
+from app.services import passwords, stats
+from app.services.compute import compute_executor
+from app.services.leaderboard import refresh_best_laps
+from app.services.response_cache import LEADERBOARD_TAG, TRACKS_TAG, board_tag, invalidate_on_commit, principal_tag
+from app.services.session_listing import cursor_key, lap_aggregates_query, summaries_query, with_lap_aggregates
 from app.services.storage import delete_file
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -15,21 +22,47 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 @router.get("/dashboard")
 def dashboard(db: Session = Depends(get_db), _: User = Depends(get_current_superuser)):
-    return {
-        "users": db.query(User).count(),
-        "sessions": db.query(SessionModel).count(),
-        "laps": db.query(Lap).count(),
-        "public_sessions": db.query(SessionModel).filter(SessionModel.is_public == True).count(),  # noqa: E712
-        "events": db.query(Event).count(),
-    }
+    return stats.snapshot(db)
+
+
+@router.post("/stats/recount")
+def recount_stats(db: Session = Depends(get_db), _: User = Depends(get_current_superuser)):
+    """Rebuild the dashboard counters from full table scans; for repairing drift, not routine use."""
+    totals = stats.recount(db)
+    db.commit()
+    return totals
+
+
+@router.get("/metrics/db")
+async def db_metrics(_: User = Depends(get_current_superuser)):
+    """Connection pool usage and checkout waits for this worker process."""
+    pools = {"sync": engine.pool, "async": async_engine.pool}
+    pools.update((r.name, r.engine.pool) for r in read_replicas.replicas)
+    return {name: pool_metrics[name].snapshot(pool) for name, pool in pools.items()}
+
+
+@router.get("/metrics/executors")
+async def executor_metrics(_: User = Depends(get_current_superuser)):
+    """Queue depth, rejections and latency of the bounded worker pools in this process."""
+    return {"compute": compute_executor.snapshot(), "password": passwords.snapshot()}
 
 
 @router.get("/users")
-def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), _: User = Depends(get_current_superuser)):
-    users = db.query(User).offset(skip).limit(limit).all()
-    return [{"id": u.id, "username": u.username, "email": u.email,
-             "is_active": u.is_active, "is_superuser": u.is_superuser,
-             "created_at": u.created_at} for u in users]
+def list_users(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_superuser),
+):
+    """Newest first, keyed on id; the next page's cursor is in X-Next-Cursor."""
+    query = select(User.id, User.username, User.email, User.is_active, User.is_superuser, User.created_at)
+    if cursor:
+        query = query.where(User.id < decode_cursor(cursor, int)[0])
+    rows = db.execute(query.order_by(User.id.desc()).limit(limit + 1)).all()
+    rows, next_cursor = paginate(rows, limit, key=lambda u: (u.id,))
+    set_next_cursor(response, next_cursor)
+    return [row._asdict() for row in rows]
 
 
 @router.delete("/users/{user_id}", status_code=204)
@@ -39,6 +72,9 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current: User = Dep
         raise HTTPException(status_code=404, detail="User not found")
     if user.id == current.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
+    boards = db.query(BestLap.track_configuration_id).filter(BestLap.user_id == user.id).distinct()
+    invalidate_on_commit(db, LEADERBOARD_TAG, principal_tag(user.id), *(board_tag(cid) for (cid,) in boards))
+    db.query(BestLap).filter(BestLap.user_id == user.id).delete()
     db.delete(user)
     db.commit()
 
@@ -51,15 +87,25 @@ def deactivate_user(user_id: int, db: Session = Depends(get_db), current: User =
     if user.id == current.id:
         raise HTTPException(status_code=400, detail="Cannot deactivate yourself")
     user.is_active = False
+    invalidate_on_commit(db, principal_tag(user.id))
     db.commit()
     return {"ok": True}
 
 
 @router.get("/sessions")
-def list_sessions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), _: User = Depends(get_current_superuser)):
-    sessions = db.query(SessionModel).order_by(SessionModel.created_at.desc()).offset(skip).limit(limit).all()
-    return [{"id": s.id, "user_id": s.user_id, "is_public": s.is_public,
-             "date": s.date, "app_source": s.app_source, "vehicle_hint": s.vehicle_hint} for s in sessions]
+def list_sessions(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_superuser),
+):
+    """All sessions by date, newest first; the next page's cursor is in X-Next-Cursor."""
+    rows = db.execute(summaries_query(cursor=cursor, limit=limit)).all()
+    rows, next_cursor = paginate(rows, limit, key=cursor_key)
+    set_next_cursor(response, next_cursor)
+    aggregates = db.execute(lap_aggregates_query([r.id for r in rows])).all() if rows else []
+    return with_lap_aggregates(rows, aggregates)
 
 
 @router.delete("/sessions/{session_id}", status_code=204)
@@ -68,8 +114,9 @@ def delete_session(session_id: int, db: Session = Depends(get_db), _: User = Dep
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     if session.source_file_path:
-        delete_file(session.source_file_path)
+        stats.add(db, stats.STORAGE_BYTES, -delete_file(session.source_file_path))
     db.delete(session)
+    refresh_best_laps(db, session.user_id, session.track_configuration_id)
     db.commit()
 
 
@@ -103,5 +150,6 @@ def update_track(track_id: int, payload: dict, db: Session = Depends(get_db), _:
     for field in ("name", "country", "city"):
         if field in payload:
             setattr(track, field, payload[field])
+    invalidate_on_commit(db, TRACKS_TAG)
     db.commit()
     return {"ok": True}
@@ -6,19 +6,22 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from itsdangerous import URLSafeTimedSerializer, BadSignature
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
+from app.api.deps import password_backpressure, rate_limit
 from app.core.security import (
     create_access_token, create_admin_token,
-    generate_refresh_token, hash_refresh_token,
-    hash_password, verify_password, generate_oauth_state,
+    generate_refresh_token, hash_refresh_token, generate_oauth_state,
 )
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.oauth_account import OAuthAccount
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserOut
+from app.services.passwords import hash_password, verify_password
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 settings = get_settings()
@@ -45,55 +48,75 @@ OAUTH_PROVIDERS = {
 
 # ── Local auth ──────────────────────────────────────────────────────────────
 
+# Password endpoints are async: while bcrypt runs on the password pool they hold
+# no thread, so a burst of sign-ins cannot starve FastAPI's shared thread pool.
+
 @router.post("/register", response_model=UserOut, status_code=201)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == payload.email).first():
+async def register(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    if await db.scalar(select(User.id).where(User.email == payload.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
-    if db.query(User).filter(User.username == payload.username).first():
+    if await db.scalar(select(User.id).where(User.username == payload.username)):
         raise HTTPException(status_code=400, detail="Username already taken")
+    with password_backpressure():
+        hashed = await hash_password(payload.password)
     user = User(
         username=payload.username,
         email=payload.email,
         full_name=payload.full_name,
-        hashed_password=hash_password(payload.password),
+        hashed_password=hashed,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
-@router.post("/login", response_model=Token)
-def login(response: Response, form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form.username).first()
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("login"))])
+async def login(
+    response: Response, form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db),
+):
+    user = await db.scalar(select(User).where(User.username == form.username))
     _check_lockout(user)
-    if not user or not user.hashed_password or not verify_password(form.password, user.hashed_password):
-        _record_failed_attempt(db, user)
+    if not user or not user.hashed_password or not await _password_matches(form.password, user.hashed_password):
+        await _record_failed_attempt(db, user)
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    _reset_failed_attempts(db, user)
-    access_token = create_access_token(user.id)
-    refresh = _issue_refresh_token(db, user)
-    response.set_cookie("refresh_token", refresh, httponly=True, secure=False, samesite="lax",
-                        max_age=settings.refresh_token_expire_days * 86400)
-    return Token(access_token=access_token)
+    _reset_failed_attempts(user)
+    refresh, token_row = _new_refresh_token(user.id)
+    db.add(token_row)
+    await db.commit()
+    _set_refresh_cookie(response, refresh)
+    return Token(access_token=create_access_token(user.id))
 
 
 @router.post("/refresh", response_model=Token)
-def refresh_access_token(request: Request, db: Session = Depends(get_db)):
+def refresh_access_token(request: Request, response: Response, db: Session = Depends(get_db)):
+    """Exchange the refresh cookie for an access token and a new refresh token.
+
+    The old token is revoked by the same UPDATE that validates it, so a token
+    can be redeemed once even when two refreshes race.
+    """
     raw = request.cookies.get("refresh_token")
     if not raw:
         raise HTTPException(status_code=401, detail="No refresh token")
-    token_hash = hash_refresh_token(raw)
-    rt = db.query(RefreshToken).filter(
-        RefreshToken.token_hash == token_hash,
-        RefreshToken.revoked == False,  # noqa: E712
-        RefreshToken.expires_at > datetime.now(timezone.utc),
-    ).first()
-    if not rt:
+    user_id = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == hash_refresh_token(raw),
+            RefreshToken.revoked == False,  # noqa: E712
+            RefreshToken.expires_at > datetime.now(timezone.utc),
+        )
+        .values(revoked=True)
+        .returning(RefreshToken.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    if user_id is None:
+        db.rollback()
         raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
-    return Token(access_token=create_access_token(rt.user_id))
+    refresh = _issue_refresh_token(db, user_id)
+    _set_refresh_cookie(response, refresh)
+    return Token(access_token=create_access_token(user_id))
 
 
 @router.post("/logout")
@@ -111,16 +134,17 @@ def logout(request: Request, response: Response, db: Session = Depends(get_db)):
 
 # ── Admin-only login ────────────────────────────────────────────────────────
 
-@router.post("/admin/login", response_model=Token)
-def admin_login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form.username).first()
+@router.post("/admin/login", response_model=Token, dependencies=[Depends(rate_limit("login"))])
+async def admin_login(form: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(User).where(User.username == form.username))
     _check_lockout(user)
     if (not user or not user.hashed_password
-            or not verify_password(form.password, user.hashed_password)
+            or not await _password_matches(form.password, user.hashed_password)
             or not user.is_superuser):
-        _record_failed_attempt(db, user)
+        await _record_failed_attempt(db, user)
         raise HTTPException(status_code=403, detail="Admin access denied")
-    _reset_failed_attempts(db, user)
+    _reset_failed_attempts(user)
+    await db.commit()
     return Token(access_token=create_admin_token(user.id))
 
 
@@ -186,7 +210,7 @@ async def oauth_callback(provider: str, request: Request, response: Response, db
         raise HTTPException(status_code=403, detail="Admin accounts must use password login")
 
     access_token = create_access_token(user.id, auth_method="oauth")
-    refresh = _issue_refresh_token(db, user)
+    refresh = _issue_refresh_token(db, user.id)
     html = f"""<!doctype html><html><head><title>Logging in…</title></head><body>
 <script>
   localStorage.setItem('access_token', '{access_token}');
@@ -206,32 +230,48 @@ def _get_provider(provider: str) -> dict:
     return OAUTH_PROVIDERS[provider]
 
 
-def _issue_refresh_token(db: Session, user: User) -> str:
+async def _password_matches(plain: str, hashed: str) -> bool:
+    with password_backpressure():
+        return await verify_password(plain, hashed)
+
+
+def _new_refresh_token(user_id: int) -> tuple[str, RefreshToken]:
+    """A raw refresh token and the row storing its hash, for the caller to add."""
     raw = generate_refresh_token()
     expires = datetime.now(timezone.utc) + timedelta(days=settings.refresh_token_expire_days)
-    db.add(RefreshToken(user_id=user.id, token_hash=hash_refresh_token(raw), expires_at=expires))
+    return raw, RefreshToken(user_id=user_id, token_hash=hash_refresh_token(raw), expires_at=expires)
+
+
+def _issue_refresh_token(db: Session, user_id: int) -> str:
+    raw, token_row = _new_refresh_token(user_id)
+    db.add(token_row)
     db.commit()
     return raw
 
 
+def _set_refresh_cookie(response: Response, raw: str) -> None:
+    response.set_cookie("refresh_token", raw, httponly=True, secure=False, samesite="lax",
+                        max_age=settings.refresh_token_expire_days * 86400)
+
+
 def _check_lockout(user: User | None):
     if user and user.locked_until and user.locked_until > datetime.now(timezone.utc):
         raise HTTPException(status_code=429, detail="Account temporarily locked. Try again later.")
 
 
-def _record_failed_attempt(db: Session, user: User | None):
+async def _record_failed_attempt(db: AsyncSession, user: User | None):
     if not user:
         return
     user.failed_login_attempts += 1
     if user.failed_login_attempts >= 5:
         user.locked_until = datetime.now(timezone.utc) + timedelta(minutes=15)
-    db.commit()
+    await db.commit()
 
 
-def _reset_failed_attempts(db: Session, user: User):
+def _reset_failed_attempts(user: User):
+    """Clear the lockout counters; committed with the caller's session."""
     user.failed_login_attempts = 0
     user.locked_until = None
-    db.commit()
 
 
 def _make_username(db: Session, base: str) -> str:
@@ -1,21 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.car import Car
 from app.models.user import User
 from app.schemas.car import CarCreate, CarOut, CarUpdate
+from app.services.leaderboard import refresh_best_laps, refresh_best_laps_for_car
 
 router = APIRouter(prefix="/cars", tags=["cars"])
 
 
 @router.get("/", response_model=list[CarOut])
-def list_my_cars(
-    db: Session = Depends(get_db),
+async def list_my_cars(
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    return db.query(Car).filter(Car.owner_id == current_user.id).all()
+    return (await db.scalars(select(Car).filter(Car.owner_id == current_user.id))).all()
 
 
 @router.post("/", response_model=CarOut, status_code=201)
@@ -41,8 +44,11 @@ def update_car(
     car = db.get(Car, car_id)
     if not car or car.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="Car not found")
-    for field, value in payload.model_dump(exclude_none=True).items():
+    updates = payload.model_dump(exclude_none=True)
+    for field, value in updates.items():
         setattr(car, field, value)
+    if "category" in updates:
+        refresh_best_laps_for_car(db, car.id)
     db.commit()
     db.refresh(car)
     return car
@@ -57,5 +63,11 @@ def delete_car(
     car = db.get(Car, car_id)
     if not car or car.owner_id != current_user.id:
         raise HTTPException(status_code=404, detail="Car not found")
+    # Its sessions stay, uncategorised; re-file their best laps before the car goes
+    pairs = {(s.user_id, s.track_configuration_id) for s in car.sessions}
+    for session in car.sessions:
+        session.car_id = None
+    for user_id, configuration_id in pairs:
+        refresh_best_laps(db, user_id, configuration_id)
     db.delete(car)
     db.commit()
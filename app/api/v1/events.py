@@ -1,10 +1,15 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DbSession
 
 from app.api.deps import get_current_user, get_optional_user
-from app.database import get_db
+from app.api.pagination import decode_cursor, paginate, set_next_cursor
+from app.database import get_db, get_read_db
 from app.models.event import Event, EventParticipant, EventStatus
+from app.models.lap import Lap
 from app.models.session import Session
 from app.models.user import User
 
@@ -12,24 +17,50 @@ router = APIRouter(prefix="/events", tags=["events"])
 
 
 @router.get("/")
-def list_events(db: DbSession = Depends(get_db)):
-    events = (
-        db.query(Event)
-        .filter(Event.is_public == True, Event.status != EventStatus.completed)  # noqa: E712
-        .order_by(Event.date_start)
-        .all()
-    )
-    return [_event_summary(e, db) for e in events]
+async def list_events(
+    response: Response,
+    status: EventStatus | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Public events by start date. Without `status`, completed events are hidden.
+
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    query = select(Event).filter(Event.is_public == True)  # noqa: E712
+    if status is not None:
+        query = query.filter(Event.status == status)
+    else:
+        query = query.filter(Event.status != EventStatus.completed)
+    if date_from is not None:
+        query = query.filter(Event.date_start >= date_from)
+    if date_to is not None:
+        query = query.filter(Event.date_start < date_to)
+    if cursor:
+        after = decode_cursor(cursor, datetime, int)
+        query = query.filter(tuple_(Event.date_start, Event.id) > after)
+    events = (await db.scalars(query.order_by(Event.date_start, Event.id).limit(limit + 1))).all()
+
+    events, next_cursor = paginate(events, limit, key=lambda e: (e.date_start, e.id))
+    set_next_cursor(response, next_cursor)
+    return [_event_summary(e) for e in events]
 
 
 @router.get("/{event_id}")
-def get_event(event_id: int, db: DbSession = Depends(get_db), current_user: User | None = Depends(get_optional_user)):
-    event = db.get(Event, event_id)
+async def get_event(
+    event_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User | None = Depends(get_optional_user),
+):
+    event = await db.get(Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     if not event.is_public and (not current_user or current_user.id != event.organizer_id):
         raise HTTPException(status_code=403, detail="Access denied")
-    return _event_detail(event, db)
+    return await _event_detail(event, db)
 
 
 @router.post("/", status_code=201)
@@ -63,10 +94,17 @@ def join_event(event_id: int, db: DbSession = Depends(get_db), current_user: Use
         raise HTTPException(status_code=403, detail="Event is invite-only")
     if event.status == EventStatus.completed:
         raise HTTPException(status_code=400, detail="Event has ended")
-    existing = db.query(EventParticipant).filter_by(event_id=event_id, user_id=current_user.id).first()
-    if existing:
-        return {"ok": True, "already_joined": True}
+    # The unique (event_id, user_id) index settles concurrent joins by the same user
     db.add(EventParticipant(event_id=event_id, user_id=current_user.id))
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return {"ok": True, "already_joined": True}
+    # Increment in SQL so concurrent joins don't lose updates
+    db.query(Event).filter(Event.id == event_id).update(
+        {Event.participant_count: Event.participant_count + 1}, synchronize_session=False,
+    )
     db.commit()
     return {"ok": True}
 
@@ -86,8 +124,7 @@ def update_event_status(
     return {"ok": True}
 
 
-def _event_summary(event: Event, db: DbSession) -> dict:
-    participant_count = db.query(EventParticipant).filter_by(event_id=event.id).count()
+def _event_summary(event: Event) -> dict:
     return {
         "id": event.id,
         "name": event.name,
@@ -95,17 +132,14 @@ def _event_summary(event: Event, db: DbSession) -> dict:
         "date_start": event.date_start,
         "date_end": event.date_end,
         "is_open": event.is_open,
-        "participant_count": participant_count,
+        "participant_count": event.participant_count,
         "track_configuration_id": event.track_configuration_id,
     }
 
 
-def _event_detail(event: Event, db: DbSession) -> dict:
-    from app.models.lap import Lap
-    from sqlalchemy import func
-
-    leaderboard = (
-        db.query(
+async def _event_detail(event: Event, db: AsyncSession) -> dict:
+    leaderboard = await db.execute(
+        select(
             User.username,
             func.min(Lap.lap_time_ms).label("best_ms"),
         )
@@ -120,11 +154,10 @@ def _event_detail(event: Event, db: DbSession) -> dict:
         )
         .group_by(User.username)
         .order_by(func.min(Lap.lap_time_ms))
-        .all()
     )
 
     return {
-        **_event_summary(event, db),
+        **_event_summary(event),
         "description": event.description,
         "leaderboard": [
             {"rank": i + 1, "username": r.username, "best_lap_display": _fmt(r.best_ms)}
@@ -1,19 +1,32 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
-from sqlalchemy.orm import Session as DbSession
+from typing import Literal
 
-from app.api.deps import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session as DbSession, selectinload
+
+from app.api.deps import get_current_user, rate_limit
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.lap import Lap
+from app.models.lap_track import LapTrack
 from app.models.session import Session
 from app.models.user import User
 from app.schemas.lap import LapCreate, LapOut, LapCompareRequest
-from app.schemas.telemetry import CompareResult, TelemetryData, TelemetryChannel
-from app.services.storage import save_telemetry_file
-from app.services.telemetry.parser import parse
+from app.schemas.telemetry import CompareResult, TelemetryData, TelemetryLod
+from app.services.compute import ComputeBusy, ComputeTimeout, compute_executor
+from app.services.http_cache import (
+    body_cache, body_response, cache_headers, etag_matches, not_modified, render, telemetry_etag,
+)
+from app.services import stats
+from app.services.leaderboard import refresh_best_laps
+from app.services.storage import pyramid_dir, save_telemetry_file
 from app.services.telemetry.processor import extract_lap_summary
-from app.services.telemetry.comparator import compare_laps, speed_to_distance_m
+from app.services.telemetry.comparator import compare_laps
+from app.services.telemetry.lap_telemetry import LapRef, TelemetryQuery, build_lap_telemetry
+from app.services.telemetry.pyramid import build_lap_pyramid, read_pyramid
 
 router = APIRouter(prefix="/laps", tags=["laps"])
 settings = get_settings()
@@ -27,80 +40,204 @@ def _assert_session_access(session: Session | None, user: User) -> Session:
     return session
 
 
+async def _get_lap(
+    db: AsyncSession, lap_id: int, user: User, gps_tolerance_m: float | None = None,
+    with_track: bool = True, detail: str = "Lap not found",
+) -> Lap:
+    """The lap, by default with its GPS track eager-loaded for LapRef, after checking access.
+
+    The full-rate points are deferred; they are loaded up front only when no
+    tolerance asks for a simplified level.
+    """
+    options = []
+    if with_track:
+        load_track = selectinload(Lap.track)
+        options.append(load_track if gps_tolerance_m else load_track.undefer(LapTrack.points))
+    lap = await db.get(Lap, lap_id, options=options)
+    if not lap:
+        raise HTTPException(status_code=404, detail=detail)
+    _assert_session_access(await db.get(Session, lap.session_id), user)
+    return lap
+
+
+async def _lap_ref(db: AsyncSession, lap: Lap, gps_tolerance_m: float | None = None) -> LapRef:
+    """LapRef.from_lap under run_sync, so a fallback to the deferred points loads without blocking."""
+    return await db.run_sync(lambda _: LapRef.from_lap(lap, gps_tolerance_m))
+
+
+async def _run_compute(fn, *args):
+    """Run CPU-bound telemetry work off the event loop, mapping backpressure to HTTP."""
+    try:
+        return await compute_executor.run(fn, *args)
+    except ComputeBusy as exc:
+        raise HTTPException(
+            status_code=503,
+            detail="Telemetry workers are busy, try again shortly",
+            headers={"Retry-After": str(exc.retry_after)},
+        )
+    except ComputeTimeout:
+        raise HTTPException(status_code=504, detail="Telemetry processing timed out")
+
+
+async def _serve_immutable(request: Request, etag: str, fn, *args) -> Response:
+    """304 on a matching If-None-Match, else a cached or freshly rendered compressed body."""
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    body = body_cache.get(etag)
+    if body is None:
+        body = await _run_compute(render, fn, *args)
+        body_cache.put(etag, body)
+    return body_response(request, etag, body)
+
+
 @router.get("/session/{session_id}", response_model=list[LapOut])
-def list_laps(
+async def list_laps(
     session_id: int,
-    db: DbSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    session = db.get(Session, session_id)
+    session = await db.get(Session, session_id)
     _assert_session_access(session, current_user)
-    return (
-        db.query(Lap)
+    laps = await db.scalars(
+        select(Lap)
         .filter(Lap.session_id == session_id)
         .order_by(Lap.lap_number)
-        .all()
     )
+    return laps.all()
 
 
-@router.get("/{lap_id}/telemetry", response_model=TelemetryData)
-def get_lap_telemetry(
+@router.get("/{lap_id}/telemetry", response_model=TelemetryData, dependencies=[Depends(rate_limit("telemetry"))])
+async def get_lap_telemetry(
     lap_id: int,
-    db: DbSession = Depends(get_db),
+    request: Request,
+    channels: list[str] | None = Query(None, description="Channel names; repeat or comma-separate"),
+    start: float | None = Query(None, description="Window start on `axis`"),
+    end: float | None = Query(None, description="Window end on `axis`"),
+    axis: Literal["time", "distance"] = "time",
+    points: int | None = Query(None, ge=2, le=20000, description="Target samples per channel"),
+    include_gps: bool = True,
+    include_distance: bool = True,
+    gps_tolerance_m: float | None = Query(None, gt=0, description="Simplify gps_track to this tolerance (m)"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    lap = db.get(Lap, lap_id)
-    if not lap:
-        raise HTTPException(status_code=404, detail="Lap not found")
-    _assert_session_access(db.get(Session, lap.session_id), current_user)
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="Window start must not exceed end")
+    lap = await _get_lap(db, lap_id, current_user, gps_tolerance_m)
 
     if not lap.telemetry_file_path or not lap.telemetry_format:
         raise HTTPException(status_code=404, detail="No telemetry data for this lap")
 
-    all_laps = parse(lap.telemetry_file_path, lap.telemetry_format)
-    lap_data = next((d for d in all_laps if d["lap_number"] == lap.lap_number), None)
-    if not lap_data and all_laps:
-        lap_data = all_laps[0]
-    if not lap_data:
+    query = TelemetryQuery(
+        channels=tuple(c for item in channels for c in item.split(",") if c) if channels else None,
+        start=start,
+        end=end,
+        axis=axis,
+        points=points,
+        include_gps=include_gps,
+        include_distance=include_distance,
+    )
+    try:
+        return await _serve_immutable(
+            request, telemetry_etag([lap], query, gps_tolerance_m),
+            build_lap_telemetry, await _lap_ref(db, lap, gps_tolerance_m), query,
+        )
+    except LookupError:
         raise HTTPException(status_code=404, detail="Lap not found in telemetry file")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    channels = [
-        TelemetryChannel(
-            name=name,
-            unit=ch.get("unit"),
-            data=ch["data"],
-            timestamps=ch["timestamps"],
-        )
-        for name, ch in lap_data["channels"].items()
-    ]
-
-    # Compute cumulative distance from speed_gps (or speed_obd)
-    speed_ch = (lap_data["channels"].get("speed_gps")
-                or lap_data["channels"].get("speed_obd"))
-    distance_m: list[float] | None = None
-    if speed_ch and speed_ch.get("data") and speed_ch.get("timestamps"):
-        distance_m = speed_to_distance_m(speed_ch["timestamps"], speed_ch["data"])
-
-    return TelemetryData(
-        lap_id=lap.id,
-        lap_time_ms=lap.lap_time_ms,
-        sample_rate_hz=lap_data.get("sample_rate_hz"),
-        channels=channels,
-        gps_track=lap.gps_track or lap_data.get("gps_track"),
-        distance_m=distance_m,
-    )
+
+@router.get("/{lap_id}/lod", response_model=TelemetryLod)
+async def get_lap_lod(
+    lap_id: int,
+    request: Request,
+    response: Response,
+    channels: list[str] | None = Query(None, description="Channel names; repeat or comma-separate"),
+    start: float | None = Query(None, description="Window start (s)"),
+    end: float | None = Query(None, description="Window end (s)"),
+    width: int = Query(800, ge=16, le=8192, description="Chart width in pixels = max buckets"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Min/max/mean buckets from the lap's level-of-detail pyramid, sized to `width`."""
+    # The track is only needed to build a missing pyramid; _lap_ref loads it then
+    lap = await _get_lap(db, lap_id, current_user, with_track=False)
+    if not lap.telemetry_file_path or not lap.telemetry_format:
+        raise HTTPException(status_code=404, detail="No telemetry data for this lap")
+
+    names = tuple(c for item in channels for c in item.split(",") if c) if channels else None
+    etag = telemetry_etag([lap], "lod", names, start, end, width)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    directory = pyramid_dir(lap.telemetry_file_path, lap.lap_number)
+    lod = await run_in_threadpool(read_pyramid, directory, names, start, end, width)
+    if lod is None:
+        # Laps imported before pyramids existed are indexed on first request.
+        try:
+            await _run_compute(build_lap_pyramid, await _lap_ref(db, lap))
+        except LookupError:
+            raise HTTPException(status_code=404, detail="Lap not found in telemetry file")
+        lod = await run_in_threadpool(read_pyramid, directory, names, start, end, width)
+
+    response.headers.update(cache_headers(etag))
+    return TelemetryLod(lap_id=lap.id, channels=lod or [])
+
+
+@router.get("/compare", response_model=CompareResult, dependencies=[Depends(rate_limit("compare"))])
+async def compare_get(
+    request: Request,
+    lap_ids: list[int] = Query(...),
+    channels: list[str] | None = Query(None),
+    gps_tolerance_m: float | None = Query(None, gt=0),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Cacheable variant of POST /compare: browsers revalidate GETs with If-None-Match."""
+    return await _compare(request, lap_ids, channels, gps_tolerance_m, db, current_user)
+
+
+@router.post("/compare", response_model=CompareResult, dependencies=[Depends(rate_limit("compare"))])
+async def compare(
+    payload: LapCompareRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await _compare(request, payload.lap_ids, payload.channels, payload.gps_tolerance_m, db, current_user)
+
+
+async def _compare(
+    request: Request,
+    lap_ids: list[int],
+    channels: list[str] | None,
+    gps_tolerance_m: float | None,
+    db: AsyncSession,
+    current_user: User,
+) -> Response:
+    if len(lap_ids) < 2:
+        raise HTTPException(status_code=400, detail="Provide at least 2 lap IDs to compare")
+
+    laps = []
+    for lap_id in lap_ids:
+        lap = await _get_lap(db, lap_id, current_user, gps_tolerance_m, detail=f"Lap {lap_id} not found")
+        laps.append(await _lap_ref(db, lap, gps_tolerance_m))
+
+    etag = telemetry_etag(laps, tuple(channels) if channels else None, gps_tolerance_m)
+    return await _serve_immutable(request, etag, compare_laps, laps, channels)
 
 
 @router.get("/{lap_id}", response_model=LapOut)
-def get_lap(
+async def get_lap(
     lap_id: int,
-    db: DbSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    lap = db.get(Lap, lap_id)
+    lap = await db.get(Lap, lap_id)
     if not lap:
         raise HTTPException(status_code=404, detail="Lap not found")
-    _assert_session_access(db.get(Session, lap.session_id), current_user)
+    _assert_session_access(await db.get(Session, lap.session_id), current_user)
     return lap
 
 
@@ -115,12 +252,13 @@ def create_lap(
         raise HTTPException(status_code=404, detail="Session not found")
     lap = Lap(**payload.model_dump())
     db.add(lap)
+    refresh_best_laps(db, session.user_id, session.track_configuration_id)
     db.commit()
     db.refresh(lap)
     return lap
 
 
-@router.post("/{lap_id}/upload", response_model=LapOut)
+@router.post("/{lap_id}/upload", response_model=LapOut, dependencies=[Depends(rate_limit("upload"))])
 async def upload_telemetry(
     lap_id: int,
     background_tasks: BackgroundTasks,
@@ -142,6 +280,7 @@ async def upload_telemetry(
     file_path = await save_telemetry_file(file, lap_id)
     lap.telemetry_file_path = file_path
     lap.telemetry_format = ext.lstrip(".")
+    stats.record_upload(db, os.path.getsize(file_path))
     db.commit()
 
     # Process telemetry in background to extract summary metrics
@@ -151,27 +290,6 @@ async def upload_telemetry(
     return lap
 
 
-@router.post("/compare", response_model=CompareResult)
-def compare(
-    payload: LapCompareRequest,
-    db: DbSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    if len(payload.lap_ids) < 2:
-        raise HTTPException(status_code=400, detail="Provide at least 2 lap IDs to compare")
-
-    laps = []
-    for lap_id in payload.lap_ids:
-        lap = db.get(Lap, lap_id)
-        if not lap:
-            raise HTTPException(status_code=404, detail=f"Lap {lap_id} not found")
-        session = db.get(Session, lap.session_id)
-        _assert_session_access(session, current_user)
-        laps.append(lap)
-
-    return compare_laps(laps, channels=payload.channels)
-
-
 @router.delete("/{lap_id}", status_code=204)
 def delete_lap(
     lap_id: int,
@@ -185,4 +303,5 @@ def delete_lap(
     if not session or session.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     db.delete(lap)
+    refresh_best_laps(db, session.user_id, session.track_configuration_id)
     db.commit()
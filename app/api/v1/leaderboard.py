@@ -1,36 +1,39 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from datetime import datetime
 
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.pagination import decode_cursor, paginate
+from app.database import get_async_db
+from app.models.best_lap import ALL_CATEGORIES, BestLap
 from app.models.lap import Lap
 from app.models.session import Session as SessionModel
 from app.models.track_configuration import TrackConfiguration
 from app.models.track import Track
 from app.models.user import User
 from app.models.car import Car
+from app.services.response_cache import LEADERBOARD_TAG, TRACKS_TAG, board_tag, response_cache
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
 
 @router.get("/")
-def list_active_tracks(db: Session = Depends(get_db)):
+async def list_active_tracks(db: AsyncSession = Depends(get_async_db)):
     """All tracks that have at least one public timed lap."""
-    rows = (
-        db.query(Track, TrackConfiguration, func.min(Lap.lap_time_ms).label("best_ms"))
+    return await response_cache.respond(
+        "active_tracks", {}, (TRACKS_TAG, LEADERBOARD_TAG), lambda: _active_tracks(db),
+    )
+
+
+async def _active_tracks(db: AsyncSession) -> list[dict]:
+    rows = await db.execute(
+        select(Track, TrackConfiguration, func.min(BestLap.lap_time_ms).label("best_ms"))
         .join(TrackConfiguration, TrackConfiguration.track_id == Track.id)
-        .join(SessionModel, SessionModel.track_configuration_id == TrackConfiguration.id)
-        .join(Lap, Lap.session_id == SessionModel.id)
-        .filter(
-            SessionModel.is_public == True,  # noqa: E712
-            Lap.is_valid == True,            # noqa: E712
-            Lap.is_outlap == False,          # noqa: E712
-            Lap.is_inlap == False,           # noqa: E712
-            Lap.lap_time_ms.isnot(None),
-        )
+        .join(BestLap, BestLap.track_configuration_id == TrackConfiguration.id)
+        .filter(BestLap.car_category == ALL_CATEGORIES)
         .group_by(Track.id, TrackConfiguration.id)
         .order_by(Track.name, TrackConfiguration.name)
-        .all()
     )
     return [
         {
@@ -47,54 +50,82 @@ def list_active_tracks(db: Session = Depends(get_db)):
 
 
 @router.get("/{configuration_id}")
-def leaderboard(configuration_id: int, limit: int = 50, db: Session = Depends(get_db)):
-    """Best lap per user for a given track configuration (public sessions only)."""
-    config = db.get(TrackConfiguration, configuration_id)
+async def leaderboard(
+    configuration_id: int,
+    car_category: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    event_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """One entry per user, their best public lap on a configuration, fastest first.
+
+    `car_category` restricts to laps in cars of that category ("" for none);
+    `date_from`/`date_to` (session date) and `event_id` restrict the laps
+    considered. Pass `next_cursor` back as `cursor` for the following page.
+    """
+    if car_category == ALL_CATEGORIES:
+        raise HTTPException(status_code=400, detail="Invalid car category")
+    params = {
+        "configuration_id": configuration_id, "car_category": car_category,
+        "date_from": date_from, "date_to": date_to, "event_id": event_id,
+        "cursor": cursor, "limit": limit,
+    }
+    return await response_cache.respond(
+        "leaderboard", params, (TRACKS_TAG, board_tag(configuration_id)),
+        lambda: _leaderboard(db, **params),
+    )
+
+
+async def _leaderboard(
+    db: AsyncSession,
+    configuration_id: int,
+    car_category: str | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+    event_id: int | None,
+    cursor: str | None,
+    limit: int,
+) -> dict:
+    config = await db.get(TrackConfiguration, configuration_id)
     if not config:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Track configuration not found")
 
-    # Best lap per user
-    subq = (
-        db.query(
-            User.id.label("user_id"),
+    if date_from is None and date_to is None and event_id is None:
+        board = _materialized_board(configuration_id, car_category)
+    else:
+        board = _live_board(configuration_id, car_category, date_from, date_to, event_id)
+
+    query = (
+        select(
+            board,
             User.username,
             User.full_name,
             Car.make.label("car_make"),
             Car.model.label("car_model"),
             Car.year.label("car_year"),
             Car.category.label("car_category"),
-            SessionModel.id.label("session_id"),
-            SessionModel.date.label("session_date"),
-            func.min(Lap.lap_time_ms).label("best_ms"),
-            func.max(Lap.max_speed_kmh).label("top_speed"),
-        )
-        .join(SessionModel, SessionModel.user_id == User.id)
-        .outerjoin(Car, Car.id == SessionModel.car_id)
-        .join(Lap, Lap.session_id == SessionModel.id)
-        .filter(
-            SessionModel.track_configuration_id == configuration_id,
-            SessionModel.is_public == True,  # noqa: E712
-            Lap.is_valid == True,            # noqa: E712
-            Lap.is_outlap == False,          # noqa: E712
-            Lap.is_inlap == False,           # noqa: E712
-            Lap.lap_time_ms.isnot(None),
         )
-        .group_by(User.id, User.username, User.full_name,
-                  Car.make, Car.model, Car.year, Car.category,
-                  SessionModel.id, SessionModel.date)
-        .order_by(func.min(Lap.lap_time_ms))
-        .limit(limit)
-        .all()
+        .join(User, User.id == board.c.user_id)
+        .outerjoin(Car, Car.id == board.c.car_id)
     )
+    first_rank = 1
+    if cursor:
+        best_ms, user_id, last_rank = decode_cursor(cursor, int, int, int)
+        query = query.filter(tuple_(board.c.best_ms, board.c.user_id) > (best_ms, user_id))
+        first_rank = last_rank + 1
+    rows = (await db.execute(query.order_by(board.c.best_ms, board.c.user_id).limit(limit + 1))).all()
+    rows, next_cursor = paginate(rows, limit, key=lambda r: (r.best_ms, r.user_id, first_rank + limit - 1))
 
-    track = db.get(Track, config.track_id)
+    track = await db.get(Track, config.track_id)
     return {
         "track": {"id": track.id, "name": track.name, "country": track.country},
         "configuration": {"id": config.id, "name": config.name, "length_meters": config.length_meters},
         "entries": [
             {
-                "rank": i + 1,
+                "rank": first_rank + i,
                 "user": {"id": r.user_id, "username": r.username, "full_name": r.full_name},
                 "car": f"{r.car_year or ''} {r.car_make or ''} {r.car_model or ''}".strip() or None,
                 "car_category": r.car_category,
@@ -104,11 +135,84 @@ def leaderboard(configuration_id: int, limit: int = 50, db: Session = Depends(ge
                 "best_lap_display": _fmt(r.best_ms),
                 "top_speed_kmh": r.top_speed,
             }
-            for i, r in enumerate(subq)
+            for i, r in enumerate(rows)
         ],
+        "next_cursor": next_cursor,
     }
 
 
+def _materialized_board(configuration_id: int, car_category: str | None):
+    """Per-user bests straight from best_laps: an index range scan on ix_best_laps_board."""
+    return (
+        select(
+            BestLap.user_id,
+            BestLap.car_id,
+            BestLap.session_id,
+            BestLap.session_date,
+            BestLap.lap_time_ms.label("best_ms"),
+            BestLap.top_speed_kmh.label("top_speed"),
+        )
+        .filter(
+            BestLap.track_configuration_id == configuration_id,
+            BestLap.car_category == (ALL_CATEGORIES if car_category is None else car_category),
+        )
+        .subquery()
+    )
+
+
+def _live_board(
+    configuration_id: int,
+    car_category: str | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+    event_id: int | None,
+):
+    """Per-user bests over an arbitrary lap window, ranked with ROW_NUMBER() per user."""
+    query = (
+        select(
+            SessionModel.user_id,
+            SessionModel.car_id,
+            SessionModel.id.label("session_id"),
+            SessionModel.date.label("session_date"),
+            Lap.lap_time_ms.label("best_ms"),
+            Lap.max_speed_kmh.label("top_speed"),
+            func.row_number().over(
+                partition_by=SessionModel.user_id,
+                order_by=(Lap.lap_time_ms, Lap.id),
+            ).label("rn"),
+        )
+        .join(Lap, Lap.session_id == SessionModel.id)
+        .filter(
+            SessionModel.track_configuration_id == configuration_id,
+            SessionModel.is_public == True,  # noqa: E712
+            Lap.is_valid == True,            # noqa: E712
+            Lap.is_outlap == False,          # noqa: E712
+            Lap.is_inlap == False,           # noqa: E712
+            Lap.lap_time_ms.isnot(None),
+        )
+    )
+    if car_category is not None:
+        query = query.outerjoin(Car, Car.id == SessionModel.car_id).filter(
+            func.coalesce(Car.category, "") == car_category
+        )
+    if date_from is not None:
+        query = query.filter(SessionModel.date >= date_from)
+    if date_to is not None:
+        query = query.filter(SessionModel.date < date_to)
+    if event_id is not None:
+        query = query.filter(SessionModel.event_id == event_id)
+
+    ranked = query.subquery()
+    return (
+        select(
+            ranked.c.user_id, ranked.c.car_id, ranked.c.session_id,
+            ranked.c.session_date, ranked.c.best_ms, ranked.c.top_speed,
+        )
+        .filter(ranked.c.rn == 1)
+        .subquery()
+    )
+
+
 def _fmt(ms: int | None) -> str | None:
     if ms is None:
         return None
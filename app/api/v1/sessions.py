@@ -1,15 +1,20 @@
 import os
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, BackgroundTasks
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session as DbSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, rate_limit
+from app.api.pagination import paginate, set_next_cursor
 from app.config import get_settings
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.session import Session
 from app.models.user import User
-from app.schemas.session import SessionCreate, SessionOut, SessionUpdate
+from app.schemas.session import SessionCreate, SessionOut, SessionSummary, SessionUpdate
+from app.services import stats
+from app.services.leaderboard import refresh_best_laps
+from app.services.session_listing import cursor_key, lap_aggregates_query, summaries_query, with_lap_aggregates
 from app.services.storage import save_session_file
 from app.services.session_importer import import_session_laps
 
@@ -17,27 +22,39 @@ router = APIRouter(prefix="/sessions", tags=["sessions"])
 settings = get_settings()
 
 
-@router.get("/", response_model=list[SessionOut])
-def list_sessions(
+@router.get("/", response_model=list[SessionSummary])
+async def list_sessions(
+    response: Response,
     public_only: bool = False,
-    db: DbSession = Depends(get_db),
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(Session)
+    """Your sessions, or all public ones with `public_only`, newest first.
+
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
     if public_only:
-        query = query.filter(Session.is_public == True)  # noqa: E712
+        criteria = Session.is_public == True  # noqa: E712
     else:
-        query = query.filter(Session.user_id == current_user.id)
-    return query.order_by(Session.date.desc()).all()
+        criteria = Session.user_id == current_user.id
+    rows = (await db.execute(summaries_query(criteria, cursor=cursor, limit=limit))).all()
+    rows, next_cursor = paginate(rows, limit, key=cursor_key)
+    set_next_cursor(response, next_cursor)
+    if not rows:
+        return []
+    aggregates = (await db.execute(lap_aggregates_query([r.id for r in rows]))).all()
+    return with_lap_aggregates(rows, aggregates)
 
 
 @router.get("/{session_id}", response_model=SessionOut)
-def get_session(
+async def get_session(
     session_id: int,
-    db: DbSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
-    session = db.get(Session, session_id)
+    session = await db.get(Session, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     if not session.is_public and session.user_id != current_user.id:
@@ -58,7 +75,8 @@ def create_session(
     return session
 
 
-@router.post("/upload", response_model=SessionOut, status_code=201)
+@router.post("/upload", response_model=SessionOut, status_code=201,
+             dependencies=[Depends(rate_limit("upload"))])
 async def upload_session(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
@@ -101,6 +119,7 @@ async def upload_session(
 
     file_path = await save_session_file(file, session.id)
     session.source_file_path = file_path
+    stats.record_upload(db, os.path.getsize(file_path))
     db.commit()
 
     fmt = ext.lstrip(".")
@@ -120,8 +139,13 @@ def update_session(
     session = db.get(Session, session_id)
     if not session or session.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Session not found")
+    old_configuration_id = session.track_configuration_id
     for field, value in payload.model_dump(exclude_none=True).items():
         setattr(session, field, value)
+    # is_public, car or configuration may have moved this session's laps on or off a leaderboard
+    refresh_best_laps(db, session.user_id, session.track_configuration_id)
+    if old_configuration_id != session.track_configuration_id:
+        refresh_best_laps(db, session.user_id, old_configuration_id)
     db.commit()
     db.refresh(session)
     return session
@@ -137,4 +161,5 @@ def delete_session(
     if not session or session.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Session not found")
     db.delete(session)
+    refresh_best_laps(db, session.user_id, session.track_configuration_id)
     db.commit()
@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, undefer
 
 from app.api.deps import get_current_user, get_current_superuser
-from app.database import get_db
-from app.models.lap import Lap
-from app.models.session import Session as SessionModel
+from app.database import get_async_db, get_db
+from app.models.best_lap import ALL_CATEGORIES, BestLap
+from app.models.lap_track import LapTrack
 from app.models.track import Track
 from app.models.track_configuration import TrackConfiguration
 from app.models.user import User
+from app.services.response_cache import LEADERBOARD_TAG, TRACKS_TAG, invalidate_on_commit, response_cache
+from app.services.telemetry.geometry import SIMPLIFY_TOLERANCES_M
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
 
 @router.get("/")
-def list_tracks(db: Session = Depends(get_db)):
-    tracks = db.query(Track).order_by(Track.name).all()
+async def list_tracks(db: AsyncSession = Depends(get_async_db)):
+    return await response_cache.respond("tracks", {}, (TRACKS_TAG,), lambda: _list_tracks(db))
+
+
+async def _list_tracks(db: AsyncSession) -> list[dict]:
+    tracks = await db.scalars(select(Track).options(selectinload(Track.configurations)).order_by(Track.name))
     return [
         {
             "id": t.id,
@@ -31,33 +39,30 @@ def list_tracks(db: Session = Depends(get_db)):
 
 
 @router.get("/{track_id}")
-def get_track(track_id: int, db: Session = Depends(get_db)):
-    track = db.get(Track, track_id)
+async def get_track(
+    track_id: int,
+    gps_tolerance_m: float | None = Query(4.0, ge=0, description="Map simplification (m); 0 = full track"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await response_cache.respond(
+        "track", {"track_id": track_id, "gps_tolerance_m": gps_tolerance_m},
+        (TRACKS_TAG, LEADERBOARD_TAG), lambda: _track_detail(db, track_id, gps_tolerance_m),
+    )
+
+
+async def _track_detail(db: AsyncSession, track_id: int, gps_tolerance_m: float | None) -> dict:
+    track = await db.get(Track, track_id, options=[selectinload(Track.configurations)])
     if not track:
         raise HTTPException(status_code=404, detail="Track not found")
+    best_gps = await _best_lap_polylines(db, track.id, gps_tolerance_m)
     configs = []
     for c in track.configurations:
-        best_lap = (
-            db.query(Lap)
-            .join(SessionModel, SessionModel.id == Lap.session_id)
-            .filter(
-                SessionModel.track_configuration_id == c.id,
-                SessionModel.is_public == True,   # noqa: E712
-                Lap.is_valid == True,             # noqa: E712
-                Lap.is_outlap == False,           # noqa: E712
-                Lap.is_inlap == False,            # noqa: E712
-                Lap.lap_time_ms.isnot(None),
-                Lap.gps_track.isnot(None),
-            )
-            .order_by(Lap.lap_time_ms)
-            .first()
-        )
         configs.append({
             "id": c.id, "name": c.name, "length_meters": c.length_meters,
             "num_sectors": c.num_sectors, "is_default": c.is_default,
             "start_finish_lat": c.start_finish_lat, "start_finish_lon": c.start_finish_lon,
             "layout_data": c.layout_data,
-            "best_lap_gps": best_lap.gps_track if best_lap else None,
+            "best_lap_gps": best_gps.get(c.id),
         })
     return {
         "id": track.id, "name": track.name, "country": track.country, "city": track.city,
@@ -65,6 +70,41 @@ def get_track(track_id: int, db: Session = Depends(get_db)):
     }
 
 
+async def _best_lap_polylines(db: AsyncSession, track_id: int, tolerance_m: float | None) -> dict[int, list]:
+    """Best-lap GPS polyline per configuration of a track, in two queries whatever the layout count."""
+    ranked = (
+        select(
+            BestLap.track_configuration_id,
+            BestLap.lap_id,
+            func.row_number().over(
+                partition_by=BestLap.track_configuration_id,
+                order_by=(BestLap.lap_time_ms, BestLap.user_id),
+            ).label("rn"),
+        )
+        .join(TrackConfiguration, TrackConfiguration.id == BestLap.track_configuration_id)
+        .join(LapTrack, LapTrack.lap_id == BestLap.lap_id)
+        .filter(TrackConfiguration.track_id == track_id, BestLap.car_category == ALL_CATEGORIES)
+        .subquery()
+    )
+    best = dict((await db.execute(
+        select(ranked.c.track_configuration_id, ranked.c.lap_id).filter(ranked.c.rn == 1)
+    )).all())
+    if not best:
+        return {}
+
+    # Async sessions cannot lazy-load the deferred full-rate blob, so load it
+    # up front whenever no stored level can serve the tolerance
+    full = not tolerance_m or tolerance_m < SIMPLIFY_TOLERANCES_M[0]
+    query = select(LapTrack).filter(LapTrack.lap_id.in_(best.values()))
+    if full:
+        query = query.options(undefer(LapTrack.points))
+    lap_tracks = {t.lap_id: t for t in await db.scalars(query)}
+    for t in lap_tracks.values():
+        if not full and t.simplified is None:  # imported before simplified levels existed
+            await db.refresh(t, ["points"])
+    return {config_id: lap_tracks[lap_id].polyline(tolerance_m) for config_id, lap_id in best.items()}
+
+
 @router.post("/", status_code=201)
 def create_track(payload: dict, db: Session = Depends(get_db), _: User = Depends(get_current_superuser)):
     track = Track(name=payload["name"], country=payload.get("country", ""), city=payload.get("city"))
@@ -80,6 +120,7 @@ def create_track(payload: dict, db: Session = Depends(get_db), _: User = Depends
         is_default=True,
     )
     db.add(config)
+    invalidate_on_commit(db, TRACKS_TAG)
     db.commit()
     db.refresh(track)
     return {"id": track.id, "name": track.name, "configuration_id": config.id}
@@ -104,6 +145,7 @@ def add_configuration(
         is_default=payload.get("is_default", False),
     )
     db.add(config)
+    invalidate_on_commit(db, TRACKS_TAG)
     db.commit()
     db.refresh(config)
     return {"id": config.id, "name": config.name}
@@ -121,5 +163,6 @@ def update_configuration(
                   "start_finish_lon", "layout_data", "is_default"):
         if field in payload:
             setattr(config, field, payload[field])
+    invalidate_on_commit(db, TRACKS_TAG)
     db.commit()
     return {"ok": True}
@@ -1,35 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
-from app.core.security import hash_password
-from app.database import get_db
+from app.api.deps import get_current_user, password_backpressure
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.user import UserOut, UserUpdate
+from app.services.passwords import hash_password
+from app.services.response_cache import invalidate_on_commit, principal_tag
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserOut)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 
 @router.patch("/me", response_model=UserOut)
-def update_me(
+async def update_me(
     payload: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
+    # Async so that hashing a new password holds no request thread (see auth.register)
+    user = await db.get(User, current_user.id)  # current_user is a detached, cached copy
     if payload.email:
-        existing = db.query(User).filter(User.email == payload.email).first()
-        if existing and existing.id != current_user.id:
+        existing = await db.scalar(select(User.id).where(User.email == payload.email))
+        if existing and existing != user.id:
             raise HTTPException(status_code=400, detail="Email already in use")
-        current_user.email = payload.email
+        user.email = payload.email
     if payload.full_name is not None:
-        current_user.full_name = payload.full_name
+        user.full_name = payload.full_name
     if payload.password:
-        current_user.hashed_password = hash_password(payload.password)
-    db.commit()
-    db.refresh(current_user)
-    return current_user
+        with password_backpressure():
+            user.hashed_password = await hash_password(payload.password)
+    invalidate_on_commit(db.sync_session, principal_tag(user.id))
+    await db.commit()
+    await db.refresh(user)
+    return user
@@ -3,8 +3,11 @@ from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
+from app.services.static_assets import asset_url
+
 router = APIRouter(tags=["web"])
 templates = Jinja2Templates(directory="app/templates")
+templates.env.globals["asset_url"] = asset_url
 
 
 @router.get("/", response_class=HTMLResponse)
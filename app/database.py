@@ -1,11 +1,112 @@
+import itertools
+import logging
+import time
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import get_settings
+from app.services.pool_metrics import PoolMetrics, instrumented_pool, watch_engine
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Async drivers for the same database, used by endpoints that depend on get_async_db
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+# Per-engine pool statistics, served by GET /admin/metrics/db
+pool_metrics: dict[str, PoolMetrics] = {"sync": PoolMetrics(), "async": PoolMetrics()}
+
+
+def async_database_url(url: str) -> str:
+    parsed = make_url(url)
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def engine_options(url: str, metrics: PoolMetrics, is_async: bool = False) -> dict:
+    """Pool sizing, timeouts and instrumentation from Settings; SQLite keeps SQLAlchemy's pool defaults."""
+    if make_url(url).get_backend_name() != "postgresql":
+        return {"pool_pre_ping": True}
+    options = {
+        "poolclass": instrumented_pool(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+        "pool_recycle": settings.db_pool_recycle_s,
+    }
+    if settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        options["connect_args"] = (
+            {"server_settings": {"statement_timeout": timeout}} if is_async
+            else {"options": f"-c statement_timeout={timeout}"}
+        )
+    return options
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, pool_metrics["sync"]))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+watch_engine(engine, pool_metrics["sync"])
+
+_async_url = async_database_url(settings.database_url)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, pool_metrics["async"], is_async=True))
+# Loaded objects stay usable after commit; async sessions cannot lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+watch_engine(async_engine.sync_engine, pool_metrics["async"])
+
+
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        async_url = async_database_url(url)
+        metrics = pool_metrics.setdefault(name, PoolMetrics())
+        self.engine = create_async_engine(async_url, **engine_options(async_url, metrics, is_async=True))
+        self.sessionmaker = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        watch_engine(self.engine.sync_engine, metrics)
+        self.down_until = 0.0
+
+
+class ReplicaSet:
+    """Round-robin over the read replicas, skipping any that recently failed to connect."""
+
+    def __init__(self, urls: list[str], retry_after_s: float):
+        self.replicas = [Replica(f"replica-{i}", url) for i, url in enumerate(urls)]
+        self.retry_after_s = retry_after_s
+        self._turn = itertools.count()
+
+    def candidates(self) -> list[Replica]:
+        if not self.replicas:
+            return []
+        now = time.monotonic()
+        start = next(self._turn)
+        ordered = self.replicas[start % len(self.replicas):] + self.replicas[:start % len(self.replicas)]
+        return [r for r in ordered if r.down_until <= now]
+
+    def mark_down(self, replica: Replica, exc: Exception) -> None:
+        replica.down_until = time.monotonic() + self.retry_after_s
+        logger.warning("Read replica %s unavailable, using others for %ss: %s", replica.name, self.retry_after_s, exc)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+read_replicas = ReplicaSet(settings.database_replica_urls, settings.replica_retry_after_s)
+
+# Set on responses to writes; while present, get_read_db uses the primary
+PRIMARY_PIN_COOKIE = "rt_primary"
 
 
 class Base(DeclarativeBase):
@@ -18,3 +119,30 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_read_db(request: Request):
+    """An AsyncSession for read-only endpoints: a healthy replica, else the primary.
+
+    Opening the connection up front (with pre-ping on Postgres) is the health
+    check, so a dead replica falls back before the endpoint runs any query.
+    """
+    if PRIMARY_PIN_COOKIE not in request.cookies:
+        for replica in read_replicas.candidates():
+            db = replica.sessionmaker()
+            try:
+                await db.connection()
+            except (DBAPIError, OSError) as exc:
+                await db.close()
+                read_replicas.mark_down(replica, exc)
+                continue
+            async with db:
+                yield db
+            return
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,17 +1,49 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.api.v1.router import api_router
+from app.database import PRIMARY_PIN_COOKIE, AsyncSessionLocal, async_engine, read_replicas
+from app.services.compute import compute_executor
+from app.services.passwords import password_executor
+from app.services.rate_limit import rate_limiter
+from app.services.response_cache import response_cache
+from app.services.static_assets import static_assets
+from app.tasks.refresh_token_sweeper import sweep_forever
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if rate_limiter.enabled:
+        await rate_limiter.connect()  # probe Redis once, before the first request
+    if response_cache.enabled:
+        await response_cache.connect()
+    sweeper = None
+    if settings.refresh_token_sweep_interval_s > 0:
+        sweeper = asyncio.create_task(sweep_forever(AsyncSessionLocal, settings.refresh_token_sweep_interval_s))
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+    compute_executor.shutdown()
+    password_executor.shutdown()
+    await async_engine.dispose()
+    await read_replicas.dispose()
+
+
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Upload, share, and compare racing telemetry data",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,9 +52,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    """After a successful write, send this client's reads to the primary for a few seconds."""
+    response = await call_next(request)
+    if read_replicas.replicas and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE, "1", max_age=settings.read_your_writes_s, httponly=True, samesite="lax",
+        )
+    return response
+
+
+app.mount("/static", static_assets, name="static")
 app.include_router(api_router, prefix="/api/v1")
 
 # Web routes (HTML pages) are served via the web router
@@ -7,10 +7,14 @@ from app.models.refresh_token import RefreshToken
 from app.models.event import Event, EventParticipant, EventStatus
 from app.models.session import Session, SessionType
 from app.models.lap import Lap
+from app.models.lap_track import LapTrack
+from app.models.best_lap import BestLap
+from app.models.stats import DailyStat, StatsCounter
 
 __all__ = [
     "User", "Track", "TrackConfiguration", "Car", "Drivetrain",
     "OAuthAccount", "RefreshToken",
     "Event", "EventParticipant", "EventStatus",
-    "Session", "SessionType", "Lap",
+    "Session", "SessionType", "Lap", "LapTrack", "BestLap",
+    "StatsCounter", "DailyStat",
 ]
@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, ForeignKey, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+# car_category key of the row holding a user's best lap across all categories
+ALL_CATEGORIES = "*"
+
+
+class BestLap(Base):
+    """Best public timed lap per configuration, user and car category.
+
+    Each (configuration, user) also has an ALL_CATEGORIES row for their overall
+    best, so every leaderboard variant is a range scan on ix_best_laps_board.
+
+    Maintained by services/leaderboard.refresh_best_laps in the same transaction
+    as the lap or session change, so leaderboard reads are an index range scan.
+    """
+    __tablename__ = "best_laps"
+    __table_args__ = (
+        Index("ix_best_laps_board", "track_configuration_id", "car_category", "lap_time_ms", "user_id"),
+        Index("ix_best_laps_user", "user_id"),
+    )
+
+    track_configuration_id: Mapped[int] = mapped_column(
+        ForeignKey("track_configurations.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    car_category: Mapped[str] = mapped_column(String(64), primary_key=True, default="")  # "" = uncategorised
+
+    lap_id: Mapped[int] = mapped_column(ForeignKey("laps.id", ondelete="CASCADE"), nullable=False)
+    session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    car_id: Mapped[int | None] = mapped_column(ForeignKey("cars.id", ondelete="SET NULL"))
+    lap_time_ms: Mapped[int] = mapped_column(Integer, nullable=False)
+    top_speed_kmh: Mapped[float | None] = mapped_column(Float)
+    session_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, ForeignKey, DateTime, Boolean, Enum, Text
+from sqlalchemy import String, ForeignKey, DateTime, Boolean, Enum, Text, Integer, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from app.database import Base
@@ -13,6 +13,11 @@ class EventStatus(str, enum.Enum):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Keyset order of the public calendar
+        Index("ix_events_public_date", "date_start", "id",
+              postgresql_where=text("is_public"), sqlite_where=text("is_public")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     organizer_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -24,6 +29,8 @@ class Event(Base):
     is_public: Mapped[bool] = mapped_column(Boolean, default=True)
     is_open: Mapped[bool] = mapped_column(Boolean, default=True)  # anyone can join
     status: Mapped[EventStatus] = mapped_column(Enum(EventStatus), default=EventStatus.upcoming)
+    # Denormalized count of event_participants; bumped atomically by join_event
+    participant_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
@@ -36,6 +43,7 @@ class Event(Base):
 
 class EventParticipant(Base):
     __tablename__ = "event_participants"
+    __table_args__ = (Index("ix_event_participants_event_user", "event_id", "user_id", unique=True),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     event_id: Mapped[int] = mapped_column(ForeignKey("events.id"), nullable=False)
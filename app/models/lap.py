@@ -1,11 +1,21 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, Float, Integer, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import String, Float, Integer, ForeignKey, DateTime, Boolean, JSON, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
+from app.models.lap_track import LapTrack
 
 
 class Lap(Base):
     __tablename__ = "laps"
+    __table_args__ = (
+        Index("ix_laps_session_lap_number", "session_id", "lap_number"),
+        # Valid timed laps only: the rows leaderboards and best-lap refreshes ever rank
+        Index(
+            "ix_laps_timed", "session_id", "lap_time_ms",
+            postgresql_where=text("is_valid AND NOT is_outlap AND NOT is_inlap AND lap_time_ms IS NOT NULL"),
+            sqlite_where=text("is_valid AND NOT is_outlap AND NOT is_inlap AND lap_time_ms IS NOT NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     session_id: Mapped[int] = mapped_column(ForeignKey("sessions.id"), nullable=False)
@@ -25,10 +35,8 @@ class Lap(Base):
     avg_speed_kmh: Mapped[float | None] = mapped_column(Float)
     max_throttle_pct: Mapped[float | None] = mapped_column(Float)
     max_brake_pct: Mapped[float | None] = mapped_column(Float)
-    summary: Mapped[dict | None] = mapped_column(JSON)
-
-    # GPS track for map rendering: list of [time, lat, lon, alt]
-    gps_track: Mapped[list | None] = mapped_column(JSON)
+    # Only read by lap detail views; deferred so listings and leaderboards skip it
+    summary: Mapped[dict | None] = mapped_column(JSON, deferred=True)
 
     is_valid: Mapped[bool] = mapped_column(Boolean, default=True)
     is_outlap: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -39,3 +47,35 @@ class Lap(Base):
     )
 
     session: Mapped["Session"] = relationship(back_populates="laps")  # noqa: F821
+    # GPS track lives in lap_tracks and is loaded on first access
+    track: Mapped[LapTrack | None] = relationship(
+        back_populates="lap", cascade="all, delete-orphan", passive_deletes=True, uselist=False,
+    )
+
+    @property
+    def gps_track(self) -> list | None:
+        """GPS track for map rendering: list of [time, lat, lon, alt]."""
+        return self.track.decode_points() if self.track else None
+
+    @gps_track.setter
+    def gps_track(self, points: list | None) -> None:
+        if not points:
+            self.track = None
+        elif self.track is None:
+            self.track = LapTrack.from_points(points)
+        else:
+            self.track.set_points(points)
+
+    @property
+    def gps_simplified(self) -> dict | None:
+        """Douglas–Peucker copies of gps_track keyed by tolerance in metres."""
+        return self.track.decode_simplified() if self.track else None
+
+    @gps_simplified.setter
+    def gps_simplified(self, levels: dict | None) -> None:
+        if self.track is not None:
+            self.track.set_simplified(levels)
+
+    def gps_track_for(self, tolerance_m: float | None) -> list | None:
+        """gps_track simplified to within `tolerance_m`; the full track when it is None."""
+        return self.track.polyline(tolerance_m) if self.track else None
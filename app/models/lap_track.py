@@ -0,0 +1,51 @@
+from sqlalchemy import ForeignKey, Integer, LargeBinary
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+from app.services.telemetry.geometry import pick_level, simplify_track
+from app.services.telemetry.track_codec import decode_levels, decode_track, encode_levels, encode_track
+
+
+class LapTrack(Base):
+    """GPS track of a lap, kept off the hot laps table (see services/telemetry/track_codec.py)."""
+    __tablename__ = "lap_tracks"
+
+    lap_id: Mapped[int] = mapped_column(ForeignKey("laps.id", ondelete="CASCADE"), primary_key=True)
+    point_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Full-rate track; deferred so map views that only need a simplified level never load it
+    points: Mapped[bytes] = mapped_column(LargeBinary, nullable=False, deferred=True)
+    # Simplified copies keyed by tolerance in metres ("1", "4", "16")
+    simplified: Mapped[bytes | None] = mapped_column(LargeBinary)
+
+    lap: Mapped["Lap"] = relationship(back_populates="track")  # noqa: F821
+
+    @classmethod
+    def from_points(cls, points: list, simplified: dict | None = None) -> "LapTrack":
+        track = cls()
+        track.set_points(points)
+        track.set_simplified(simplified)
+        return track
+
+    def set_points(self, points: list) -> None:
+        self.points = encode_track(points)
+        self.point_count = len(points)
+
+    def set_simplified(self, levels: dict | None) -> None:
+        self.simplified = encode_levels(levels) if levels else None
+
+    def decode_points(self) -> list[list[float]]:
+        return decode_track(self.points)
+
+    def decode_simplified(self) -> dict[str, list[list[float]]] | None:
+        return decode_levels(self.simplified) if self.simplified else None
+
+    def polyline(self, tolerance_m: float | None) -> list[list[float]]:
+        """The track simplified to within `tolerance_m`; the full track when it is None.
+
+        Reads only the stored levels when one qualifies, so the deferred full-rate blob stays unloaded.
+        """
+        if not tolerance_m:
+            return self.decode_points()
+        levels = self.decode_simplified()
+        if levels is None:  # imported before simplified levels existed
+            return simplify_track(self.decode_points(), tolerance_m)
+        return pick_level(levels, tolerance_m) or self.decode_points()
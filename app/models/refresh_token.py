@@ -1,13 +1,20 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, ForeignKey, DateTime, Boolean
+from sqlalchemy import String, ForeignKey, DateTime, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Refresh looks tokens up by the unique token_hash alone; these serve the
+        # sweeper (tasks/refresh_token_sweeper.py) and the user-delete cascade
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+        Index("ix_refresh_tokens_revoked", "id", postgresql_where=text("revoked"), sqlite_where=text("revoked")),
+        Index("ix_refresh_tokens_user_id", "user_id"),
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     token_hash: Mapped[str] = mapped_column(String(64), unique=True, nullable=False, index=True)
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
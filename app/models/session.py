@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from sqlalchemy import String, ForeignKey, DateTime, Enum, Boolean
+from sqlalchemy import String, ForeignKey, DateTime, Enum, Boolean, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 from app.database import Base
@@ -14,6 +14,21 @@ class SessionType(str, enum.Enum):
 
 class Session(Base):
     __tablename__ = "sessions"
+    __table_args__ = (
+        # Keyset order of the session listings (services/session_listing.py): a user's own,
+        # the public feed, and the admin listing of everything
+        Index("ix_sessions_user_date", "user_id", "date", "id"),
+        Index("ix_sessions_date", "date", "id"),
+        # Public sessions by configuration/user (leaderboard refresh) and by date (public feed)
+        Index("ix_sessions_public_config", "track_configuration_id", "user_id",
+              postgresql_where=text("is_public"), sqlite_where=text("is_public")),
+        Index("ix_sessions_public_date", "date", "id",
+              postgresql_where=text("is_public"), sqlite_where=text("is_public")),
+        Index("ix_sessions_event_id", "event_id",
+              postgresql_where=text("event_id IS NOT NULL"), sqlite_where=text("event_id IS NOT NULL")),
+        Index("ix_sessions_car_id", "car_id",
+              postgresql_where=text("car_id IS NOT NULL"), sqlite_where=text("car_id IS NOT NULL")),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,27 @@
+from datetime import date
+from sqlalchemy import BigInteger, Date, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class StatsCounter(Base):
+    """Running totals behind the admin dashboard (see services/stats.py).
+
+    Each counter is split over a few shard rows that writers pick at random, so
+    concurrent transactions rarely wait on the same row lock; a counter's value
+    is the sum of its shards.
+    """
+    __tablename__ = "stats_counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    shard: Mapped[int] = mapped_column(Integer, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class DailyStat(Base):
+    """Per-day (UTC) totals such as uploads, one row per name and day."""
+    __tablename__ = "stats_daily"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
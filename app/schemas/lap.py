@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, model_validator
+from pydantic import BaseModel, Field, model_validator
 
 
 class LapBase(BaseModel):
@@ -44,3 +44,4 @@ class LapOut(LapBase):
 class LapCompareRequest(BaseModel):
     lap_ids: list[int]
     channels: list[str] | None = None  # specific channels to compare; None = all
+    gps_tolerance_m: float | None = Field(None, gt=0)  # simplify gps_track for map views; None = full
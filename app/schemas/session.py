@@ -35,3 +35,19 @@ class SessionOut(SessionBase):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class SessionSummary(BaseModel):
+    """Listing row: the session without notes or file paths, plus lap aggregates."""
+    id: int
+    user_id: int
+    track_configuration_id: int
+    car_id: int | None = None
+    event_id: int | None = None
+    session_type: SessionType
+    date: datetime
+    is_public: bool
+    app_source: str | None = None
+    vehicle_hint: str | None = None
+    lap_count: int
+    best_lap_ms: int | None = None
@@ -17,6 +17,22 @@ class TelemetryData(BaseModel):
     distance_m: list[float] | None = None  # cumulative distance per sample (meters)
 
 
+class LodChannel(BaseModel):
+    """One channel at a single pyramid level: per-bucket min/max/mean."""
+    name: str
+    unit: str | None = None
+    bucket_size: int  # raw samples per bucket (1 = raw data)
+    timestamps: list[float]  # bucket start time (s)
+    min: list[float]
+    max: list[float]
+    mean: list[float]
+
+
+class TelemetryLod(BaseModel):
+    lap_id: int
+    channels: list[LodChannel]
+
+
 class LapDelta(BaseModel):
     """Time delta between two laps at each distance point."""
     reference_lap_id: int
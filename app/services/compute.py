@@ -0,0 +1,177 @@
+"""
+Bounded executor for CPU-bound telemetry work.
+
+Parsing and resampling a session file holds the GIL for seconds, so running it
+in FastAPI's thread pool stalls every other request on the worker. Tasks are
+instead submitted to a process pool with a hard cap on in-flight work: once
+`workers + queue_size` tasks are pending, new requests are rejected with
+ComputeBusy so the API can answer 503 + Retry-After instead of piling up.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable
+
+from app.config import get_settings
+from app.services.pool_metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ComputeBusy(Exception):
+    """Raised when the executor already holds its maximum number of tasks."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Compute executor is saturated")
+        self.retry_after = retry_after
+
+
+class ComputeTimeout(Exception):
+    """Raised when a task does not finish before its deadline."""
+
+
+class BoundedExecutor:
+    def __init__(
+        self,
+        factory: Callable[[], Executor],
+        max_pending: int,
+        timeout_s: float,
+        retry_after_s: int = 5,
+    ):
+        self._factory = factory
+        self._executor: Executor | None = None
+        self._max_pending = max_pending
+        self._timeout_s = timeout_s
+        self._retry_after_s = retry_after_s
+        # One permit per in-flight task; admitted callers never wait for one
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._peak_pending = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._lock = threading.Lock()
+        # Submit-to-result time: queueing for a worker plus running the task
+        self.latency = LatencyHistogram()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def max_pending(self) -> int:
+        return self._max_pending
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+        """Run `fn(*args)` on the pool; raise ComputeBusy immediately if saturated."""
+        fut = self._submit(fn, args, admit=True)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(fut), timeout or self._timeout_s)
+        except asyncio.TimeoutError:
+            self._timed_out(fut)
+            raise ComputeTimeout(f"{getattr(fn, '__name__', fn)} exceeded its deadline") from None
+        except BrokenProcessPool:
+            self._reset()
+            raise
+
+    def run_blocking(
+        self, fn: Callable[..., Any], *args: Any, timeout: float | None = None, admit: bool = False,
+    ) -> Any:
+        """Run `fn(*args)` from a worker thread.
+
+        By default this blocks the calling thread until a slot frees up, for
+        background jobs (e.g. session import) that must not be dropped; `timeout`
+        covers that wait too. With `admit=True` it raises ComputeBusy like run().
+        """
+        if not admit:
+            started = time.monotonic()
+            if not self._slots.acquire(timeout=timeout):
+                with self._lock:
+                    self._timeouts += 1
+                raise ComputeTimeout(f"{getattr(fn, '__name__', fn)} waited too long for a slot")
+            if timeout is not None:
+                timeout = max(0.0, timeout - (time.monotonic() - started))
+        fut = self._submit(fn, args, admit=admit)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            self._timed_out(fut)
+            raise ComputeTimeout(f"{getattr(fn, '__name__', fn)} exceeded its deadline") from None
+        except BrokenProcessPool:
+            self._reset()
+            raise
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn: Callable[..., Any], args: tuple, admit: bool) -> Future:
+        """Submit holding a slot; with `admit` the slot is taken here or ComputeBusy raised."""
+        if admit and not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise ComputeBusy(self._retry_after_s)
+        with self._lock:
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+            if self._executor is None:
+                self._executor = self._factory()
+            executor = self._executor
+        submitted = time.perf_counter()
+        try:
+            fut = executor.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        fut.add_done_callback(partial(self._release, submitted))
+        return fut
+
+    def snapshot(self) -> dict[str, Any]:
+        """Queue depth and latency for this worker process."""
+        with self._lock:
+            stats = {
+                "pending": self._pending,
+                "max_pending": self._max_pending,
+                "peak_pending": self._peak_pending,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+            }
+        stats["latency_ms"] = self.latency.snapshot()
+        return stats
+
+    def _release(self, submitted: float | None = None, fut: Future | None = None) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+        if fut is not None and not fut.cancelled():
+            self.latency.observe((time.perf_counter() - submitted) * 1000)
+
+    def _timed_out(self, fut: Future) -> None:
+        # cancel() only drops a task still queued. One already running keeps its
+        # worker process until it finishes, and keeps its slot too: the slot is
+        # released by the done callback, which fires only then.
+        fut.cancel()
+        with self._lock:
+            self._timeouts += 1
+
+    def _reset(self) -> None:
+        logger.warning("Compute pool broke (worker died); it will be recreated on next use")
+        with self._lock:
+            self._executor = None
+
+
+compute_executor = BoundedExecutor(
+    lambda: ProcessPoolExecutor(max_workers=settings.compute_workers),
+    max_pending=settings.compute_workers + settings.compute_queue_size,
+    timeout_s=settings.compute_task_timeout_s,
+    retry_after_s=settings.compute_retry_after_s,
+)
@@ -0,0 +1,137 @@
+"""
+Conditional GET support and a precompressed body cache for immutable telemetry.
+
+A lap's telemetry never changes once imported, so responses are identified by
+a strong ETag built from the lap ids, their source files and the artifact
+version. Serialized bodies are kept gzip/brotli-compressed in a byte-bounded
+LRU so repeat requests skip parsing, serialization and compression entirely.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is still served
+    brotli = None
+
+settings = get_settings()
+
+# Bump whenever the serialized telemetry format changes so old ETags stop matching.
+TELEMETRY_ARTIFACT_VERSION = 1
+
+
+class CachedBody(NamedTuple):
+    identity: bytes
+    gzip: bytes
+    br: bytes | None
+
+    @property
+    def size(self) -> int:
+        return len(self.identity) + len(self.gzip) + len(self.br or b"")
+
+
+def encode_body(model: BaseModel) -> CachedBody:
+    body = model.model_dump_json().encode()
+    return CachedBody(
+        identity=body,
+        gzip=gzip.compress(body, compresslevel=6),
+        br=brotli.compress(body, quality=5) if brotli else None,
+    )
+
+
+def render(fn: Callable[..., BaseModel], *args: Any) -> CachedBody:
+    """Build, serialize and compress in one step; picklable for the compute pool."""
+    return encode_body(fn(*args))
+
+
+def telemetry_etag(laps: list, *parts: Any) -> str:
+    """Strong ETag for a response derived from `laps` and request-specific `parts`."""
+    h = hashlib.sha256(f"v{TELEMETRY_ARTIFACT_VERSION}".encode())
+    for lap in laps:
+        h.update(f"|{lap.id}:{lap.telemetry_file_path}".encode())
+    h.update(repr(parts).encode())
+    return f'"{h.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
+
+
+def body_response(request: Request, etag: str, body: CachedBody) -> Response:
+    accepted = request.headers.get("accept-encoding", "")
+    headers = cache_headers(etag)
+    if body.br is not None and "br" in accepted:
+        content, headers["Content-Encoding"] = body.br, "br"
+    elif "gzip" in accepted:
+        content, headers["Content-Encoding"] = body.gzip, "gzip"
+    else:
+        content = body.identity
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.telemetry_cache_max_age_s}, immutable",
+        "Vary": "Accept-Encoding, Authorization",
+    }
+
+
+class BodyCache:
+    """Thread-safe LRU of CachedBody keyed by ETag, bounded by total bytes."""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedBody] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> CachedBody | None:
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is not None:
+                self._entries.move_to_end(etag)
+            return body
+
+    def put(self, etag: str, body: CachedBody) -> None:
+        if body.size > self._max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(etag, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[etag] = body
+            self._bytes += body.size
+            while self._bytes > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+body_cache = BodyCache(settings.telemetry_body_cache_mb * 1024 * 1024)
@@ -0,0 +1,77 @@
+"""
+Maintenance of the materialized best_laps table.
+
+Call refresh_best_laps() inside the transaction that changes a user's laps or
+sessions on a configuration; it rewrites that user's rows from their public,
+valid, timed laps and invalidates the cached leaderboards once the caller
+commits.
+"""
+from __future__ import annotations
+
+from sqlalchemy.orm import Session as DbSession
+
+from app.models.best_lap import ALL_CATEGORIES, BestLap
+from app.models.car import Car
+from app.models.lap import Lap
+from app.models.session import Session
+from app.services.response_cache import LEADERBOARD_TAG, board_tag, invalidate_on_commit
+
+
+def refresh_best_laps(db: DbSession, user_id: int, configuration_id: int) -> None:
+    db.flush()  # sessions are autoflush=False; the pending change must be visible below
+    rows = (
+        db.query(
+            Lap.id, Lap.session_id, Lap.lap_time_ms, Lap.max_speed_kmh,
+            Session.date, Session.car_id, Car.category,
+        )
+        .join(Session, Session.id == Lap.session_id)
+        .outerjoin(Car, Car.id == Session.car_id)
+        .filter(
+            Session.user_id == user_id,
+            Session.track_configuration_id == configuration_id,
+            Session.is_public == True,  # noqa: E712
+            Lap.is_valid == True,       # noqa: E712
+            Lap.is_outlap == False,     # noqa: E712
+            Lap.is_inlap == False,      # noqa: E712
+            Lap.lap_time_ms.isnot(None),
+        )
+        .order_by(Lap.lap_time_ms, Lap.id)
+        .all()
+    )
+
+    db.query(BestLap).filter(
+        BestLap.user_id == user_id,
+        BestLap.track_configuration_id == configuration_id,
+    ).delete()
+    invalidate_on_commit(db, LEADERBOARD_TAG, board_tag(configuration_id))
+
+    seen: set[str] = set()
+    for r in rows:
+        # The first (fastest) row is also the user's overall best
+        for category in (r.category or "", ALL_CATEGORIES):
+            if category in seen:
+                continue
+            seen.add(category)
+            db.add(BestLap(
+                track_configuration_id=configuration_id,
+                user_id=user_id,
+                car_category=category,
+                lap_id=r.id,
+                session_id=r.session_id,
+                car_id=r.car_id,
+                lap_time_ms=r.lap_time_ms,
+                top_speed_kmh=r.max_speed_kmh,
+                session_date=r.date,
+            ))
+
+
+def refresh_best_laps_for_car(db: DbSession, car_id: int) -> None:
+    """Re-file every leaderboard entry set with `car_id`, e.g. after its category changed."""
+    pairs = (
+        db.query(Session.user_id, Session.track_configuration_id)
+        .filter(Session.car_id == car_id)
+        .distinct()
+        .all()
+    )
+    for user_id, configuration_id in pairs:
+        refresh_best_laps(db, user_id, configuration_id)
@@ -0,0 +1,60 @@
+"""
+Password hashing and verification on a dedicated, bounded thread pool.
+
+bcrypt deliberately costs tens of milliseconds of CPU per call. It releases
+the GIL, so threads are enough, but run inline it holds one of FastAPI's
+request threads for the whole hash, and a burst of logins can take them all.
+Calls here are awaited from async endpoints on their own BoundedExecutor
+instead, so a waiting login holds no thread at all. At most
+`workers + queue_size` are in flight, and beyond that ComputeBusy is raised
+immediately so the endpoint can answer 503 + Retry-After.
+"""
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.config import get_settings
+from app.core import security
+from app.services.compute import BoundedExecutor
+from app.services.pool_metrics import LatencyHistogram
+
+settings = get_settings()
+
+password_executor = BoundedExecutor(
+    lambda: ThreadPoolExecutor(max_workers=settings.password_hash_workers, thread_name_prefix="password"),
+    max_pending=settings.password_hash_workers + settings.password_hash_queue_size,
+    timeout_s=settings.password_hash_timeout_s,
+    retry_after_s=settings.password_hash_retry_after_s,
+)
+
+# Time spent in bcrypt itself, excluding the wait for a pool thread
+hash_timings = {"hash": LatencyHistogram(), "verify": LatencyHistogram()}
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", security.hash_password, password)
+
+
+async def verify_password(plain: str, hashed: str) -> bool:
+    return await _run("verify", security.verify_password, plain, hashed)
+
+
+def snapshot() -> dict[str, Any]:
+    return {
+        **password_executor.snapshot(),
+        **{f"{kind}_ms": timings.snapshot() for kind, timings in hash_timings.items()},
+    }
+
+
+async def _run(kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+    return await password_executor.run(_timed, kind, fn, *args, timeout=settings.password_hash_timeout_s)
+
+
+def _timed(kind: str, fn: Callable[..., Any], *args: Any) -> Any:
+    start = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        hash_timings[kind].observe((time.perf_counter() - start) * 1000)
@@ -0,0 +1,149 @@
+"""
+Live statistics for the SQLAlchemy connection pools.
+
+Each engine gets a QueuePool subclass whose `_do_get` is timed, so the
+histogram covers the whole checkout: waiting for a free connection and, while
+the pool is still growing, opening a new one. Pre-ping failures are counted
+from the engine's handle_error event, which flags errors raised by the ping.
+Counters are per process; with several workers, scrape each one.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Count, mean, max and bucketed distribution of durations in milliseconds."""
+
+    def __init__(self, bounds_ms: tuple[float, ...] = WAIT_BUCKETS_MS):
+        self._bounds = bounds_ms
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count = 0
+            self.total_ms = 0.0
+            self.max_ms = 0.0
+            self._counts = [0] * (len(self._bounds) + 1)
+
+    def observe(self, ms: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            self._counts[bisect.bisect_left(self._bounds, ms)] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "mean": round(self.total_ms / self.count, 3) if self.count else None,
+                "max": round(self.max_ms, 3),
+                # Cumulative counts per upper bound, Prometheus-style
+                "buckets": {
+                    **{str(b): n for b, n in zip(self._bounds, _cumulative(self._counts))},
+                    "+Inf": self.count,
+                },
+            }
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait = LatencyHistogram()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.pre_ping_failures = 0
+            self.invalidations = 0
+        self.wait.reset()
+
+    def record_wait(self, wait_ms: float, timed_out: bool) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+        self.wait.observe(wait_ms)
+
+    def count_pre_ping_failure(self) -> None:
+        with self._lock:
+            self.pre_ping_failures += 1
+
+    def count_invalidation(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> dict[str, Any]:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "pre_ping_failures": self.pre_ping_failures,
+                "invalidations": self.invalidations,
+                "wait_ms": self.wait.snapshot(),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                pool_size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                # QueuePool counts overflow from -pool_size until the pool is full
+                overflow_in_use=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        return stats
+
+
+def instrumented_pool(base: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    """A `base` subclass recording checkout waits in `metrics`.
+
+    Metrics live on the class so they survive engine.dispose(), which rebuilds
+    the pool from its class.
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = base._do_get(self)
+        except sa_exc.TimeoutError:
+            metrics.record_wait((time.perf_counter() - start) * 1000, timed_out=True)
+            raise
+        metrics.record_wait((time.perf_counter() - start) * 1000, timed_out=False)
+        return conn
+
+    return type(f"Instrumented{base.__name__}", (base,), {"_do_get": _do_get, "metrics": metrics})
+
+
+def watch_engine(engine: Engine, metrics: PoolMetrics) -> None:
+    """Count pre-ping failures and invalidated connections on `engine` (the sync engine of an AsyncEngine)."""
+
+    @event.listens_for(engine, "handle_error")
+    def _pre_ping_failed(context) -> None:
+        if context.is_pre_ping:
+            metrics.count_pre_ping_failure()
+
+    @event.listens_for(engine.pool, "invalidate")
+    def _invalidated(dbapi_connection, connection_record, exception) -> None:
+        metrics.count_invalidation()
+
+
+def _cumulative(counts: list[int]) -> list[int]:
+    out, total = [], 0
+    for n in counts[:-1]:
+        total += n
+        out.append(total)
+    return out
@@ -0,0 +1,173 @@
+"""
+Token-bucket rate limiting for expensive endpoints.
+
+Each limited route has a bucket per caller: the user id when the request
+carries a valid bearer token, otherwise the client IP. A bucket holds up to
+`capacity` tokens and refills continuously, so a limit of "10/60" allows a
+burst of 10 and then one request every 6 s. A request that finds the bucket
+empty is told how long until the next token, which becomes `Retry-After`.
+
+Buckets live in Redis when the `redis` package is installed and the server
+answers, so every worker draws from the same bucket. A Lua script refills and
+takes atomically, using the Redis clock. Otherwise each process keeps its own
+bounded table, which makes the effective limit per worker. If Redis fails
+mid-flight, the request is checked against the local table instead of being
+let through or refused.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import get_settings
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:  # optional: falls back to per-process buckets
+    redis = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True)
+class Limit:
+    capacity: int
+    per_s: float
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second."""
+        return self.capacity / self.per_s
+
+    @classmethod
+    def parse(cls, spec: str) -> "Limit":
+        """"capacity/seconds", e.g. "10/60"."""
+        capacity, per_s = spec.split("/")
+        return cls(int(capacity), float(per_s))
+
+
+class LimiterUnavailable(Exception):
+    """Raised by a backend that cannot be reached."""
+
+
+class MemoryBuckets:
+    """Per-process buckets, least recently used evicted beyond `max_keys`."""
+
+    def __init__(self, max_keys: int):
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+# KEYS[1] bucket; ARGV capacity, tokens per second. Returns the wait in seconds
+# as a string (Lua numbers become integers on the way out).
+_TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBuckets:
+    """Buckets shared by all workers; each key expires once it would be full again."""
+
+    def __init__(self, aclient):
+        self._take = aclient.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        try:
+            return float(await self._take(keys=[f"rl:{key}"], args=[limit.capacity, limit.rate]))
+        except redis.RedisError as exc:
+            raise LimiterUnavailable(str(exc)) from exc
+
+
+class RateLimiter:
+    def __init__(self, backend_name: str, limits: dict[str, str], max_keys: int, enabled: bool = True):
+        self.enabled = enabled
+        self.limits = {route: Limit.parse(spec) for route, spec in limits.items()}
+        self._backend_name = backend_name
+        self._local = MemoryBuckets(max_keys)
+        self._backend: MemoryBuckets | RedisBuckets | None = None
+
+    async def connect(self) -> MemoryBuckets | RedisBuckets:
+        """Resolve the backend; called from the app lifespan, else on first use.
+
+        The probe uses the asyncio client, so an unreachable Redis costs the
+        event loop nothing while its connect timeout runs. Two first requests
+        racing may both probe; the later result simply wins.
+        """
+        if self._backend is None:
+            self._backend = await self._probe()
+        return self._backend
+
+    async def _probe(self) -> MemoryBuckets | RedisBuckets:
+        if self._backend_name == "redis":
+            if redis is None:
+                logger.warning("redis package not installed; rate limits are per-process")
+            else:
+                client = redis.asyncio.Redis.from_url(
+                    settings.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5,
+                )
+                try:
+                    await client.ping()
+                    return RedisBuckets(client)
+                except (redis.RedisError, OSError) as exc:
+                    logger.warning("Redis unavailable (%s); rate limits are per-process", exc)
+                    await client.aclose()
+        return self._local
+
+    async def hit(self, route: str, subject: str) -> float:
+        """Take a token from `subject`'s bucket for `route`; the seconds to wait, 0 if allowed."""
+        limit = self.limits.get(route)
+        if not self.enabled or limit is None:
+            return 0.0
+        key = f"{route}:{subject}"
+        try:
+            backend = self._backend or await self.connect()
+            return await backend.take(key, limit)
+        except LimiterUnavailable as exc:
+            logger.warning("Rate limiter unavailable: %s", exc)
+            return await self._local.take(key, limit)
+
+
+rate_limiter = RateLimiter(
+    settings.rate_limit_backend,
+    limits=settings.rate_limits,
+    max_keys=settings.rate_limit_max_keys,
+    enabled=settings.rate_limit_enabled,
+)
@@ -0,0 +1,361 @@
+"""
+Read-through cache for public, read-heavy JSON endpoints, and for the
+authenticated principal (see api/deps.py).
+
+Responses are stored as serialized JSON under a key derived from the endpoint,
+its parameters and the current version of every tag it depends on. Writes never
+delete entries: they bump tag versions, so the next read computes a fresh key
+and stale bodies simply age out under their TTL. A reader racing a write can at
+worst store a body under the old versions, which nobody looks up again.
+
+Tags are bumped after the writing transaction commits (see invalidate_on_commit)
+so a recompute can never observe the pre-commit state under the new version.
+That holds only if the recompute reads the primary: a lagging replica could
+still serve pre-commit rows and have them cached under the new version for
+the whole TTL, so cached endpoints use get_async_db, not get_read_db.
+On Redis, a commit on the event loop (async sessions) schedules its bump there
+instead of waiting for it; sync write paths on worker threads wait.
+
+The backend is resolved once, asynchronously, from the app lifespan: the
+configured Redis when the `redis` package is installed and the server
+answers, otherwise a per-process memory store (invalidation is then
+local to the worker and the TTL bounds staleness on the others). Concurrent
+misses on one key are coalesced: one task per process computes while the
+rest await it, and across processes a short Redis lock lets a single worker
+recompute while the others poll for its result.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session as DbSession
+
+from app.config import get_settings
+
+try:
+    import redis
+    import redis.asyncio
+except ImportError:  # optional: falls back to the in-process store
+    redis = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TRACKS_TAG = "tracks"
+LEADERBOARD_TAG = "leaderboard"
+PRINCIPAL_TAG = "principal"
+
+_PENDING_TAGS = "response_cache_tags"
+_POLL_INTERVAL_S = 0.05
+_BUMP_TIMEOUT_S = 1.0
+
+
+def board_tag(configuration_id: int) -> str:
+    return f"{LEADERBOARD_TAG}:{configuration_id}"
+
+
+def principal_tag(user_id: int) -> str:
+    return f"{PRINCIPAL_TAG}:{user_id}"
+
+
+class CacheUnavailable(Exception):
+    """Raised by a backend that cannot be reached; the request is served uncached."""
+
+
+class MemoryBackend:
+    """Thread-safe in-process store with per-entry expiry, bounded by entry count."""
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        # Reads run on the event loop, bumps on it or on the threads of sync write endpoints
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    async def set(self, key: str, body: bytes, ttl_s: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_s, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def versions(self, tags: tuple[str, ...]) -> list[int]:
+        with self._lock:
+            return [self._versions.get(t, 0) for t in tags]
+
+    def bump(self, tags: tuple[str, ...]) -> None:
+        with self._lock:
+            for t in tags:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    async def acquire(self, key: str, ttl_s: float) -> bool:
+        return True  # one process: the in-process flight already serializes
+
+    async def release(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisBackend:
+    """Shared store on Redis: entries expire natively, tag versions are INCR counters.
+
+    Everything goes through one asyncio client, bound to the loop that
+    connected it. Bumps are fired from after_commit, on that loop for async
+    sessions and on worker threads for sync ones; see bump().
+    """
+
+    def __init__(self, aclient, loop: asyncio.AbstractEventLoop):
+        self._aclient = aclient
+        self._loop = loop
+
+    async def _call(self, fn, *args, **kwargs):
+        try:
+            return await fn(*args, **kwargs)
+        except redis.RedisError as exc:
+            raise CacheUnavailable(str(exc)) from exc
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._call(self._aclient.get, f"rc:body:{key}")
+
+    async def set(self, key: str, body: bytes, ttl_s: float) -> None:
+        await self._call(self._aclient.set, f"rc:body:{key}", body, px=int(ttl_s * 1000))
+
+    async def versions(self, tags: tuple[str, ...]) -> list[int]:
+        values = await self._call(self._aclient.mget, [f"rc:tag:{t}" for t in tags])
+        return [int(v or 0) for v in values]
+
+    def bump(self, tags: tuple[str, ...]) -> None:
+        """Schedule the INCRs on the client's loop; a thread without a running loop waits for them.
+
+        On a loop the bump runs at its next iteration, before the writing
+        request's response goes out; waiting there would block every request.
+        """
+        coro = self._bump(tags)
+        try:
+            future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        except RuntimeError as exc:  # the loop is closed
+            coro.close()
+            raise CacheUnavailable(str(exc)) from exc
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                future.result(timeout=_BUMP_TIMEOUT_S)
+            except concurrent.futures.TimeoutError as exc:
+                future.cancel()
+                raise CacheUnavailable("tag bump timed out") from exc
+        else:
+            future.add_done_callback(_log_failed_bump)
+
+    async def _bump(self, tags: tuple[str, ...]) -> None:
+        pipe = self._aclient.pipeline(transaction=False)
+        for t in tags:
+            pipe.incr(f"rc:tag:{t}")
+        await self._call(pipe.execute)
+
+    async def acquire(self, key: str, ttl_s: float) -> bool:
+        return bool(await self._call(self._aclient.set, f"rc:lock:{key}", b"1", nx=True, px=int(ttl_s * 1000)))
+
+    async def release(self, key: str) -> None:
+        await self._call(self._aclient.delete, f"rc:lock:{key}")
+
+    def clear(self) -> None:
+        pass  # shared entries are left to expire; bump tags to invalidate instead
+
+
+class ResponseCache:
+    def __init__(self, backend_name: str, ttl_s: float, lock_timeout_s: float, max_entries: int, enabled: bool = True):
+        self.enabled = enabled
+        self._backend_name = backend_name
+        self._ttl_s = ttl_s
+        self._lock_timeout_s = lock_timeout_s
+        self._max_entries = max_entries
+        self._backend: MemoryBackend | RedisBackend | None = None
+        self._flights: dict[str, asyncio.Future] = {}
+
+    async def connect(self) -> MemoryBackend | RedisBackend:
+        """Resolve the backend; called from the app lifespan, else on first use.
+
+        The probe uses the asyncio client, so an unreachable Redis costs the
+        event loop nothing while its connect timeout runs. Two first requests
+        racing may both probe; the later result simply wins.
+        """
+        if self._backend is None:
+            self._backend = await self._probe()
+        return self._backend
+
+    async def _probe(self) -> MemoryBackend | RedisBackend:
+        if self._backend_name == "redis":
+            if redis is None:
+                logger.warning("redis package not installed; response cache is per-process")
+            else:
+                options = {"socket_connect_timeout": 0.5, "socket_timeout": 0.5}
+                aclient = redis.asyncio.Redis.from_url(settings.redis_url, **options)
+                try:
+                    await aclient.ping()
+                    return RedisBackend(aclient, asyncio.get_running_loop())
+                except (redis.RedisError, OSError) as exc:
+                    logger.warning("Redis unavailable (%s); response cache is per-process", exc)
+                    await aclient.aclose()
+        return MemoryBackend(self._max_entries)
+
+    async def respond(
+        self,
+        name: str,
+        params: dict[str, Any],
+        tags: tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Response:
+        """JSON response for `await compute()`, served from cache while none of `tags` changed."""
+        body, hit = await self.get_or_compute(name, params, tags, compute)
+        return Response(content=body, media_type="application/json",
+                        headers={"X-Cache": "HIT" if hit else "MISS"})
+
+    async def get_or_compute(
+        self,
+        name: str,
+        params: dict[str, Any],
+        tags: tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]],
+        ttl_s: float | None = None,
+    ) -> tuple[bytes, bool]:
+        if not self.enabled:
+            return _encode(await compute()), False
+        backend = self._backend or await self.connect()
+        try:
+            key = _key(name, params, tags, await backend.versions(tags))
+            body = await backend.get(key)
+        except CacheUnavailable as exc:
+            logger.warning("Response cache unavailable: %s", exc)
+            return _encode(await compute()), False
+        if body is not None:
+            return body, True
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(flight), self._lock_timeout_s), True
+            except asyncio.TimeoutError:
+                return _encode(await compute()), False  # the leader is stuck; don't queue behind it
+
+        flight = self._flights[key] = asyncio.get_running_loop().create_future()
+        try:
+            body = await self._fill(backend, key, compute, ttl_s or self._ttl_s)
+            flight.set_result(body)
+            return body, False
+        except BaseException as exc:
+            flight.set_exception(exc)
+            flight.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+    async def _fill(
+        self,
+        backend: MemoryBackend | RedisBackend,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl_s: float,
+    ) -> bytes:
+        try:
+            locked = await backend.acquire(key, self._lock_timeout_s)
+            if not locked:
+                # Another worker is computing this key: wait for its result
+                deadline = time.monotonic() + self._lock_timeout_s
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(_POLL_INTERVAL_S)
+                    body = await backend.get(key)
+                    if body is not None:
+                        return body
+            try:
+                body = _encode(await compute())
+                await backend.set(key, body, ttl_s)
+            finally:
+                if locked:
+                    await backend.release(key)
+            return body
+        except CacheUnavailable as exc:
+            logger.warning("Response cache unavailable: %s", exc)
+            return _encode(await compute())
+
+    def invalidate(self, *tags: str) -> None:
+        if self._backend is None:
+            return  # outside the app (never connected), shared entries age out under their TTL
+        try:
+            self._backend.bump(tuple(sorted(set(tags))))
+        except CacheUnavailable as exc:
+            logger.warning("Response cache invalidation of %s failed: %s", tags, exc)
+
+    def clear(self) -> None:
+        if self._backend is not None:
+            self._backend.clear()
+
+
+def invalidate_on_commit(db: DbSession, *tags: str) -> None:
+    """Invalidate `tags` once `db` commits; dropped if the transaction rolls back."""
+    if not db.in_transaction():
+        db.begin()  # so a rollback fires after_rollback and discards the tags
+    db.info.setdefault(_PENDING_TAGS, set()).update(tags)
+
+
+@event.listens_for(DbSession, "after_commit")
+def _invalidate_committed(db: DbSession) -> None:
+    tags = db.info.pop(_PENDING_TAGS, None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(DbSession, "after_rollback")
+def _discard_pending(db: DbSession) -> None:
+    db.info.pop(_PENDING_TAGS, None)
+
+
+def _log_failed_bump(future: concurrent.futures.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("Response cache invalidation failed: %s", future.exception())
+
+
+def _key(name: str, params: dict[str, Any], tags: tuple[str, ...], versions: list[int]) -> str:
+    raw = json.dumps([name, params, dict(zip(tags, versions))], sort_keys=True, default=str)
+    return f"{name}:{hashlib.sha256(raw.encode()).hexdigest()[:32]}"
+
+
+def _encode(content: Any) -> bytes:
+    # Same serialization as FastAPI's default JSONResponse
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+response_cache = ResponseCache(
+    settings.response_cache_backend,
+    ttl_s=settings.response_cache_ttl_s,
+    lock_timeout_s=settings.response_cache_lock_timeout_s,
+    max_entries=settings.response_cache_max_entries,
+    enabled=settings.response_cache_enabled,
+)
@@ -10,7 +10,12 @@ import os
 from app.database import SessionLocal
 from app.models.lap import Lap
 from app.models.session import Session
+from app.services.compute import compute_executor
+from app.services.leaderboard import refresh_best_laps
+from app.services.storage import pyramid_dir
+from app.services.telemetry.geometry import simplify_levels
 from app.services.telemetry.parser import parse
+from app.services.telemetry.pyramid import write_pyramid
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +27,8 @@ def import_session_laps(session_id: int, file_path: str, fmt: str) -> None:
         if not session:
             return
 
-        laps_data = parse(file_path, fmt)
+        # Parsing and indexing are CPU-bound; keep them off this process's GIL.
+        laps_data = compute_executor.run_blocking(_parse_and_index, file_path, fmt)
 
         for lap_data in laps_data:
             lap_number = lap_data["lap_number"]
@@ -37,6 +43,7 @@ def import_session_laps(session_id: int, file_path: str, fmt: str) -> None:
             lap.telemetry_file_path = file_path
             lap.telemetry_format = fmt
             lap.gps_track = lap_data.get("gps_track") or []
+            lap.gps_simplified = lap_data.get("gps_simplified")
             lap.is_outlap = lap_data.get("is_outlap", False)
             lap.is_inlap = lap_data.get("is_inlap", False)
             lap.is_valid = not lap.is_outlap and not lap.is_inlap
@@ -65,6 +72,7 @@ def import_session_laps(session_id: int, file_path: str, fmt: str) -> None:
                 for name, ch in channels.items()
             }
 
+        refresh_best_laps(db, session.user_id, session.track_configuration_id)
         db.commit()
         logger.info("Imported %d laps for session %d", len(laps_data), session_id)
     except Exception:
@@ -72,3 +80,12 @@ def import_session_laps(session_id: int, file_path: str, fmt: str) -> None:
         db.rollback()
     finally:
         db.close()
+
+
+def _parse_and_index(file_path: str, fmt: str) -> list[dict]:
+    """Runs in the compute pool: parse, write chart pyramids, simplify GPS tracks."""
+    laps_data = parse(file_path, fmt)
+    for lap_data in laps_data:
+        write_pyramid(pyramid_dir(file_path, lap_data["lap_number"]), lap_data)
+        lap_data["gps_simplified"] = simplify_levels(lap_data.get("gps_track"))
+    return laps_data
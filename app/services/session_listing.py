@@ -0,0 +1,67 @@
+"""
+Session listings: a lean column projection paged by (date, id), newest first.
+
+A page is fetched with summaries_query(), trimmed with paginate(), then given
+lap counts and best times from one grouped query over just that page's ids
+(lap_aggregates_query), so the cost of a page does not grow with the table.
+The same statements serve the async user feeds and the sync admin listing.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import Select, and_, func, select, tuple_
+
+from app.api.pagination import decode_cursor
+from app.models.lap import Lap
+from app.models.session import Session
+
+SUMMARY_COLUMNS = (
+    Session.id, Session.user_id, Session.track_configuration_id, Session.car_id, Session.event_id,
+    Session.session_type, Session.date, Session.is_public, Session.app_source, Session.vehicle_hint,
+)
+
+# Same predicate as the ix_laps_timed partial index
+_TIMED = and_(
+    Lap.is_valid == True,      # noqa: E712
+    Lap.is_outlap == False,    # noqa: E712
+    Lap.is_inlap == False,     # noqa: E712
+)
+
+
+def summaries_query(*criteria: Any, cursor: str | None, limit: int) -> Select:
+    """`limit + 1` session rows matching `criteria`, after `cursor`, newest first."""
+    query = select(*SUMMARY_COLUMNS).where(*criteria)
+    if cursor:
+        query = query.where(tuple_(Session.date, Session.id) < decode_cursor(cursor, datetime, int))
+    return query.order_by(Session.date.desc(), Session.id.desc()).limit(limit + 1)
+
+
+def cursor_key(row) -> tuple:
+    return row.date, row.id
+
+
+def lap_aggregates_query(session_ids: Sequence[int]) -> Select:
+    return (
+        select(
+            Lap.session_id,
+            func.count().label("lap_count"),
+            func.min(Lap.lap_time_ms).filter(_TIMED).label("best_lap_ms"),
+        )
+        .where(Lap.session_id.in_(session_ids))
+        .group_by(Lap.session_id)
+    )
+
+
+def with_lap_aggregates(rows: Sequence, aggregates: Sequence) -> list[dict]:
+    by_session = {a.session_id: a for a in aggregates}
+    summaries = []
+    for row in rows:
+        agg = by_session.get(row.id)
+        summaries.append({
+            **row._asdict(),
+            "lap_count": agg.lap_count if agg else 0,
+            "best_lap_ms": agg.best_lap_ms if agg else None,
+        })
+    return summaries
@@ -0,0 +1,176 @@
+"""
+Static assets served from memory under content-hashed URLs.
+
+At startup every file under app/static is read once and hashed. Text assets
+are also kept gzip- and (when available) brotli-compressed. Templates link
+assets through the `asset_url` Jinja global, which returns a URL with the
+hash in the file name, e.g. `/static/js/charts.3f9a1c2b7d40.js`. A hashed URL
+always names the same bytes, so it is served `immutable` with a one-year
+max-age and a repeat visit fetches nothing. The plain path
+(`/static/js/charts.js`) and stale hashes still resolve to the current file,
+with an ETag and `no-cache` so clients revalidate. With DEBUG on, a file
+whose mtime changed is re-read on its next request.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import re
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import get_route_path
+from starlette.types import Receive, Scope, Send
+
+from app.config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is still served
+    brotli = None
+
+settings = get_settings()
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+STATIC_PREFIX = "/static"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+DIGEST_LENGTH = 12
+# Precompress only where it pays off; images and fonts are already compressed
+COMPRESSIBLE = {"text/css", "text/javascript", "application/javascript", "application/json", "image/svg+xml"}
+MIN_COMPRESS_BYTES = 512
+
+_FINGERPRINT = re.compile(rf"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{{{DIGEST_LENGTH}}})(?P<suffix>\.[^./]+)$")
+
+
+class Asset(NamedTuple):
+    digest: str
+    media_type: str
+    mtime_ns: int
+    identity: bytes
+    gzip: bytes | None
+    br: bytes | None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+
+def load_asset(file: Path) -> Asset:
+    body = file.read_bytes()
+    media_type = mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+    compress = media_type in COMPRESSIBLE and len(body) >= MIN_COMPRESS_BYTES
+    return Asset(
+        digest=hashlib.sha256(body).hexdigest()[:DIGEST_LENGTH],
+        media_type=media_type,
+        mtime_ns=file.stat().st_mtime_ns,
+        identity=body,
+        gzip=gzip.compress(body, compresslevel=9, mtime=0) if compress else None,
+        br=brotli.compress(body, quality=11) if compress and brotli else None,
+    )
+
+
+def fingerprinted(path: str, digest: str) -> str:
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot and "/" not in suffix else f"{path}.{digest}"
+
+
+def pick_encoding(asset: Asset, accept_encoding: str) -> tuple[bytes, str | None]:
+    accepted = {token.split(";")[0].strip() for token in accept_encoding.lower().split(",")}
+    if asset.br is not None and "br" in accepted:
+        return asset.br, "br"
+    if asset.gzip is not None and "gzip" in accepted:
+        return asset.gzip, "gzip"
+    return asset.identity, None
+
+
+class StaticAssets:
+    """ASGI app serving `directory` from memory; mount it and use url() for links."""
+
+    def __init__(self, directory: Path = STATIC_DIR, prefix: str = STATIC_PREFIX, reload: bool = False) -> None:
+        self.directory = Path(directory).resolve()
+        self.prefix = prefix
+        self.reload = reload
+        self._lock = threading.Lock()
+        self._assets: dict[str, Asset] = {}
+        for file in sorted(self.directory.rglob("*")):
+            if file.is_file():
+                self._assets[file.relative_to(self.directory).as_posix()] = load_asset(file)
+
+    def url(self, path: str) -> str:
+        """Fingerprinted URL for `path` (relative to the static directory)."""
+        path = path.lstrip("/")
+        asset = self.get(path)
+        if asset is None:
+            raise KeyError(f"unknown static asset: {path}")
+        return f"{self.prefix}/{fingerprinted(path, asset.digest)}"
+
+    def get(self, path: str) -> Asset | None:
+        asset = self._assets.get(path)
+        if self.reload:
+            asset = self._refresh(path, asset)
+        return asset
+
+    def _refresh(self, path: str, asset: Asset | None) -> Asset | None:
+        file = (self.directory / path).resolve()
+        if not file.is_relative_to(self.directory) or not file.is_file():
+            return asset
+        if asset is None or file.stat().st_mtime_ns != asset.mtime_ns:
+            asset = load_asset(file)
+            with self._lock:
+                self._assets[path] = asset
+        return asset
+
+    def resolve(self, path: str) -> tuple[Asset | None, bool]:
+        """The asset for a request path, and whether the path carried its current hash."""
+        asset = self.get(path)
+        if asset is not None:
+            return asset, False
+        match = _FINGERPRINT.match(path)
+        if match is None:
+            return None, False
+        asset = self.get(match["stem"] + match["suffix"])
+        if asset is None:
+            return None, False
+        return asset, asset.digest == match["digest"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.response(scope)(scope, receive, send)
+
+    def response(self, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD"):
+            return PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        asset, current = self.resolve(get_route_path(scope).lstrip("/"))
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        request_headers = Headers(scope=scope)
+        headers = {
+            "Cache-Control": IMMUTABLE if current else REVALIDATE,
+            "ETag": asset.etag,
+            "Vary": "Accept-Encoding",
+        }
+        if asset.etag in (tag.strip() for tag in request_headers.get("if-none-match", "").split(",")):
+            return Response(status_code=304, headers=headers)
+
+        body, encoding = pick_encoding(asset, request_headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if scope["method"] == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+
+static_assets = StaticAssets(reload=settings.debug)
+
+
+def asset_url(path: str) -> str:
+    """Jinja global: `{{ asset_url('css/main.css') }}`."""
+    return static_assets.url(path)
@@ -0,0 +1,159 @@
+"""
+Platform statistics for the admin dashboard, maintained as the data changes.
+
+Row counts (users, sessions, laps, public sessions, events) are kept by an
+after_flush listener, so every ORM insert or delete — including cascades and
+the background importer — moves its counter in the same transaction. Upload
+paths call record_upload() for the per-day upload series and stored bytes.
+Reading is a handful of rows whatever the table sizes.
+
+Bulk `query.delete()` and raw SQL bypass the listener; recount() rebuilds the
+totals from the tables and the upload directory when they may have drifted.
+"""
+from __future__ import annotations
+
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import Table, event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as DbSession
+
+from app.config import get_settings
+from app.models.event import Event
+from app.models.lap import Lap
+from app.models.session import Session as SessionModel
+from app.models.stats import DailyStat, StatsCounter
+from app.models.user import User
+
+settings = get_settings()
+
+USERS = "users"
+SESSIONS = "sessions"
+LAPS = "laps"
+PUBLIC_SESSIONS = "public_sessions"
+EVENTS = "events"
+STORAGE_BYTES = "storage_bytes"
+UPLOADS = "uploads"
+
+COUNTER_SHARDS = 8
+
+_COUNTED = {User: USERS, SessionModel: SESSIONS, Lap: LAPS, Event: EVENTS}
+# Exact queries used by recount() and, on SQLite, for counters that have no rows yet
+_EXACT = {
+    USERS: select(func.count()).select_from(User),
+    SESSIONS: select(func.count()).select_from(SessionModel),
+    LAPS: select(func.count()).select_from(Lap),
+    PUBLIC_SESSIONS: select(func.count()).select_from(SessionModel).where(SessionModel.is_public == True),  # noqa: E712
+    EVENTS: select(func.count()).select_from(Event),
+}
+
+
+def add(db: DbSession, name: str, delta: int) -> None:
+    """Move counter `name` by `delta` within the current transaction."""
+    if delta:
+        _increment(db, StatsCounter.__table__, {"name": name, "shard": random.randrange(COUNTER_SHARDS)}, delta)
+
+
+def add_daily(db: DbSession, name: str, delta: int, day: date | None = None) -> None:
+    if delta:
+        _increment(db, DailyStat.__table__, {"name": name, "day": day or _today()}, delta)
+
+
+def record_upload(db: DbSession, nbytes: int) -> None:
+    add(db, STORAGE_BYTES, nbytes)
+    add_daily(db, UPLOADS, 1)
+
+
+def snapshot(db: DbSession, days: int = 30) -> dict:
+    """Dashboard totals plus the last `days` of uploads; `estimated` lists planner-estimated values."""
+    totals = dict(db.execute(select(StatsCounter.name, func.sum(StatsCounter.value)).group_by(StatsCounter.name)).all())
+    result: dict = {}
+    estimated = []
+    for name in _EXACT:
+        if name in totals:
+            result[name] = int(totals[name])
+        else:
+            result[name] = _fallback(db, name)
+            if db.get_bind().dialect.name == "postgresql":
+                estimated.append(name)
+    result[STORAGE_BYTES] = int(totals.get(STORAGE_BYTES, 0))
+
+    since = _today() - timedelta(days=days - 1)
+    per_day = dict(db.execute(
+        select(DailyStat.day, DailyStat.value).where(DailyStat.name == UPLOADS, DailyStat.day >= since)
+    ).all())
+    result["uploads_per_day"] = [
+        {"day": d.isoformat(), "uploads": int(per_day.get(d, 0))}
+        for d in (since + timedelta(days=i) for i in range(days))
+    ]
+    result["estimated"] = estimated
+    return result
+
+
+def recount(db: DbSession) -> dict[str, int]:
+    """Rebuild every counter exactly: COUNT(*) per table and a walk of the upload directory.
+
+    Scans everything, so run it from the admin endpoint or a scheduled job, not per request.
+    """
+    exact = {name: db.scalar(query) for name, query in _EXACT.items()}
+    exact[STORAGE_BYTES] = _stored_upload_bytes()
+    db.execute(StatsCounter.__table__.delete().where(StatsCounter.name.in_(exact)))
+    db.execute(StatsCounter.__table__.insert(), [{"name": n, "shard": 0, "value": v} for n, v in exact.items()])
+    return exact
+
+
+@event.listens_for(DbSession, "after_flush")
+def _count_changes(db: DbSession, _flush_context) -> None:
+    # after_flush still sees the pre-flush new/deleted sets and attribute history
+    deltas: dict[str, int] = {}
+    for objects, sign in ((db.new, 1), (db.deleted, -1)):
+        for obj in objects:
+            name = _COUNTED.get(type(obj))
+            if name is None:
+                continue
+            deltas[name] = deltas.get(name, 0) + sign
+            if name == SESSIONS and inspect(obj).dict.get("is_public"):
+                deltas[PUBLIC_SESSIONS] = deltas.get(PUBLIC_SESSIONS, 0) + sign
+    for obj in db.dirty:
+        if isinstance(obj, SessionModel) and obj not in db.deleted:
+            history = inspect(obj).attrs.is_public.history
+            if history.has_changes():
+                now_public, was_public = any(history.added), any(history.deleted)
+                deltas[PUBLIC_SESSIONS] = deltas.get(PUBLIC_SESSIONS, 0) + now_public - was_public
+    for name, delta in deltas.items():
+        add(db, name, delta)
+
+
+def _increment(db: DbSession, table: Table, key: dict, delta: int) -> None:
+    dialect = db.get_bind().dialect.name
+    insert = {"postgresql": pg_insert, "sqlite": sqlite_insert}[dialect]
+    stmt = insert(table).values(**key, value=delta)
+    stmt = stmt.on_conflict_do_update(index_elements=list(key), set_={"value": table.c.value + delta})
+    db.connection().execute(stmt)
+
+
+def _fallback(db: DbSession, name: str) -> int | None:
+    """A value for a counter with no rows: the planner's row estimate on Postgres, else an exact count."""
+    if db.get_bind().dialect.name != "postgresql":
+        return db.scalar(_EXACT[name])
+    if name == PUBLIC_SESSIONS:
+        return None  # no per-predicate estimate; recount() fills it in
+    # reltuples is -1 until the table is first vacuumed or analyzed
+    estimate = db.scalar(text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:t)"), {"t": name})
+    return max(int(estimate), 0) if estimate is not None else None
+
+
+def _stored_upload_bytes() -> int:
+    """Bytes of uploaded files on disk, excluding derived level-of-detail pyramids."""
+    total = 0
+    for root, dirs, files in os.walk(settings.upload_dir):
+        dirs[:] = [d for d in dirs if d != "lod"]
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
@@ -34,6 +34,16 @@ async def save_telemetry_file(file: UploadFile, lap_id: int) -> str:
     return dest
 
 
-def delete_file(path: str) -> None:
+def pyramid_dir(file_path: str, lap_number: int) -> str:
+    """Directory holding the level-of-detail pyramid for one lap of a telemetry file."""
+    base = os.path.basename(file_path)
+    return os.path.join(os.path.dirname(file_path), "lod", f"{base}.lap{lap_number}")
+
+
+def delete_file(path: str) -> int:
+    """Remove an uploaded file; returns the bytes freed."""
     if path and os.path.exists(path):
+        size = os.path.getsize(path)
         os.remove(path)
+        return size
+    return 0
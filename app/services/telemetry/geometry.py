@@ -0,0 +1,77 @@
+"""
+GPS polyline simplification for map rendering.
+
+Tracks are simplified with Douglas–Peucker on a local equirectangular
+projection (metres), which is accurate to well under a metre over the extent
+of a circuit. Points keep their original [time, lat, lon, alt] form so the
+simplified track can be windowed by time like the full one.
+"""
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# Tolerances (metres) precomputed at import. Map views pick the coarsest level
+# at or below the tolerance they ask for.
+SIMPLIFY_TOLERANCES_M = (1.0, 4.0, 16.0)
+
+_EARTH_RADIUS_M = 6_371_000.0
+
+
+def simplify_track(points: list[list[float]], tolerance_m: float) -> list[list[float]]:
+    if len(points) < 3 or tolerance_m <= 0:
+        return points
+    xy = _project(points)
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        a, b = xy[first], xy[last]
+        seg = xy[first + 1:last]
+        ab = b - a
+        norm = math.hypot(ab[0], ab[1])
+        if norm == 0.0:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(ab[0] * (seg[:, 1] - a[1]) - ab[1] * (seg[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance_m:
+            mid = first + 1 + i
+            keep[mid] = True
+            stack.append((first, mid))
+            stack.append((mid, last))
+
+    return [p for p, k in zip(points, keep) if k]
+
+
+def simplify_levels(points: list[list[float]] | None) -> dict[str, list[list[float]]] | None:
+    """Simplified copies of `points` keyed by tolerance (str, for JSON storage)."""
+    if not points:
+        return None
+    return {_key(t): simplify_track(points, t) for t in SIMPLIFY_TOLERANCES_M}
+
+
+def pick_level(
+    levels: dict[str, list[list[float]]],
+    tolerance_m: float,
+) -> list[list[float]] | None:
+    """The coarsest stored level within `tolerance_m`; None if none qualifies."""
+    usable = [t for t in SIMPLIFY_TOLERANCES_M if t <= tolerance_m and _key(t) in levels]
+    return levels[_key(max(usable))] if usable else None
+
+
+def _key(tolerance_m: float) -> str:
+    return f"{tolerance_m:g}"
+
+
+def _project(points: list[list[float]]) -> np.ndarray:
+    arr = np.asarray([(p[1], p[2]) for p in points], dtype=np.float64)
+    lat0 = math.radians(arr[0, 0])
+    y = np.radians(arr[:, 0] - arr[0, 0]) * _EARTH_RADIUS_M
+    x = np.radians(arr[:, 1] - arr[0, 1]) * _EARTH_RADIUS_M * math.cos(lat0)
+    return np.column_stack([x, y])
@@ -0,0 +1,148 @@
+"""
+Single-lap telemetry extraction.
+
+Functions here run inside the compute process pool, so they take a picklable
+LapRef snapshot instead of an ORM object bound to a request's DB session.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from typing import Any, NamedTuple
+
+from app.schemas.telemetry import TelemetryData, TelemetryChannel
+from app.services.telemetry.comparator import speed_to_distance_m
+from app.services.telemetry.parser import parse
+
+
+class LapRef(NamedTuple):
+    """The Lap columns needed to locate and describe a lap's telemetry."""
+    id: int
+    lap_number: int
+    lap_time_ms: int | None
+    telemetry_file_path: str | None
+    telemetry_format: str | None
+    gps_track: list | None
+
+    @classmethod
+    def from_lap(cls, lap, gps_tolerance_m: float | None = None) -> "LapRef":
+        """Snapshot `lap`, swapping in its simplified track when a tolerance is given."""
+        return cls(
+            id=lap.id,
+            lap_number=lap.lap_number,
+            lap_time_ms=lap.lap_time_ms,
+            telemetry_file_path=lap.telemetry_file_path,
+            telemetry_format=lap.telemetry_format,
+            gps_track=lap.gps_track_for(gps_tolerance_m),
+        )
+
+
+def load_lap(file_path: str, fmt: str, lap_number: int) -> dict[str, Any] | None:
+    """Parse a session file and return the dict for `lap_number`.
+
+    Falls back to the first lap for single-lap files, which number their only lap 0.
+    """
+    all_laps = parse(file_path, fmt)
+    lap_data = next((d for d in all_laps if d["lap_number"] == lap_number), None)
+    if lap_data is None and all_laps:
+        lap_data = all_laps[0]
+    return lap_data
+
+
+class TelemetryQuery(NamedTuple):
+    """Which slice of a lap to return. Defaults select everything at full rate."""
+    channels: tuple[str, ...] | None = None
+    start: float | None = None
+    end: float | None = None
+    axis: str = "time"              # "time" (s) or "distance" (m)
+    points: int | None = None       # target samples per channel after decimation
+    include_gps: bool = True
+    include_distance: bool = True
+
+
+def build_lap_telemetry(ref: LapRef, query: TelemetryQuery = TelemetryQuery()) -> TelemetryData:
+    lap_data = load_lap(ref.telemetry_file_path, ref.telemetry_format, ref.lap_number)
+    if not lap_data:
+        raise LookupError("Lap not found in telemetry file")
+    all_channels = lap_data["channels"]
+
+    # Cumulative distance from speed_gps (or speed_obd). It is a prefix sum, so when
+    # the window is in time we only integrate up to the window's end.
+    speed_ch = all_channels.get("speed_gps") or all_channels.get("speed_obd")
+    speed_ts: list[float] | None = None
+    distance: list[float] | None = None
+    if ((query.include_distance or query.axis == "distance")
+            and speed_ch and speed_ch.get("data") and speed_ch.get("timestamps")):
+        speed_ts = speed_ch["timestamps"]
+        n = len(speed_ts)
+        if query.axis == "time" and query.end is not None:
+            n = bisect_right(speed_ts, query.end)
+        distance = speed_to_distance_m(speed_ts[:n], speed_ch["data"][:n])
+
+    t_lo, t_hi = query.start, query.end
+    if query.axis == "distance" and (t_lo is not None or t_hi is not None):
+        if distance is None:
+            raise ValueError("Lap has no speed channel to derive a distance axis")
+        if t_lo is not None:
+            t_lo = speed_ts[min(bisect_left(distance, t_lo), len(speed_ts) - 1)]
+        if t_hi is not None:
+            t_hi = speed_ts[max(bisect_right(distance, t_hi) - 1, 0)]
+
+    channels = []
+    for name, ch in all_channels.items():
+        if query.channels and name not in query.channels:
+            continue
+        i0, i1 = _window(ch["timestamps"], t_lo, t_hi)
+        idx = _sample_indices(i1 - i0, query.points)
+        channels.append(TelemetryChannel(
+            name=name,
+            unit=ch.get("unit"),
+            data=_take(ch["data"], i0, idx),
+            timestamps=_take(ch["timestamps"], i0, idx),
+        ))
+
+    distance_m: list[float] | None = None
+    if query.include_distance and distance is not None:
+        i0, i1 = _window(speed_ts[:len(distance)], t_lo, t_hi)
+        distance_m = _take(distance, i0, _sample_indices(i1 - i0, query.points))
+
+    gps_track = None
+    if query.include_gps:
+        gps_track = ref.gps_track or lap_data.get("gps_track")
+        if gps_track and (t_lo is not None or t_hi is not None):
+            i0 = 0 if t_lo is None else bisect_left(gps_track, t_lo, key=_point_time)
+            i1 = len(gps_track) if t_hi is None else bisect_right(gps_track, t_hi, key=_point_time)
+            gps_track = gps_track[i0:i1]
+
+    return TelemetryData(
+        lap_id=ref.id,
+        lap_time_ms=ref.lap_time_ms,
+        sample_rate_hz=lap_data.get("sample_rate_hz"),
+        channels=channels,
+        gps_track=gps_track,
+        distance_m=distance_m,
+    )
+
+
+def _window(timestamps: list[float], t_lo: float | None, t_hi: float | None) -> tuple[int, int]:
+    """Index range [i0, i1) of the sorted `timestamps` that fall inside [t_lo, t_hi]."""
+    i0 = 0 if t_lo is None else bisect_left(timestamps, t_lo)
+    i1 = len(timestamps) if t_hi is None else bisect_right(timestamps, t_hi)
+    return i0, max(i0, i1)
+
+
+def _sample_indices(n: int, points: int | None) -> range | list[int]:
+    """Evenly spaced offsets into a slice of length `n`, keeping both endpoints."""
+    if points is None or n <= points:
+        return range(n)
+    step = (n - 1) / (points - 1)
+    return [round(i * step) for i in range(points)]
+
+
+def _take(values: list[float], offset: int, idx: range | list[int]) -> list[float]:
+    if isinstance(idx, range):
+        return values[offset:offset + len(idx)]
+    return [values[offset + i] for i in idx]
+
+
+def _point_time(point: list[float]) -> float:
+    return point[0]
@@ -7,6 +7,8 @@ from __future__ import annotations
 import logging
 from app.database import SessionLocal
 from app.models.lap import Lap
+from app.models.session import Session
+from app.services.leaderboard import refresh_best_laps
 from app.services.telemetry.parser import parse
 
 logger = logging.getLogger(__name__)
@@ -51,6 +53,8 @@ def extract_lap_summary(lap_id: int, file_path: str, fmt: str) -> None:
             for name, ch in channels.items()
         }
 
+        session = db.get(Session, lap.session_id)
+        refresh_best_laps(db, session.user_id, session.track_configuration_id)
         db.commit()
     except Exception:
         logger.exception("Failed to process telemetry for lap %s", lap_id)
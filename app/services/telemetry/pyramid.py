@@ -0,0 +1,147 @@
+"""
+Level-of-detail pyramid for zoomable telemetry charts.
+
+For every channel of a lap we store min/max/mean per bucket at power-of-two
+bucket sizes (1, 2, 4, … samples) until fewer than _MIN_BUCKETS remain. Each
+channel is one float32 .npy file laid out as rows [t, min, max, mean] with all
+levels concatenated along the columns, so a level slice of any row is
+contiguous and can be binary-searched straight off a memory map.
+
+A request for a time range and pixel width picks the finest level that fits
+the width, so cost depends on the width, not on the raw sample count. Widths
+narrower than the coarsest level are served by merging its buckets on read.
+"""
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+import numpy as np
+
+from app.schemas.telemetry import LodChannel
+from app.services.storage import pyramid_dir
+from app.services.telemetry.comparator import speed_to_distance_m
+from app.services.telemetry.lap_telemetry import LapRef, load_lap
+
+# Stop adding coarser levels once a level has at most this many buckets
+_MIN_BUCKETS = 64
+_INDEX = "index.json"
+
+
+def build_lap_pyramid(ref: LapRef) -> None:
+    """Backfill the pyramid for a lap imported before pyramids existed."""
+    lap_data = load_lap(ref.telemetry_file_path, ref.telemetry_format, ref.lap_number)
+    if not lap_data:
+        raise LookupError("Lap not found in telemetry file")
+    write_pyramid(pyramid_dir(ref.telemetry_file_path, ref.lap_number), lap_data)
+
+
+def write_pyramid(directory: str, lap_data: dict[str, Any]) -> None:
+    os.makedirs(directory, exist_ok=True)
+    series = {
+        name: (ch.get("unit"), ch["timestamps"], ch["data"])
+        for name, ch in lap_data.get("channels", {}).items()
+    }
+    speed = series.get("speed_gps") or series.get("speed_obd")
+    if speed and speed[1]:
+        series["distance_m"] = ("m", speed[1], speed_to_distance_m(speed[1], speed[2]))
+
+    index: dict[str, Any] = {"channels": []}
+    for i, (name, (unit, ts, data)) in enumerate(series.items()):
+        n = min(len(ts), len(data))
+        if n == 0:
+            continue
+        table, levels = _build_levels(np.asarray(ts[:n], dtype=np.float64),
+                                      np.asarray(data[:n], dtype=np.float64))
+        filename = f"c{i}.npy"
+        np.save(os.path.join(directory, filename), table)
+        index["channels"].append({"name": name, "unit": unit, "file": filename, "levels": levels})
+
+    # The index is written last and atomically; its presence marks a complete pyramid.
+    tmp = os.path.join(directory, _INDEX + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(directory, _INDEX))
+
+
+def read_pyramid(
+    directory: str,
+    channels: tuple[str, ...] | None,
+    start: float | None,
+    end: float | None,
+    width: int,
+) -> list[LodChannel] | None:
+    """Return buckets for [start, end] at the finest level with at most `width` buckets.
+
+    Returns None when no pyramid has been written for the lap yet.
+    """
+    try:
+        with open(os.path.join(directory, _INDEX)) as f:
+            index = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    out = []
+    for meta in index["channels"]:
+        if channels and meta["name"] not in channels:
+            continue
+        table = np.load(os.path.join(directory, meta["file"]), mmap_mode="r")
+        for offset, count, bucket_size in meta["levels"]:
+            t = table[0, offset:offset + count]
+            # Include the bucket that straddles `start`
+            i0 = 0 if start is None else max(int(np.searchsorted(t, start, side="right")) - 1, 0)
+            i1 = count if end is None else int(np.searchsorted(t, end, side="right"))
+            if i1 - i0 <= width:
+                break
+        rows = np.asarray(table[:, offset + i0:offset + max(i0, i1)], dtype=np.float64)
+        if rows.shape[1] > width:
+            # Narrower than the coarsest stored level (at most _MIN_BUCKETS buckets)
+            rows, merged = _merge_buckets(rows, width)
+            bucket_size *= merged
+        out.append(LodChannel(
+            name=meta["name"],
+            unit=meta["unit"],
+            bucket_size=bucket_size,
+            timestamps=rows[0].tolist(),
+            min=rows[1].tolist(),
+            max=rows[2].tolist(),
+            mean=rows[3].tolist(),
+        ))
+    return out
+
+
+def _merge_buckets(rows: np.ndarray, width: int) -> tuple[np.ndarray, int]:
+    """Merge every `factor` adjacent buckets so at most `width` remain; returns (rows, factor)."""
+    factor = -(-rows.shape[1] // width)
+    starts = np.arange(0, rows.shape[1], factor)
+    counts = np.diff(np.append(starts, rows.shape[1]))
+    merged = np.vstack([
+        rows[0, starts],
+        np.minimum.reduceat(rows[1], starts),
+        np.maximum.reduceat(rows[2], starts),
+        # Buckets of one level hold equal sample counts, bar a short last one
+        np.add.reduceat(rows[3], starts) / counts,
+    ])
+    return merged, factor
+
+
+def _build_levels(ts: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, list[list[int]]]:
+    """Stack every level into one (4, total) float32 table plus [offset, count, bucket] entries."""
+    blocks = [np.vstack([ts, values, values, values])]
+    levels = [[0, len(ts), 1]]
+    offset = len(ts)
+    bucket = 2
+    while levels[-1][1] > _MIN_BUCKETS:
+        starts = np.arange(0, len(ts), bucket)
+        counts = np.diff(np.append(starts, len(ts)))
+        blocks.append(np.vstack([
+            ts[starts],
+            np.minimum.reduceat(values, starts),
+            np.maximum.reduceat(values, starts),
+            np.add.reduceat(values, starts) / counts,
+        ]))
+        levels.append([offset, len(starts), bucket])
+        offset += len(starts)
+        bucket *= 2
+    return np.hstack(blocks).astype(np.float32), levels
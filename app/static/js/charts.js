@@ -1,5 +1,17 @@
 /**
  * charts.js — helpers for rendering telemetry channel charts via Chart.js
+ *
+ * Every chart plots {x, y} points on a numeric linear x axis with parsing
+ * disabled, and Chart.js' min-max decimation draws at most a few points per
+ * pixel column. A 100k-sample channel then costs about as much as a
+ * 1k-sample one. Charts are registered with a ChartGroup. The group builds
+ * each chart only when its canvas nears the viewport, and keeps one cursor
+ * and one zoom range for all of them.
+ *
+ * Fetching, JSON decoding and downsampling run in telemetry_worker.js. The
+ * worker returns each trace as typed arrays, already cut down to about one
+ * min-max pair per screen pixel. When the charts zoom, the group asks the
+ * worker for the visible range again at full detail.
  */
 
 const CHANNEL_COLORS = [
@@ -7,84 +19,343 @@ const CHANNEL_COLORS = [
   "#f4a261", "#a8dadc", "#6d6875", "#b5838d",
 ];
 
+const AXIS_COLOR = "#7a7d90";
+const GRID_COLOR = "#2a2d3a";
+const LEGEND_COLOR = "#e0e0e8";
+
+const fmtMetres = v => Math.round(v) + " m";
+const fmtSeconds = v => v.toFixed(1) + " s";
+
+/**
+ * Pair an x array with a y array as the points Chart.js reads without parsing.
+ * @param {ArrayLike<number>} xs  - sorted x values
+ * @param {ArrayLike<number>} ys  - y values, same length
+ */
+function toPoints(xs, ys) {
+  const n = Math.min(xs.length, ys.length);
+  const points = new Array(n);
+  for (let i = 0; i < n; i++) points[i] = { x: xs[i], y: ys[i] };
+  return points;
+}
+
+/** A line dataset; straight segments, since curves cost more and are invisible at this density. */
+function traceDataset(label, points, color, borderWidth = 1.5) {
+  return { label, data: points, borderColor: color, borderWidth, pointRadius: 0, tension: 0, fill: false };
+}
+
+/** A line dataset for series `key` of a LoadedTelemetry; the group refines it on zoom. */
+function seriesDataset(label, loaded, key, color, borderWidth = 1.5) {
+  const { x, y } = loaded.series[key];
+  return { ...traceDataset(label, toPoints(x, y), color, borderWidth), seriesKey: key };
+}
+
+// Buckets per trace: about one min-max pair per device pixel across the screen
+const SAMPLES_PER_TRACE = Math.ceil(screen.width * (window.devicePixelRatio || 1));
+
+// Pages pass the worker's fingerprinted URL as data-worker on this script tag
+const WORKER_URL = document.currentScript?.dataset.worker || "/static/js/telemetry_worker.js";
+
+/** Client for telemetry_worker.js; one per page. */
+class TelemetryWorker {
+  constructor(url = WORKER_URL) {
+    this.worker = new Worker(url);
+    this.calls = new Map();
+    this.nextCall = 1;
+    this.worker.onmessage = ({ data }) => {
+      const call = this.calls.get(data.call);
+      this.calls.delete(data.call);
+      if (call) data.error ? call.reject(data.error) : call.resolve(data.result);
+    };
+  }
+
+  /**
+   * Fetch `url` and decode it as "telemetry" (TelemetryData) or "compare" (CompareResult).
+   * Resolves to a LoadedTelemetry; rejects with {status, detail} on an error response.
+   */
+  async load(kind, url, init = {}) {
+    const { source, meta, series } = await this._call({ type: "load", kind, url, init, points: SAMPLES_PER_TRACE });
+    return new LoadedTelemetry(this, source, meta, series);
+  }
+
+  _call(message) {
+    const call = this.nextCall++;
+    return new Promise((resolve, reject) => {
+      this.calls.set(call, { resolve, reject });
+      this.worker.postMessage({ ...message, call });
+    });
+  }
+}
+
+/** A decoded response: `meta` names series keys, `series` holds their sampled typed arrays. */
+class LoadedTelemetry {
+  constructor(worker, source, meta, series) {
+    this.worker = worker;
+    this.source = source;
+    this.meta = meta;
+    this.series = series;
+  }
+
+  /** `keys` resampled over `range` ({min, max}, or null for everything); resolves to {key: {x, y}}. */
+  async window(keys, range) {
+    const { series } = await this.worker._call({
+      type: "window", source: this.source, keys,
+      min: range ? range.min : null, max: range ? range.max : null, points: SAMPLES_PER_TRACE,
+    });
+    return series;
+  }
+
+  /** Free the full-resolution arrays held by the worker. */
+  drop() {
+    this.worker.worker.postMessage({ type: "drop", source: this.source });
+  }
+}
+
+/**
+ * Options for a line chart on a linear x axis.
+ * @param {object}   opts
+ * @param {string}   opts.xLabel        - x axis title
+ * @param {function} opts.fmtX          - formats x ticks and tooltip titles
+ * @param {string}   [opts.yLabel]      - y axis title
+ * @param {boolean}  [opts.legend]      - show the dataset legend
+ * @param {function} [opts.tooltipLabel]
+ */
+function lineChartOptions({ xLabel, fmtX, yLabel, legend = false, tooltipLabel } = {}) {
+  const tooltipCallbacks = { title: items => (items.length ? fmtX(items[0].parsed.x) : "") };
+  if (tooltipLabel) tooltipCallbacks.label = tooltipLabel;
+  return {
+    animation: false,
+    responsive: true,
+    parsing: false,     // data is already {x, y}
+    normalized: true,   // ...and sorted by x, so no scanning for min/max order
+    spanGaps: true,
+    interaction: { mode: "nearest", axis: "x", intersect: false },
+    plugins: {
+      decimation: { enabled: true, algorithm: "min-max" },
+      legend: legend ? { labels: { color: LEGEND_COLOR } } : { display: false },
+      tooltip: { callbacks: tooltipCallbacks },
+    },
+    scales: {
+      x: {
+        type: "linear",
+        title: { display: Boolean(xLabel), text: xLabel, color: AXIS_COLOR },
+        ticks: { maxTicksLimit: 12, color: AXIS_COLOR, callback: v => fmtX(v) },
+        grid: { color: GRID_COLOR },
+      },
+      y: {
+        title: { display: Boolean(yLabel), text: yLabel, color: AXIS_COLOR },
+        ticks: { color: AXIS_COLOR },
+        grid: { color: GRID_COLOR },
+      },
+    },
+  };
+}
+
+/**
+ * Charts sharing one x cursor and one zoom range, created lazily.
+ *
+ * Moving the cursor only redraws the other charts (chart.draw), so their
+ * datasets are not processed again. Dragging across a chart zooms every
+ * chart to that x range, and a double click resets it. With a `source`
+ * (LoadedTelemetry), zoomed charts swap their seriesDataset data for the
+ * worker's resample of the visible range.
+ */
+class ChartGroup {
+  constructor({ rootMargin = "300px 0px", source = null } = {}) {
+    this.charts = new Set();
+    this.pending = new Map();  // canvas -> () => Chart.js config
+    this.cursorX = null;
+    this.range = null;         // {min, max}, or null for the full extent
+    this.frame = null;
+    this.source = source;
+    this.refinement = 0;       // bumped per zoom; stale resamples are dropped
+    this.observer = new IntersectionObserver(entries => this._build(entries), { rootMargin });
+  }
+
+  /**
+   * Create a chart on `canvas` from `makeConfig()` once the canvas is near the viewport.
+   * The config is built late too, so off-screen charts never allocate their points.
+   */
+  add(canvas, makeConfig) {
+    this.pending.set(canvas, makeConfig);
+    this.observer.observe(canvas);
+  }
+
+  /** Zoom every chart to [min, max] on x; no arguments resets to the full extent. */
+  zoom(min, max) {
+    this.range = min == null ? null : { min, max };
+    for (const chart of this.charts) {
+      chart.options.scales.x.min = this.range?.min;
+      chart.options.scales.x.max = this.range?.max;
+      chart.update("none");
+    }
+    this._refine([...this.charts]);
+  }
+
+  destroy() {
+    this.observer.disconnect();
+    this.pending.clear();
+    for (const chart of this.charts) chart.destroy();
+    this.charts.clear();
+    if (this.frame) cancelAnimationFrame(this.frame);
+    if (this.source) this.source.drop();
+  }
+
+  async _refine(charts) {
+    if (!this.source || !charts.length) return;
+    const refinement = this.refinement = this.refinement + 1;
+    const keys = charts.flatMap(c => c.data.datasets.map(d => d.seriesKey).filter(Boolean));
+    const series = await this.source.window(keys, this.range);
+    if (refinement !== this.refinement) return;  // zoomed again meanwhile
+    for (const chart of charts) {
+      if (!this.charts.has(chart)) continue;
+      for (const dataset of chart.data.datasets) {
+        const s = series[dataset.seriesKey];
+        if (s) dataset.data = toPoints(s.x, s.y);
+      }
+      chart.update("none");
+    }
+  }
+
+  _build(entries) {
+    for (const entry of entries) {
+      if (!entry.isIntersecting) continue;
+      const canvas = entry.target;
+      const makeConfig = this.pending.get(canvas);
+      this.observer.unobserve(canvas);
+      this.pending.delete(canvas);
+      if (!makeConfig) continue;
+
+      const config = makeConfig();
+      config.plugins = [...(config.plugins || []), this._syncPlugin()];
+      if (this.range) Object.assign(config.options.scales.x, this.range);
+      const chart = new Chart(canvas, config);
+      this.charts.add(chart);
+      this._bindZoom(chart);
+      if (this.range) this._refine([chart]);
+    }
+  }
+
+  _setCursor(x, source) {
+    this.cursorX = x;
+    if (this.frame) return;
+    // One redraw per frame however fast the mouse moves
+    this.frame = requestAnimationFrame(() => {
+      this.frame = null;
+      for (const chart of this.charts) if (chart !== source) chart.draw();
+    });
+  }
+
+  _syncPlugin() {
+    const group = this;
+    return {
+      id: "chartGroupSync",
+      afterEvent(chart, args) {
+        const { type, x } = args.event;
+        if (type === "mousemove" && args.inChartArea) {
+          group._setCursor(chart.scales.x.getValueForPixel(x), chart);
+          if (chart.$drag) chart.$drag.to = x;
+          args.changed = true;
+        } else if (type === "mouseout") {
+          group._setCursor(null, chart);
+          chart.$drag = null;
+          args.changed = true;
+        }
+      },
+      afterDraw(chart) {
+        const { ctx, chartArea: { top, bottom, left, right } } = chart;
+        ctx.save();
+        if (chart.$drag) {
+          const from = Math.max(left, Math.min(chart.$drag.from, chart.$drag.to));
+          const to = Math.min(right, Math.max(chart.$drag.from, chart.$drag.to));
+          ctx.fillStyle = "rgba(224, 224, 232, 0.12)";
+          ctx.fillRect(from, top, to - from, bottom - top);
+        }
+        if (group.cursorX != null) {
+          const px = chart.scales.x.getPixelForValue(group.cursorX);
+          if (px >= left && px <= right) {
+            ctx.strokeStyle = "rgba(224, 224, 232, 0.5)";
+            ctx.lineWidth = 1;
+            ctx.beginPath();
+            ctx.moveTo(px, top);
+            ctx.lineTo(px, bottom);
+            ctx.stroke();
+          }
+        }
+        ctx.restore();
+      },
+    };
+  }
+
+  _bindZoom(chart) {
+    const canvas = chart.canvas;
+    canvas.addEventListener("mousedown", e => {
+      const { x } = Chart.helpers.getRelativePosition(e, chart);
+      chart.$drag = { from: x, to: x };
+    });
+    canvas.addEventListener("mouseup", () => {
+      const drag = chart.$drag;
+      chart.$drag = null;
+      if (!drag || Math.abs(drag.to - drag.from) < 5) {
+        chart.draw();
+        return;
+      }
+      const scale = chart.scales.x;
+      const a = scale.getValueForPixel(Math.min(drag.from, drag.to));
+      const b = scale.getValueForPixel(Math.max(drag.from, drag.to));
+      this.zoom(Math.max(a, scale.min), Math.min(b, scale.max));
+    });
+    canvas.addEventListener("dblclick", () => this.zoom());
+  }
+}
+
 /**
  * Render one canvas chart per telemetry channel.
- * @param {object} telemetryData  - TelemetryData schema object
- * @param {HTMLElement} container - grid container element
+ * @param {LoadedTelemetry} loaded - TelemetryWorker.load("telemetry", ...) result
+ * @param {HTMLElement} container  - grid container element
+ * @param {ChartGroup} group       - group the charts join
  */
-function renderChannelCharts(telemetryData, container) {
+function renderChannelCharts(loaded, container, group) {
   container.innerHTML = "";
-  telemetryData.channels.forEach((ch, i) => {
+  const useDistance = loaded.meta.axis === "distance";
+  loaded.meta.channels.forEach((ch, i) => {
     const wrap = document.createElement("div");
     wrap.className = "chart-wrap";
     wrap.innerHTML = `<h3>${ch.name}${ch.unit ? " (" + ch.unit + ")" : ""}</h3><canvas></canvas>`;
     container.appendChild(wrap);
 
-    new Chart(wrap.querySelector("canvas"), {
+    group.add(wrap.querySelector("canvas"), () => ({
       type: "line",
-      data: {
-        labels: ch.timestamps.map(t => t.toFixed(2)),
-        datasets: [{
-          label: ch.name,
-          data: ch.data,
-          borderColor: CHANNEL_COLORS[i % CHANNEL_COLORS.length],
-          borderWidth: 1.5,
-          pointRadius: 0,
-          tension: 0.1,
-        }],
-      },
-      options: {
-        animation: false,
-        plugins: { legend: { display: false } },
-        scales: {
-          x: { ticks: { maxTicksLimit: 10, color: "#7a7d90" }, grid: { color: "#2a2d3a" } },
-          y: { ticks: { color: "#7a7d90" }, grid: { color: "#2a2d3a" } },
-        },
-      },
-    });
+      data: { datasets: [seriesDataset(ch.name, loaded, ch.series, CHANNEL_COLORS[i % CHANNEL_COLORS.length])] },
+      options: lineChartOptions({
+        xLabel: useDistance ? "Distance (m)" : "Time (s)",
+        fmtX: useDistance ? fmtMetres : fmtSeconds,
+      }),
+    }));
   });
 }
 
 /**
  * Render a delta-T chart comparing multiple laps against a reference.
- * @param {Array}        deltas    - array of LapDelta objects
+ * @param {LoadedTelemetry} loaded - TelemetryWorker.load("compare", ...) result
  * @param {HTMLElement}  canvas    - canvas element
+ * @param {ChartGroup}   group     - group the chart joins
+ * @param {Array}        [colors]  - line colours; the reference lap takes the first
  */
-function renderDeltaChart(deltas, canvas) {
-  const datasets = deltas.map((d, i) => ({
-    label: `Lap ${d.comparison_lap_id} vs Lap ${d.reference_lap_id}`,
-    data: d.delta_seconds,
-    borderColor: CHANNEL_COLORS[(i + 1) % CHANNEL_COLORS.length],
-    borderWidth: 2,
-    pointRadius: 0,
-    tension: 0.1,
-    fill: false,
-  }));
-
-  new Chart(canvas, {
+function renderDeltaChart(loaded, canvas, group, colors = CHANNEL_COLORS) {
+  group.add(canvas, () => ({
     type: "line",
     data: {
-      labels: deltas[0]?.timestamps.map(t => t.toFixed(2)) ?? [],
-      datasets,
+      datasets: loaded.meta.deltas.map((d, i) => seriesDataset(
+        `Lap ${d.comparison_lap_id} vs Lap ${d.reference_lap_id}`,
+        loaded, d.series, colors[(i + 1) % colors.length], 2,
+      )),
     },
-    options: {
-      animation: false,
-      plugins: {
-        legend: { labels: { color: "#e0e0e8" } },
-        tooltip: {
-          callbacks: {
-            label: ctx => `${ctx.dataset.label}: ${ctx.parsed.y > 0 ? "+" : ""}${ctx.parsed.y.toFixed(3)}s`,
-          },
-        },
-      },
-      scales: {
-        x: { ticks: { maxTicksLimit: 10, color: "#7a7d90" }, grid: { color: "#2a2d3a" } },
-        y: {
-          title: { display: true, text: "Delta (s)", color: "#7a7d90" },
-          ticks: { color: "#7a7d90" },
-          grid: { color: "#2a2d3a" },
-        },
-      },
-    },
-  });
+    options: lineChartOptions({
+      xLabel: "Distance (m)",
+      fmtX: fmtMetres,
+      yLabel: "Delta (s)",
+      legend: true,
+      tooltipLabel: ctx => `${ctx.dataset.label}: ${ctx.parsed.y > 0 ? "+" : ""}${ctx.parsed.y.toFixed(3)}s`,
+    }),
+  }));
 }
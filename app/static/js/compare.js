@@ -1,79 +1,156 @@
 /**
  * compare.js — lap comparison page logic
+ *
+ * The comparison is fetched and decoded by the telemetry worker (charts.js),
+ * so this thread only builds the legend, the map and the charts. Charts are
+ * registered with one ChartGroup. Only the charts scrolled into view are
+ * built, and the cursor and zoom are shared by all.
  */
-let deltaChartInstance = null;
+const LAP_COLORS = CHANNEL_COLORS;
+
+const CHANNEL_ORDER = ["speed_gps", "speed_obd", "throttle", "brake", "rpm", "accel_lat", "accel_lon"];
+const HIDDEN_CHANNELS = new Set(["manifold_pressure", "baro_pressure", "accel_vert", "altitude"]);
+const CHANNEL_LABELS = {
+  speed_gps: "Speed GPS (km/h)", speed_obd: "Speed OBD (km/h)",
+  throttle: "Throttle (%)", brake: "Brake",
+  rpm: "RPM", accel_lat: "Lateral G", accel_lon: "Longitudinal G",
+};
+
+const telemetry = new TelemetryWorker();
+let charts = null;
+let compareMap = null;
+
+// Pre-fill from query string
+const params = new URLSearchParams(location.search);
+if (params.get("laps")) {
+  document.getElementById("lap-ids-input").value = params.get("laps");
+  // Auto-run if lap IDs are pre-filled
+  window.addEventListener("DOMContentLoaded", () => runCompare());
+}
 
 async function runCompare() {
-  const raw = document.getElementById("lap-ids-input").value;
-  const lapIds = raw.split(",").map(s => parseInt(s.trim())).filter(Boolean);
-  if (lapIds.length < 2) {
-    alert("Enter at least 2 lap IDs separated by commas.");
+  const raw = document.getElementById("lap-ids-input").value.trim();
+  const lapIds = raw.split(",").map(s => parseInt(s.trim())).filter(n => !isNaN(n));
+  if (lapIds.length < 2) { showError("Enter at least 2 lap IDs to compare."); return; }
+
+  let loaded;
+  try {
+    loaded = await telemetry.load("compare", "/api/v1/laps/compare", {
+      method: "POST",
+      headers: { "Content-Type": "application/json", ...authHeaders() },
+      body: JSON.stringify({ lap_ids: lapIds, gps_tolerance_m: 1 }),
+    });
+  } catch (err) {
+    showError(err.detail || "Compare failed. Make sure the laps have telemetry data.");
     return;
   }
 
-  const res = await fetch("/api/v1/laps/compare", {
-    method: "POST",
-    headers: { "Content-Type": "application/json", ...authHeaders() },
-    body: JSON.stringify({ lap_ids: lapIds }),
-  });
+  hideError();
+  renderResults(loaded, lapIds);
+}
 
-  if (!res.ok) {
-    const err = await res.json();
-    alert(err.detail || "Comparison failed");
-    return;
-  }
+function showError(msg) {
+  document.getElementById("results").style.display = "none";
+  const el = document.getElementById("error-msg");
+  el.style.display = "block";
+  el.textContent = msg;
+}
+function hideError() {
+  document.getElementById("error-msg").style.display = "none";
+}
+
+function renderResults(loaded, lapIds) {
+  const data = loaded.meta;
+  document.getElementById("results").style.display = "block";
 
-  const result = await res.json();
+  // Legend
+  document.getElementById("legend").innerHTML = data.laps.map((lap, i) => `
+    <div class="legend-item">
+      <div class="legend-dot" style="background:${LAP_COLORS[i % LAP_COLORS.length]}"></div>
+      Lap ${lap.lap_id} — ${fmtMs(lap.lap_time_ms)}
+      ${i === 0 ? ' <span class="muted">(reference)</span>' : ""}
+    </div>
+  `).join("");
 
-  // Delta chart
-  if (result.deltas.length) {
-    const wrap = document.getElementById("delta-chart-wrap");
-    wrap.classList.remove("hidden");
-    const canvas = document.getElementById("delta-canvas");
-    if (deltaChartInstance) deltaChartInstance.destroy();
-    deltaChartInstance = null;
-    renderDeltaChart(result.deltas, canvas);
+  renderCompareMap(data.laps);
+
+  if (charts) charts.destroy();
+  charts = new ChartGroup({ source: loaded });
+
+  // Delta-T chart — x-axis is distance (m), y-axis is seconds
+  if (data.deltas && data.deltas.length > 0) {
+    renderDeltaChart(loaded, document.getElementById("delta-canvas"), charts, LAP_COLORS);
   }
 
-  // Channel overlays — one chart per channel, all laps overlaid
+  // Channel charts — one chart per channel, all laps overlaid, x = distance
   const container = document.getElementById("channel-charts");
   container.innerHTML = "";
 
-  result.channels_available.forEach((chName, ci) => {
-    const wrap = document.createElement("div");
-    wrap.className = "chart-wrap";
-    wrap.innerHTML = `<h3>${chName}</h3><canvas></canvas>`;
-    container.appendChild(wrap);
-
-    const datasets = result.laps.map((lapData, li) => {
-      const ch = lapData.channels.find(c => c.name === chName);
-      if (!ch) return null;
-      return {
-        label: `Lap ${lapData.lap_id}`,
-        data: ch.data,
-        borderColor: CHANNEL_COLORS[li % CHANNEL_COLORS.length],
-        borderWidth: 1.5,
-        pointRadius: 0,
-        tension: 0.1,
-      };
-    }).filter(Boolean);
-
-    const timestamps = result.laps[0]?.channels.find(c => c.name === chName)?.timestamps ?? [];
-
-    new Chart(wrap.querySelector("canvas"), {
+  const allChannels = [...new Set(data.laps.flatMap(l => l.channels.map(c => c.name)))]
+    .filter(name => !HIDDEN_CHANNELS.has(name))
+    .sort((a, b) => {
+      const ai = CHANNEL_ORDER.indexOf(a);
+      const bi = CHANNEL_ORDER.indexOf(b);
+      return (ai === -1 ? 99 : ai) - (bi === -1 ? 99 : bi);
+    });
+
+  allChannels.forEach(chName => {
+    if (!data.laps.some(lap => lap.channels.some(c => c.name === chName))) return;
+
+    const card = document.createElement("div");
+    card.className = "compare-channel-card";
+    card.innerHTML = `<h3>${CHANNEL_LABELS[chName] || chName}</h3><canvas></canvas>`;
+    container.appendChild(card);
+
+    charts.add(card.querySelector("canvas"), () => ({
       type: "line",
       data: {
-        labels: timestamps.map(t => t.toFixed(2)),
-        datasets,
+        datasets: data.laps.flatMap((lap, i) => {
+          const ch = lap.channels.find(c => c.name === chName);
+          // x is the common distance axis (metres)
+          if (!ch) return [];
+          return [seriesDataset(`Lap ${lap.lap_id}`, loaded, ch.series, LAP_COLORS[i % LAP_COLORS.length])];
+        }),
       },
-      options: {
-        animation: false,
-        plugins: { legend: { labels: { color: "#e0e0e8" } } },
-        scales: {
-          x: { ticks: { maxTicksLimit: 10, color: "#7a7d90" }, grid: { color: "#2a2d3a" } },
-          y: { ticks: { color: "#7a7d90" }, grid: { color: "#2a2d3a" } },
-        },
-      },
-    });
+      options: lineChartOptions({ xLabel: "Distance (m)", fmtX: fmtMetres, legend: true }),
+    }));
+  });
+}
+
+function renderCompareMap(laps) {
+  const mapEl = document.getElementById("compare-map");
+
+  const tracks = laps
+    .map((lap, i) => ({ gps: lap.gps_track, color: LAP_COLORS[i % LAP_COLORS.length], lapId: lap.lap_id }))
+    .filter(t => t.gps && t.gps.length >= 2);
+
+  if (!tracks.length) {
+    mapEl.style.display = "none";
+    return;
+  }
+  mapEl.style.display = "block";
+
+  if (compareMap) { compareMap.remove(); compareMap = null; }
+
+  compareMap = L.map("compare-map");
+  L.tileLayer("https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png", {
+    attribution: "© OpenStreetMap contributors",
+  }).addTo(compareMap);
+
+  const allLatLngs = [];
+  tracks.forEach(({ gps, color, lapId }) => {
+    const latlngs = gps.map(p => [p[1], p[2]]);
+    allLatLngs.push(...latlngs);
+    L.polyline(latlngs, { color, weight: 2.5, opacity: 0.9 })
+      .bindTooltip(`Lap ${lapId}`, { sticky: true })
+      .addTo(compareMap);
   });
+
+  compareMap.fitBounds(L.latLngBounds(allLatLngs), { padding: [20, 20] });
+
+  // Start / Finish marker from the reference lap
+  const ref = tracks[0].gps[0];
+  L.circleMarker([ref[1], ref[2]], {
+    radius: 7, color: "#fff", fillColor: "#fff", fillOpacity: 0.9,
+  }).bindPopup("Start / Finish").addTo(compareMap);
 }
@@ -0,0 +1,189 @@
+/**
+ * telemetry_worker.js — fetches, decodes and downsamples telemetry off the main thread
+ *
+ * Driven by TelemetryWorker in charts.js. A "load" message fetches a
+ * TelemetryData ("telemetry") or CompareResult ("compare") response and
+ * parses the JSON here. Every trace becomes a series of typed arrays,
+ * {x: Float64Array, y: Float32Array}, kept at full resolution in this worker.
+ * The page gets a small metadata object, plus each series min-max
+ * downsampled to about `points` buckets. A "window" message resamples
+ * chosen series over an x range when the charts zoom. Sampled arrays are
+ * posted as transferables, so nothing is copied back.
+ */
+
+const sources = new Map();  // source id -> {key: {x, y}} at full resolution
+let nextSource = 1;
+
+self.onmessage = async ({ data: msg }) => {
+  try {
+    if (msg.type === "load") {
+      const res = await fetch(msg.url, msg.init);
+      const body = await res.json().catch(() => ({}));
+      if (!res.ok) {
+        self.postMessage({ call: msg.call, error: { status: res.status, detail: body.detail } });
+        return;
+      }
+      const { meta, series } = DECODERS[msg.kind](body);
+      const source = nextSource++;
+      sources.set(source, series);
+      reply(msg.call, { source, meta }, sample(series, Object.keys(series), null, null, msg.points));
+    } else if (msg.type === "window") {
+      const series = sources.get(msg.source) || {};
+      reply(msg.call, {}, sample(series, msg.keys, msg.min, msg.max, msg.points));
+    } else if (msg.type === "drop") {
+      sources.delete(msg.source);
+    }
+  } catch (err) {
+    self.postMessage({ call: msg.call, error: { status: 0, detail: String(err.message || err) } });
+  }
+};
+
+function reply(call, result, series) {
+  const buffers = Object.values(series).flatMap(s => [s.x.buffer, s.y.buffer]);
+  self.postMessage({ call, result: { ...result, series } }, buffers);
+}
+
+const DECODERS = {
+  /**
+   * TelemetryData: x is distance when the response carries distance_m and the
+   * speed channel it was integrated from, else each channel's own timestamps.
+   * Channels are sampled independently, so every channel's timestamps are
+   * mapped onto distance through the speed channel's (timestamps, distance_m).
+   */
+  telemetry(body) {
+    const series = {};
+    const toDistance = distanceMapper(body);
+    const channels = body.channels.map((ch, i) => {
+      const key = `c${i}`;
+      const t = Float64Array.from(ch.timestamps);
+      series[key] = { x: toDistance ? toDistance(t) : t, y: toFloat32(ch.data) };
+      return { name: ch.name, unit: ch.unit, series: key };
+    });
+    return {
+      meta: {
+        lap_id: body.lap_id,
+        lap_time_ms: body.lap_time_ms,
+        gps_track: body.gps_track,
+        axis: toDistance ? "distance" : "time",
+        channels,
+      },
+      series,
+    };
+  },
+
+  /** CompareResult: channel and delta timestamps are the common distance axis (m). */
+  compare(body) {
+    const series = {};
+    const laps = body.laps.map((lap, li) => ({
+      lap_id: lap.lap_id,
+      lap_time_ms: lap.lap_time_ms,
+      gps_track: lap.gps_track,
+      channels: lap.channels.map((ch, ci) => {
+        const key = `l${li}c${ci}`;
+        series[key] = { x: Float64Array.from(ch.timestamps), y: toFloat32(ch.data) };
+        return { name: ch.name, unit: ch.unit, series: key };
+      }),
+    }));
+    const deltas = body.deltas.map((d, di) => {
+      const key = `d${di}`;
+      series[key] = { x: Float64Array.from(d.timestamps), y: toFloat32(d.delta_seconds) };
+      return { reference_lap_id: d.reference_lap_id, comparison_lap_id: d.comparison_lap_id, series: key };
+    });
+    return { meta: { laps, deltas, channels_available: body.channels_available }, series };
+  },
+};
+
+/** Speed channels distance_m can come from, in the server's order of preference. */
+const DISTANCE_SOURCES = ["speed_gps", "speed_obd"];
+
+/**
+ * A function mapping ascending timestamps to distance (m), interpolated
+ * linearly between the speed channel's samples and clamped at its ends,
+ * or null when the response has no distance or no matching speed channel.
+ */
+function distanceMapper(body) {
+  const distance = body.distance_m;
+  if (!distance?.length) return null;
+  const speed = DISTANCE_SOURCES
+    .map(name => body.channels.find(ch => ch.name === name && ch.timestamps.length === distance.length))
+    .find(Boolean);
+  if (!speed) return null;
+  const knots = speed.timestamps;
+  const last = knots.length - 1;
+  return t => {
+    const out = new Float64Array(t.length);
+    let j = 0;
+    for (let i = 0; i < t.length; i++) {
+      while (j < last && knots[j + 1] <= t[i]) j++;
+      if (j === last || t[i] <= knots[j]) {
+        out[i] = distance[j];
+      } else {
+        const f = (t[i] - knots[j]) / (knots[j + 1] - knots[j]);
+        out[i] = distance[j] + f * (distance[j + 1] - distance[j]);
+      }
+    }
+    return out;
+  };
+}
+
+function toFloat32(values) {
+  const out = new Float32Array(values.length);
+  for (let i = 0; i < values.length; i++) out[i] = values[i] ?? NaN;  // null gaps stay gaps
+  return out;
+}
+
+/**
+ * Copies of `keys` limited to [min, max] on x (null = unbounded) and
+ * min-max downsampled to `buckets` buckets. Each bucket contributes its
+ * lowest and highest sample in x order, so peaks such as brake spikes survive.
+ */
+function sample(series, keys, min, max, buckets) {
+  const out = {};
+  for (const key of keys) {
+    const s = series[key];
+    if (!s) continue;
+    const start = min == null ? 0 : Math.max(0, lowerBound(s.x, min) - 1);
+    const end = max == null ? s.x.length : Math.min(s.x.length, lowerBound(s.x, max) + 1);
+    out[key] = minMax(s.x, s.y, start, end, buckets);
+  }
+  return out;
+}
+
+function minMax(xs, ys, start, end, buckets) {
+  const count = end - start;
+  if (count <= buckets * 2) {
+    return { x: xs.slice(start, end), y: ys.slice(start, end) };
+  }
+  const x = new Float64Array(buckets * 2);
+  const y = new Float32Array(buckets * 2);
+  let n = 0;
+  for (let b = 0; b < buckets; b++) {
+    const from = start + Math.floor((b * count) / buckets);
+    const to = start + Math.floor(((b + 1) * count) / buckets);
+    let lo = -1, hi = -1;
+    for (let i = from; i < to; i++) {
+      const v = ys[i];
+      if (Number.isNaN(v)) continue;
+      if (lo < 0 || v < ys[lo]) lo = i;
+      if (hi < 0 || v > ys[hi]) hi = i;
+    }
+    if (lo < 0) continue;
+    for (const i of lo === hi ? [lo] : [Math.min(lo, hi), Math.max(lo, hi)]) {
+      x[n] = xs[i];
+      y[n] = ys[i];
+      n++;
+    }
+  }
+  return { x: x.slice(0, n), y: y.slice(0, n) };
+}
+
+/** First index with xs[i] >= value; xs is sorted. */
+function lowerBound(xs, value) {
+  let lo = 0, hi = xs.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (xs[mid] < value) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
@@ -0,0 +1,71 @@
+"""
+Periodic cleanup of the refresh_tokens table.
+
+Every login inserts a token and every refresh revokes one, so without cleanup
+the table only grows. Each worker runs sweep_forever() from the app lifespan;
+a sweep deletes expired tokens, then revoked ones, a batch at a time. Each
+batch is its own short transaction, and on Postgres the rows are claimed with
+FOR UPDATE SKIP LOCKED. Concurrent sweepers in other workers therefore split
+the work instead of waiting on each other. The pause between batches keeps
+the sweep from hogging the table.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.models.refresh_token import RefreshToken
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+async def sweep(
+    session_factory: async_sessionmaker[AsyncSession],
+    batch_size: int | None = None,
+    pause_s: float | None = None,
+) -> int:
+    """Delete expired and revoked refresh tokens; returns the number removed."""
+    batch_size = batch_size or settings.refresh_token_sweep_batch_size
+    pause_s = settings.refresh_token_sweep_pause_s if pause_s is None else pause_s
+    now = datetime.now(timezone.utc)
+    removed = 0
+    # One predicate per pass, so each batch is read from its own index
+    for condition in (RefreshToken.expires_at <= now, RefreshToken.revoked == True):  # noqa: E712
+        while True:
+            async with session_factory() as db:
+                deleted = await _delete_batch(db, condition, batch_size)
+                await db.commit()
+            removed += deleted
+            if deleted < batch_size:
+                break
+            await asyncio.sleep(pause_s)
+    return removed
+
+
+async def sweep_forever(session_factory: async_sessionmaker[AsyncSession], interval_s: float) -> None:
+    while True:
+        try:
+            removed = await sweep(session_factory)
+            if removed:
+                logger.info("Refresh token sweep removed %d rows", removed)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Refresh token sweep failed; retrying next interval")
+        await asyncio.sleep(interval_s)
+
+
+async def _delete_batch(db: AsyncSession, condition, batch_size: int) -> int:
+    batch = select(RefreshToken.id).where(condition).limit(batch_size)
+    if db.get_bind().dialect.name == "postgresql":
+        batch = batch.with_for_update(skip_locked=True)
+    result = await db.execute(
+        delete(RefreshToken).where(RefreshToken.id.in_(batch)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,210 @@
+"""
+Time and peak memory of the telemetry pipeline on a synthetic session, stage
+by stage and through the HTTP API, checked against a JSON baseline.
+
+    python benchmarks/bench_pipeline.py                          # 30 laps, 25 Hz, 12 channels
+    python benchmarks/bench_pipeline.py --laps 120 --save        # a 3-hour session; record a baseline
+    python benchmarks/bench_pipeline.py --laps 120 --threshold 0.2
+
+Stages call parse(), _parse_and_index(), compare_laps() and
+build_lap_telemetry() in this process. "import" is import_session_laps()
+end to end; its parsing runs in the compute pool, so its peak covers only
+the database side. The http_* benchmarks drive the app through TestClient:
+an upload (including its background import), telemetry and compare,
+cold (empty body cache), warm and revalidated (304). Their peaks also leave
+out compute-pool work.
+
+Everything runs against a throwaway SQLite database and upload directory.
+Baselines live in benchmarks/baselines/, one file per format and scenario.
+When a baseline exists, the run fails (exit 1) if any result is slower, or
+peaks higher, than it by more than --threshold. A baseline recorded on
+another machine or Python version is reported against but not checked;
+record baselines on the machine that runs the check.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time, so point the app at scratch storage first
+_SCRATCH = tempfile.mkdtemp(prefix="racetrace-bench-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_SCRATCH, 'bench.db')}",
+    "UPLOAD_DIR": os.path.join(_SCRATCH, "uploads"),
+    "MAX_UPLOAD_SIZE_MB": "1024",
+    "REFRESH_TOKEN_SWEEP_INTERVAL_S": "0",
+    "RATE_LIMIT_ENABLED": "false",
+})
+
+import argparse  # noqa: E402
+import shutil  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.lap import Lap  # noqa: E402
+from app.models.session import Session  # noqa: E402
+from app.models.track import Track  # noqa: E402
+from app.models.track_configuration import TrackConfiguration  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.compute import compute_executor  # noqa: E402
+from app.services.http_cache import body_cache  # noqa: E402
+from app.services.session_importer import _parse_and_index, import_session_laps  # noqa: E402
+from app.services.telemetry.comparator import compare_laps  # noqa: E402
+from app.services.telemetry.lap_telemetry import LapRef, TelemetryQuery, build_lap_telemetry  # noqa: E402
+from app.services.telemetry.parser import parse  # noqa: E402
+from benchmarks.harness import Result, check, foreign, load_baseline, measure, report, save_baseline  # noqa: E402
+from benchmarks.synthetic import TRACKADDICT_COLUMNS, WRITERS, SessionSpec  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+_PASSWORD = "bench-password"
+
+
+def track_config_id(db) -> int:
+    """The track configuration uploads are assigned to, created on first use."""
+    config = db.query(TrackConfiguration).first()
+    if config is None:
+        track = Track(name="Synthetic Circuit", country="Benchland")
+        db.add(track)
+        db.flush()
+        config = TrackConfiguration(track_id=track.id, name="Full", length_meters=4200, num_sectors=3, is_default=True)
+        db.add(config)
+        db.commit()
+    return config.id
+
+
+def bench_stages(path: str, fmt: str, repeat: int) -> list[Result]:
+    with SessionLocal() as db:
+        user = User(username="bench_stages", email="bench_stages@example.com")
+        db.add(user)
+        db.flush()
+        session = Session(user_id=user.id, track_configuration_id=track_config_id(db),
+                          date=datetime.now(timezone.utc), app_source="synthetic")
+        db.add(session)
+        db.commit()
+        session_id = session.id
+
+    results = [
+        measure("parse", lambda: parse(path, fmt), repeat),
+        measure("index", lambda: _parse_and_index(path, fmt), repeat),
+        measure("import", lambda: import_session_laps(session_id, path, fmt), repeat),
+    ]
+    with SessionLocal() as db:
+        laps = db.query(Lap).filter_by(session_id=session_id, is_valid=True).order_by(Lap.lap_number).all()
+        refs = [LapRef.from_lap(lap) for lap in laps[:2]]
+    results += [
+        measure("compare", lambda: compare_laps(refs), repeat),
+        measure("telemetry", lambda: build_lap_telemetry(refs[0], TelemetryQuery()), repeat),
+        measure("telemetry_window", lambda: build_lap_telemetry(
+            refs[0], TelemetryQuery(start=10.0, end=40.0, points=1000)), repeat),
+    ]
+    return results
+
+
+def bench_http(path: str, repeat: int) -> list[Result]:
+    with SessionLocal() as db:
+        track_config_id(db)
+    with TestClient(app) as client:
+        client.post("/api/v1/auth/register", json={
+            "username": "bench_http", "email": "bench_http@example.com", "password": _PASSWORD,
+        })
+        token = client.post("/api/v1/auth/login", data={"username": "bench_http", "password": _PASSWORD}).json()
+        headers = {"Authorization": f"Bearer {token['access_token']}", "Accept-Encoding": "gzip"}
+
+        def upload():
+            with open(path, "rb") as f:
+                res = client.post("/api/v1/sessions/upload", files={"file": (os.path.basename(path), f)},
+                                  headers=headers)
+            res.raise_for_status()
+            return res.json()["id"]
+
+        results = [measure("http_upload", upload, repeat)]
+        session_id = upload()
+        laps = client.get(f"/api/v1/laps/session/{session_id}", headers=headers).json()
+        lap_ids = [lap["id"] for lap in laps if lap["is_valid"]][:2]
+
+        def get(url: str, **extra) -> dict:
+            res = client.get(url, headers={**headers, **extra})
+            if res.status_code != 304:
+                res.raise_for_status()
+            return res.headers
+
+        telemetry = f"/api/v1/laps/{lap_ids[0]}/telemetry"
+        compare = "/api/v1/laps/compare?" + "&".join(f"lap_ids={i}" for i in lap_ids)
+        for name, url in (("telemetry", telemetry), ("compare", compare)):
+            etag = get(url)["etag"]
+            results += [
+                measure(f"http_{name}_cold", lambda url=url: get(url), repeat, setup=body_cache.clear),
+                measure(f"http_{name}_warm", lambda url=url: get(url), repeat),
+                measure(f"http_{name}_304", lambda url=url, etag=etag: get(url, **{"If-None-Match": etag}), repeat),
+            ]
+    return results
+
+
+def main() -> None:
+    default = SessionSpec()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--laps", type=int, default=default.laps)
+    parser.add_argument("--hz", type=float, default=default.hz)
+    parser.add_argument("--channels", type=int, default=default.channels,
+                        choices=range(1, len(TRACKADDICT_COLUMNS) + 1), metavar="1-12")
+    parser.add_argument("--lap-s", type=float, default=default.lap_s)
+    parser.add_argument("--format", choices=WRITERS, default="csv")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (median reported)")
+    parser.add_argument("--only", choices=("stages", "http"), help="run one group")
+    parser.add_argument("--baseline", help="baseline file (default: benchmarks/baselines/<format>-<scenario>.json)")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression, 0.25 = 25%%")
+    args = parser.parse_args()
+    if args.laps < 4:
+        parser.error("--laps must be at least 4 (the first and last laps are out/in laps, compare needs two)")
+
+    spec = SessionSpec(args.laps, args.hz, args.channels, args.lap_s)
+    scenario = {"format": args.format, **spec._asdict()}
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.format}-{spec.name}.json")
+    baseline = None if args.save else load_baseline(baseline_path)
+
+    try:
+        Base.metadata.create_all(bind=engine)
+        # Fork the compute pool now: workers forked during a tracemalloc run would trace for good
+        compute_executor.run_blocking(abs, 0)
+        path = WRITERS[args.format](os.path.join(_SCRATCH, f"session.{args.format}"), spec)
+        print(f"{spec.name} {args.format}: {spec.samples} samples, {os.path.getsize(path) / 2**20:.1f} MiB")
+        results = []
+        if args.only != "http":
+            results += bench_stages(path, args.format, args.repeat)
+        if args.only != "stages":
+            results += bench_http(path, args.repeat)
+    finally:
+        compute_executor.shutdown()
+        engine.dispose()
+        shutil.rmtree(_SCRATCH, ignore_errors=True)
+
+    report(results, baseline)
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        save_baseline(baseline_path, scenario, results)
+        print(f"baseline written to {baseline_path}")
+    elif baseline is not None:
+        if baseline["scenario"] != scenario:
+            sys.exit(f"{baseline_path} was recorded for {baseline['scenario']}, not {scenario}")
+        elsewhere = foreign(baseline)
+        if elsewhere:
+            print(f"not checked: {baseline_path} was recorded with {elsewhere}; rerun with --save to record one here")
+            return
+        failures = check(results, baseline, args.threshold)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            sys.exit(1)
+        print(f"within {args.threshold:.0%} of {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Timing, peak memory and JSON baselines for the benchmarks.
+
+measure() runs a callable once under tracemalloc and keeps its peak Python
+heap. That run also warms imports, pools and caches. Then it times `repeat`
+runs without tracemalloc, which slows allocation-heavy code several times
+over. A baseline file holds one scenario's results. check() reports every
+result whose fastest run is slower, or whose peak is higher, than its
+baseline by more than `threshold`. The fastest run is compared because it
+is the least disturbed by other load on the machine. Differences under a
+small absolute floor count as noise. Timings only compare on the same
+machine and Python, so foreign() tells when a baseline came from elsewhere.
+"""
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, NamedTuple
+
+# Changes smaller than these are never reported, whatever the ratio
+NOISE_FLOOR_S = 0.005
+NOISE_FLOOR_MIB = 1.0
+
+
+class Result(NamedTuple):
+    name: str
+    seconds: float  # median of the timed runs
+    min_s: float
+    peak_mib: float
+    runs: int
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int = 3, setup: Callable[[], Any] | None = None) -> Result:
+    """Time `fn` `repeat` times after one tracemalloc run; `setup` runs untimed before each call."""
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return Result(name, statistics.median(times), min(times), peak / 2**20, repeat)
+
+
+def load_baseline(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: str, scenario: dict, results: list[Result]) -> None:
+    data = {
+        "scenario": scenario,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {
+            r.name: {"seconds": round(r.seconds, 6), "min_s": round(r.min_s, 6), "peak_mib": round(r.peak_mib, 3)}
+            for r in results
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def foreign(baseline: dict) -> str | None:
+    """Why `baseline` was not recorded in this environment, or None if it was."""
+    here = {"python": platform.python_version(), "machine": platform.machine()}
+    diffs = [f"{key} {baseline.get(key)} (here {value})" for key, value in here.items() if baseline.get(key) != value]
+    return ", ".join(diffs) or None
+
+
+def check(results: list[Result], baseline: dict, threshold: float) -> list[str]:
+    """One message per metric that regressed by more than `threshold` (0.25 = 25%)."""
+    failures = []
+    for r in results:
+        base = baseline["results"].get(r.name)
+        if base is None:
+            continue
+        for metric, value, floor in (("min_s", r.min_s, NOISE_FLOOR_S), ("peak_mib", r.peak_mib, NOISE_FLOOR_MIB)):
+            limit = base[metric] * (1 + threshold)
+            if value > limit and value - base[metric] > floor:
+                failures.append(f"{r.name} {metric}: {value:.3f} > {base[metric]:.3f} (+{threshold:.0%})")
+    return failures
+
+
+def report(results: list[Result], baseline: dict | None = None) -> None:
+    print(f"  {'benchmark':<24}{'median s':>10}{'min s':>10}{'peak MiB':>10}{'vs base':>10}")
+    for r in results:
+        base = (baseline or {}).get("results", {}).get(r.name)
+        change = f"{r.seconds / base['seconds'] - 1:+.0%}" if base and base["seconds"] else ""
+        print(f"  {r.name:<24}{r.seconds:10.4f}{r.min_s:10.4f}{r.peak_mib:10.1f}{change:>10}")
@@ -0,0 +1,173 @@
+"""
+Deterministic synthetic telemetry sessions for the benchmarks.
+
+A car laps an elliptical circuit with a speed profile of a few straights and
+corners. Each lap is slightly different, with seeded noise on every channel,
+so the same SessionSpec always produces byte-identical files. Sessions can be
+written as TrackAddict CSV (what phones upload) or as the JSON lap list that
+parse() reads directly.
+
+    python benchmarks/synthetic.py --laps 120 --hz 25 --channels 12 -o /tmp/3h.csv
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import NamedTuple
+
+import numpy as np
+
+# TrackAddict column -> generator key, in the order channels are added
+TRACKADDICT_COLUMNS = (
+    ("Speed (Km/h)", "speed"),
+    ("Engine Speed (RPM) *OBD", "rpm"),
+    ("Throttle Position (%) *OBD", "throttle"),
+    ("Brake (calculated)", "brake"),
+    ("Accel X", "accel_lat"),
+    ("Accel Y", "accel_lon"),
+    ("Accel Z", "accel_vert"),
+    ("Heading", "heading"),
+    ("Altitude (m)", "altitude"),
+    ("Vehicle Speed (km/h) *OBD", "speed_obd"),
+    ("Intake Manifold Pressure (kPa) *OBD", "manifold_pressure"),
+    ("Barometric Pressure (kPa)", "baro_pressure"),
+)
+
+# Normalised names and units, as parse() reports them
+CHANNEL_UNITS = {
+    "speed": ("speed_gps", "km/h"), "rpm": ("rpm", "rpm"), "throttle": ("throttle", "%"),
+    "brake": ("brake", ""), "accel_lat": ("accel_lat", "g"), "accel_lon": ("accel_lon", "g"),
+    "accel_vert": ("accel_vert", "g"), "heading": ("heading", "deg"), "altitude": ("altitude", "m"),
+    "speed_obd": ("speed_obd", "km/h"), "manifold_pressure": ("manifold_pressure", "kPa"),
+    "baro_pressure": ("baro_pressure", "kPa"),
+}
+
+_CENTER = (52.0786, -1.0169)  # lat, lon of the circuit's centre
+_SEMI_AXES_M = (900.0, 450.0)
+_M_PER_DEG_LAT = 111_320.0
+
+
+class SessionSpec(NamedTuple):
+    laps: int = 30
+    hz: float = 25.0
+    channels: int = 12
+    lap_s: float = 90.0
+    seed: int = 1
+
+    @property
+    def name(self) -> str:
+        return f"{self.laps}laps-{self.hz:g}hz-{self.channels}ch"
+
+    @property
+    def samples(self) -> int:
+        return int(self.laps * self.lap_s * self.hz)
+
+
+def generate(spec: SessionSpec) -> list[dict]:
+    """Per-lap column arrays: {"lap", "time", "lat", "lon", <generator key>: values}."""
+    rng = np.random.default_rng(spec.seed)
+    keys = [key for _, key in TRACKADDICT_COLUMNS[: spec.channels]]
+    laps, t0 = [], 0.0
+    for lap in range(1, spec.laps + 1):
+        lap_s = spec.lap_s * (1 + rng.normal(0, 0.01))
+        n = int(lap_s * spec.hz)
+        t = t0 + np.arange(n) / spec.hz
+        phase = np.linspace(0.0, 1.0, n, endpoint=False)
+        theta = 2 * np.pi * phase
+
+        # Four corners per lap: speed dips, brake before each apex, throttle out of it
+        speed = 150 + 70 * np.cos(4 * theta) + rng.normal(0, 1.5, n)
+        dv = -70 * 4 * 2 * np.pi / lap_s * np.sin(4 * theta)  # km/h per second
+        columns = {
+            "speed": speed,
+            "rpm": 2000 + speed * 28 + rng.normal(0, 40, n),
+            "throttle": np.clip(50 + dv * 4, 0, 100),
+            "brake": np.clip(-dv / 20, 0, 1),
+            "accel_lat": 1.4 * np.sin(4 * theta) + rng.normal(0, 0.05, n),
+            "accel_lon": dv / 35.3 + rng.normal(0, 0.03, n),
+            "accel_vert": 1 + rng.normal(0, 0.02, n),
+            "heading": np.degrees(theta) % 360,
+            "altitude": 120 + 6 * np.sin(theta) + rng.normal(0, 0.2, n),
+            "speed_obd": speed * 1.02 + rng.normal(0, 0.5, n),
+            "manifold_pressure": 30 + np.clip(dv * 3 + 50, 0, 70),
+            "baro_pressure": 101.3 + rng.normal(0, 0.05, n),
+        }
+        north, east = _SEMI_AXES_M[1] * np.sin(theta), _SEMI_AXES_M[0] * np.cos(theta)
+        laps.append({
+            "lap": lap,
+            "time": t,
+            "lap_time_ms": int(round(n / spec.hz * 1000)),
+            "lat": _CENTER[0] + north / _M_PER_DEG_LAT,
+            "lon": _CENTER[1] + east / (_M_PER_DEG_LAT * np.cos(np.radians(_CENTER[0]))),
+            **{key: columns[key] for key in keys},
+        })
+        t0 = t[-1] + 1 / spec.hz
+    return laps
+
+
+def write_trackaddict_csv(path: str, spec: SessionSpec) -> str:
+    laps = generate(spec)
+    keys = [key for _, key in TRACKADDICT_COLUMNS[: spec.channels]]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("# RaceRender Data: TrackAddict 4.9.2 on Android (synthetic)\n")
+        f.write("# Vehicle: Synthetic Bench Car\n")
+        for lap in laps:
+            minutes, ms = divmod(lap["lap_time_ms"], 60_000)
+            f.write(f"# Lap {lap['lap']}: {minutes}:{ms // 1000:02d}.{ms % 1000:03d}\n")
+        header = ["Time", "Lap", "Latitude", "Longitude"] + [col for col, _ in TRACKADDICT_COLUMNS[: spec.channels]]
+        f.write(",".join(f'"{h}"' for h in header) + "\n")
+        for lap in laps:
+            rows = np.column_stack([lap["time"], lap["lat"], lap["lon"], *(lap[key] for key in keys)])
+            for row in rows:
+                f.write(f"{row[0]:.3f},{lap['lap']},{row[1]:.7f},{row[2]:.7f},")
+                f.write(",".join(f"{v:.3f}" for v in row[3:]) + "\n")
+    return path
+
+
+def write_json_session(path: str, spec: SessionSpec) -> str:
+    laps = []
+    for lap in generate(spec):
+        ts = np.round(lap["time"] - lap["time"][0], 4).tolist()
+        channels = {}
+        for _, key in TRACKADDICT_COLUMNS[: spec.channels]:
+            name, unit = CHANNEL_UNITS[key]
+            channels[name] = {"unit": unit, "timestamps": ts, "data": np.round(lap[key], 3).tolist()}
+        altitude = lap.get("altitude", np.zeros(len(ts)))
+        laps.append({
+            "lap_number": lap["lap"],
+            "lap_time_ms": lap["lap_time_ms"],
+            "channels": channels,
+            "gps_track": [
+                [t, round(la, 7), round(lo, 7), round(al, 2)]
+                for t, la, lo, al in zip(ts, lap["lat"].tolist(), lap["lon"].tolist(), altitude.tolist())
+            ],
+            "sample_rate_hz": spec.hz,
+            "metadata": {"app": "synthetic"},
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(laps, f)
+    return path
+
+
+WRITERS = {"csv": write_trackaddict_csv, "json": write_json_session}
+
+
+def main() -> None:
+    default = SessionSpec()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--laps", type=int, default=default.laps)
+    parser.add_argument("--hz", type=float, default=default.hz)
+    parser.add_argument("--channels", type=int, default=default.channels,
+                        choices=range(1, len(TRACKADDICT_COLUMNS) + 1), metavar="1-12")
+    parser.add_argument("--lap-s", type=float, default=default.lap_s)
+    parser.add_argument("--seed", type=int, default=default.seed)
+    parser.add_argument("--format", choices=WRITERS, default="csv")
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+    spec = SessionSpec(args.laps, args.hz, args.channels, args.lap_s, args.seed)
+    WRITERS[args.format](args.output, spec)
+    print(f"{args.output}: {spec.samples} samples, {spec.name}")
+
+
+if __name__ == "__main__":
+    main()
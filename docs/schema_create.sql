@@ -95,6 +95,7 @@ CREATE TABLE IF NOT EXISTS events (
     is_public               BOOLEAN      NOT NULL DEFAULT TRUE,
     is_open                 BOOLEAN      NOT NULL DEFAULT TRUE,
     status                  eventstatus  NOT NULL DEFAULT 'upcoming',
+    participant_count       INTEGER      NOT NULL DEFAULT 0,
     created_at              TIMESTAMPTZ  NOT NULL DEFAULT NOW()
 );
 
@@ -136,13 +137,50 @@ CREATE TABLE IF NOT EXISTS laps (
     max_throttle_pct    FLOAT,
     max_brake_pct       FLOAT,
     summary             JSONB,
-    gps_track           JSONB,
     is_valid            BOOLEAN      NOT NULL DEFAULT TRUE,
     is_outlap           BOOLEAN      NOT NULL DEFAULT FALSE,
     is_inlap            BOOLEAN      NOT NULL DEFAULT FALSE,
     created_at          TIMESTAMPTZ  NOT NULL DEFAULT NOW()
 );
 
+-- GPS tracks: delta-encoded int32 columns, zlib-compressed (app/services/telemetry/track_codec.py)
+CREATE TABLE IF NOT EXISTS lap_tracks (
+    lap_id              INTEGER      PRIMARY KEY REFERENCES laps(id) ON DELETE CASCADE,
+    point_count         INTEGER      NOT NULL,
+    points              BYTEA        NOT NULL,
+    simplified          BYTEA
+);
+
+-- Best public timed lap per configuration, user and car category (app/services/leaderboard.py)
+CREATE TABLE IF NOT EXISTS best_laps (
+    track_configuration_id INTEGER     NOT NULL REFERENCES track_configurations(id) ON DELETE CASCADE,
+    user_id             INTEGER      NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    car_category        VARCHAR(64)  NOT NULL DEFAULT '',   -- '*' = best across categories
+    lap_id              INTEGER      NOT NULL REFERENCES laps(id) ON DELETE CASCADE,
+    session_id          INTEGER      NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+    car_id              INTEGER      REFERENCES cars(id) ON DELETE SET NULL,
+    lap_time_ms         INTEGER      NOT NULL,
+    top_speed_kmh       FLOAT,
+    session_date        TIMESTAMPTZ  NOT NULL,
+    PRIMARY KEY (track_configuration_id, user_id, car_category)
+);
+
+-- Admin dashboard totals, sharded to spread row locks (app/services/stats.py)
+CREATE TABLE IF NOT EXISTS stats_counters (
+    name                VARCHAR(64)  NOT NULL,
+    shard               INTEGER      NOT NULL,
+    value               BIGINT       NOT NULL,
+    PRIMARY KEY (name, shard)
+);
+
+-- Per-day (UTC) totals, e.g. uploads
+CREATE TABLE IF NOT EXISTS stats_daily (
+    name                VARCHAR(64)  NOT NULL,
+    day                 DATE         NOT NULL,
+    value               BIGINT       NOT NULL,
+    PRIMARY KEY (name, day)
+);
+
 -- Alembic version tracking
 CREATE TABLE IF NOT EXISTS alembic_version (
     version_num VARCHAR(32) NOT NULL,
@@ -169,11 +207,30 @@ CREATE INDEX IF NOT EXISTS ix_cars_id              ON cars(id);
 CREATE INDEX        IF NOT EXISTS ix_oauth_accounts_id  ON oauth_accounts(id);
 
 CREATE UNIQUE INDEX IF NOT EXISTS ix_refresh_tokens_token_hash  ON refresh_tokens(token_hash);
-CREATE INDEX        IF NOT EXISTS ix_refresh_tokens_id          ON refresh_tokens(id);
+-- Refresh looks tokens up by hash; these serve the sweeper and user deletes
+CREATE INDEX        IF NOT EXISTS ix_refresh_tokens_expires_at  ON refresh_tokens(expires_at);
+CREATE INDEX        IF NOT EXISTS ix_refresh_tokens_revoked     ON refresh_tokens(id) WHERE revoked;
+CREATE INDEX        IF NOT EXISTS ix_refresh_tokens_user_id     ON refresh_tokens(user_id);
 
 CREATE INDEX IF NOT EXISTS ix_events_id             ON events(id);
 CREATE INDEX IF NOT EXISTS ix_event_participants_id ON event_participants(id);
+CREATE INDEX IF NOT EXISTS ix_events_public_date    ON events(date_start, id) WHERE is_public;
+CREATE INDEX IF NOT EXISTS ix_event_participants_event_user ON event_participants(event_id, user_id);
 
 CREATE INDEX IF NOT EXISTS ix_sessions_id          ON sessions(id);
+-- Session listings page by (date, id) descending
+CREATE INDEX IF NOT EXISTS ix_sessions_user_date   ON sessions(user_id, date, id);
+CREATE INDEX IF NOT EXISTS ix_sessions_date        ON sessions(date, id);
+CREATE INDEX IF NOT EXISTS ix_sessions_public_config ON sessions(track_configuration_id, user_id) WHERE is_public;
+CREATE INDEX IF NOT EXISTS ix_sessions_public_date ON sessions(date, id) WHERE is_public;
+CREATE INDEX IF NOT EXISTS ix_sessions_event_id    ON sessions(event_id) WHERE event_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_sessions_car_id      ON sessions(car_id) WHERE car_id IS NOT NULL;
 
 CREATE INDEX IF NOT EXISTS ix_laps_id              ON laps(id);
+CREATE INDEX IF NOT EXISTS ix_laps_session_lap_number ON laps(session_id, lap_number);
+-- Valid timed laps only
+CREATE INDEX IF NOT EXISTS ix_laps_timed           ON laps(session_id, lap_time_ms)
+    WHERE is_valid AND NOT is_outlap AND NOT is_inlap AND lap_time_ms IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_best_laps_board       ON best_laps(track_configuration_id, car_category, lap_time_ms, user_id);
+CREATE INDEX IF NOT EXISTS ix_best_laps_user        ON best_laps(user_id);
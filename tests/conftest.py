@@ -1,25 +1,49 @@
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 
-from app.database import Base, get_db
+from app.config import get_settings
+from app.database import Base, get_async_db, get_db, get_read_db
 from app.main import app
+from app.services.rate_limit import rate_limiter
+
+# Background tasks would run against the configured database, not the test one
+get_settings().refresh_token_sweep_interval_s = 0
+# Tests log in and upload far faster than any client should; test_rate_limit re-enables it
+rate_limiter.enabled = False
+
+# A file rather than :memory: so the async endpoints (aiosqlite) see the same data
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="racetrace-test-"), "test.db")
 
 engine = create_engine(
-    "sqlite:///:memory:",
+    f"sqlite:///{_DB_PATH}",
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each TestClient runs its own event loop, so async connections are not pooled
+async_engine = create_async_engine(f"sqlite+aiosqlite:///{_DB_PATH}", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as session:
+        yield session
+
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_db():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    os.remove(_DB_PATH)
 
 
 @pytest.fixture
@@ -40,6 +64,8 @@ def client(db):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -0,0 +1,50 @@
+"""
+Tests for the admin listings.
+"""
+from app.models.user import User
+from tests.conftest import make_user, auth, seed_track_config
+
+
+def _superuser(client, db, username):
+    token = make_user(client, username)
+    db.query(User).filter(User.username == username).update({User.is_superuser: True})
+    db.commit()
+    return token
+
+
+def _all_pages(client, url, token, limit):
+    rows, cursor = [], None
+    while True:
+        res = client.get(url, params={"limit": limit, **({"cursor": cursor} if cursor else {})}, headers=auth(token))
+        assert res.status_code == 200
+        rows += res.json()
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+
+def test_list_users_pages_newest_first(client, db):
+    token = _superuser(client, db, "admin_pager")
+    for i in range(3):
+        make_user(client, f"admin_paged{i}")
+
+    users = _all_pages(client, "/api/v1/admin/users", token, limit=2)
+    ids = [u["id"] for u in users]
+    assert ids == sorted(set(ids), reverse=True)
+    assert len(ids) == db.query(User).count()
+    assert "hashed_password" not in users[0]
+
+
+def test_list_sessions_pages_by_date(client, db):
+    config_id = seed_track_config(db)
+    token = _superuser(client, db, "admin_sessions")
+    for day in (1, 2, 3):
+        client.post("/api/v1/sessions/", json={
+            "track_configuration_id": config_id, "date": f"2025-07-0{day}T08:00:00Z",
+        }, headers=auth(token))
+
+    sessions = _all_pages(client, "/api/v1/admin/sessions", token, limit=2)
+    keys = [(s["date"], s["id"]) for s in sessions]
+    assert keys == sorted(keys, reverse=True)
+    assert len({s["id"] for s in sessions}) == len(sessions)
+    assert {"lap_count", "best_lap_ms", "vehicle_hint"} <= set(sessions[0])
@@ -166,3 +166,47 @@ def test_cars_crud(client):
 
     res = client.get("/api/v1/cars/", headers=auth(token))
     assert not any(c["id"] == car_id for c in res.json())
+
+
+def test_list_sessions_pages_by_date(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "sess_pager")
+    # Two sessions share a date; the id breaks the tie
+    dates = ["2025-09-01T08:00:00Z", "2025-09-03T08:00:00Z", "2025-09-03T08:00:00Z", "2025-09-02T08:00:00Z"]
+    for d in dates:
+        client.post("/api/v1/sessions/", json={"track_configuration_id": config_id, "date": d}, headers=auth(token))
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        res = client.get("/api/v1/sessions/", params=params, headers=auth(token))
+        assert res.status_code == 200
+        seen += res.json()
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 4
+    keys = [(s["date"], s["id"]) for s in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert "notes" not in seen[0] and "source_file_path" not in seen[0]
+
+    assert client.get("/api/v1/sessions/?cursor=bogus", headers=auth(token)).status_code == 400
+
+
+def test_list_sessions_includes_lap_aggregates(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "sess_aggregates")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id, "date": "2025-09-01T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    empty_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id, "date": "2025-08-01T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    for n, ms, valid in ((1, 80000, False), (2, 95000, True), (3, 93000, True)):
+        client.post("/api/v1/laps/", json={
+            "session_id": session_id, "lap_number": n, "lap_time_ms": ms, "is_valid": valid,
+        }, headers=auth(token))
+
+    rows = {s["id"]: s for s in client.get("/api/v1/sessions/", headers=auth(token)).json()}
+    assert (rows[session_id]["lap_count"], rows[session_id]["best_lap_ms"]) == (3, 93000)
+    assert (rows[empty_id]["lap_count"], rows[empty_id]["best_lap_ms"]) == (0, None)
@@ -1,4 +1,29 @@
-from tests.conftest import make_user, auth
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.models.user import User
+from app.services import passwords
+from app.services.compute import BoundedExecutor
+from tests.conftest import async_engine, make_user, auth
+
+
+@contextmanager
+def _user_queries():
+    """Collect SELECTs on users issued by the async endpoints and dependencies."""
+    seen = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith("SELECT") and "FROM users" in statement:
+            seen.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        yield seen
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
 
 
 def test_register_and_login(client):
@@ -54,3 +79,63 @@ def test_protected_route_with_token(client):
     token = make_user(client, "auth_test_user")
     res = client.get("/api/v1/sessions/", headers=auth(token))
     assert res.status_code == 200
+
+
+def test_principal_is_cached_between_requests(client):
+    token = make_user(client, "principal_cached")
+    with _user_queries() as queries:
+        for _ in range(5):
+            assert client.get("/api/v1/users/me", headers=auth(token)).status_code == 200
+    assert len(queries) == 1
+
+
+def test_update_me_invalidates_principal(client):
+    token = make_user(client, "principal_renamed")
+    client.get("/api/v1/users/me", headers=auth(token))
+    client.patch("/api/v1/users/me", json={"full_name": "Renamed Driver"}, headers=auth(token))
+    assert client.get("/api/v1/users/me", headers=auth(token)).json()["full_name"] == "Renamed Driver"
+
+
+def test_deactivation_takes_effect_immediately(client, db):
+    admin = make_user(client, "principal_admin")
+    db.query(User).filter(User.username == "principal_admin").update({User.is_superuser: True})
+    db.commit()
+    token = make_user(client, "principal_suspended")
+    me = client.get("/api/v1/users/me", headers=auth(token)).json()
+
+    res = client.patch(f"/api/v1/admin/users/{me['id']}/deactivate", headers=auth(admin))
+    assert res.status_code == 200
+    assert client.get("/api/v1/users/me", headers=auth(token)).status_code == 401
+
+
+def test_password_checks_are_rejected_fast_when_the_pool_is_full(client, db, monkeypatch):
+    token = make_user(client, "hash_saturated")
+    executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=1, timeout_s=5,
+                               retry_after_s=4)
+    monkeypatch.setattr(passwords, "password_executor", executor)
+    gate = threading.Event()
+    occupied = executor._submit(gate.wait, (5,), admit=True)
+    try:
+        res = client.post("/api/v1/auth/login", data={"username": "hash_saturated", "password": "pass123"})
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "4"
+        res = client.patch("/api/v1/users/me", json={"password": "changed"}, headers=auth(token))
+        assert res.status_code == 503
+    finally:
+        gate.set()
+        occupied.result()
+
+    # A rejected attempt is not a failed one
+    assert db.query(User.failed_login_attempts).filter(User.username == "hash_saturated").scalar() == 0
+    assert executor.snapshot()["rejected"] == 2
+    res = client.post("/api/v1/auth/login", data={"username": "hash_saturated", "password": "pass123"})
+    assert res.status_code == 200
+    executor.shutdown()
+
+
+def test_password_work_is_timed(client):
+    before = {kind: timings.count for kind, timings in passwords.hash_timings.items()}
+    make_user(client, "hash_timed")  # registers, then logs in
+    assert passwords.hash_timings["hash"].count == before["hash"] + 1
+    assert passwords.hash_timings["verify"].count == before["verify"] + 1
+    assert passwords.snapshot()["verify_ms"]["max"] > 0
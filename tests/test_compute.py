@@ -0,0 +1,139 @@
+"""
+Tests for the bounded compute executor and its HTTP backpressure mapping.
+"""
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.models.lap import Lap
+from app.services.compute import BoundedExecutor, ComputeBusy, ComputeTimeout
+from tests.conftest import make_user, auth, seed_track_config
+
+
+def _wait(event: threading.Event) -> str:
+    event.wait(5)
+    return "done"
+
+
+def test_rejects_when_saturated():
+    executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=1, timeout_s=5,
+                               retry_after_s=7)
+    gate = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(_wait, gate))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ComputeBusy) as exc_info:
+            await executor.run(_wait, gate)
+        assert exc_info.value.retry_after == 7
+        gate.set()
+        return await first
+
+    assert asyncio.run(scenario()) == "done"
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_run_timeout():
+    executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=2, timeout_s=0.05)
+    with pytest.raises(ComputeTimeout):
+        asyncio.run(executor.run(time.sleep, 0.5))
+    executor.shutdown()
+
+
+def test_run_blocking_waits_for_a_slot():
+    executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=2), max_pending=1, timeout_s=5)
+    gate = threading.Event()
+    running = executor._submit(_wait, (gate,), admit=True)
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(executor.run_blocking(_wait, gate)))
+    waiter.start()
+    time.sleep(0.1)
+    assert results == [] and executor.pending == 1
+
+    with pytest.raises(ComputeTimeout):
+        executor.run_blocking(_wait, gate, timeout=0.05)
+    gate.set()
+    waiter.join(5)
+    assert running.result() == "done"
+    assert results == ["done"]
+    assert executor.snapshot()["peak_pending"] == 1
+    executor.shutdown()
+
+
+def test_run_blocking_can_reject():
+    executor = BoundedExecutor(lambda: ThreadPoolExecutor(max_workers=1), max_pending=1, timeout_s=5)
+    gate = threading.Event()
+    pending = executor._submit(_wait, (gate,), admit=True)
+    with pytest.raises(ComputeBusy):
+        executor.run_blocking(_wait, gate, admit=True)
+    gate.set()
+    assert pending.result() == "done"
+    assert executor.run_blocking(time.sleep, 0, admit=True) is None
+
+    # Done callbacks may run just after result() returns
+    deadline = time.monotonic() + 2
+    while executor.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stats = executor.snapshot()
+    assert stats["pending"] == 0
+    assert stats["peak_pending"] == 1
+    assert stats["rejected"] == 1
+    assert stats["latency_ms"]["buckets"]["+Inf"] == 2
+    executor.shutdown()
+
+
+def test_telemetry_runs_in_process_pool(client, db, tmp_path):
+    config_id = seed_track_config(db)
+    token = make_user(client, "compute_owner")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-11-01T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+
+    path = tmp_path / "lap.json"
+    path.write_text(json.dumps({
+        "lap_number": 1,
+        "lap_time_ms": 3000,
+        "channels": {
+            "speed_gps": {"unit": "km/h", "timestamps": [0.0, 1.0, 2.0, 3.0], "data": [36.0, 36.0, 36.0, 36.0]},
+        },
+    }))
+    lap = Lap(session_id=session_id, lap_number=1, lap_time_ms=3000,
+              telemetry_file_path=str(path), telemetry_format="json")
+    db.add(lap)
+    db.commit()
+
+    res = client.get(f"/api/v1/laps/{lap.id}/telemetry", headers=auth(token))
+    assert res.status_code == 200
+    body = res.json()
+    assert body["channels"][0]["name"] == "speed_gps"
+    assert body["distance_m"][-1] == pytest.approx(30.0, rel=0.01)
+
+
+def test_compare_returns_503_when_busy(client, db, monkeypatch):
+    from app.api.v1 import laps as laps_api
+
+    config_id = seed_track_config(db)
+    token = make_user(client, "compute_busy")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-11-02T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    lap_ids = []
+    for n in (1, 2):
+        res = client.post("/api/v1/laps/", json={"session_id": session_id, "lap_number": n},
+                          headers=auth(token))
+        lap_ids.append(res.json()["id"])
+
+    async def saturated(*_args, **_kwargs):
+        raise ComputeBusy(retry_after=3)
+
+    monkeypatch.setattr(laps_api.compute_executor, "run", saturated)
+    res = client.post("/api/v1/laps/compare", json={"lap_ids": lap_ids}, headers=auth(token))
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "3"
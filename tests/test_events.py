@@ -0,0 +1,61 @@
+"""
+Tests for event listing: participant counts, filters and keyset pagination.
+"""
+from tests.conftest import make_user, auth, seed_track_config
+
+RANGE = {"date_from": "2031-01-01T00:00:00", "date_to": "2032-01-01T00:00:00"}
+
+
+def _create(client, token, config_id, name, day):
+    return client.post("/api/v1/events/", json={
+        "track_configuration_id": config_id,
+        "name": name,
+        "date_start": f"2031-03-{day:02d}T09:00:00",
+        "date_end": f"2031-03-{day:02d}T17:00:00",
+    }, headers=auth(token)).json()["id"]
+
+
+def test_join_increments_participant_count(client, db):
+    config_id = seed_track_config(db)
+    organizer = make_user(client, "ev_organizer")
+    event_id = _create(client, organizer, config_id, "Count Cup", 1)
+
+    for name in ("ev_joiner1", "ev_joiner2"):
+        token = make_user(client, name)
+        assert client.post(f"/api/v1/events/{event_id}/join", headers=auth(token)).status_code == 201
+    # Joining twice does not count twice
+    again = client.post(f"/api/v1/events/{event_id}/join", headers=auth(token))
+    assert again.json() == {"ok": True, "already_joined": True}
+
+    assert client.get(f"/api/v1/events/{event_id}").json()["participant_count"] == 2
+    [listed] = [e for e in client.get("/api/v1/events/", params=RANGE).json() if e["id"] == event_id]
+    assert listed["participant_count"] == 2
+
+
+def test_keyset_pagination_and_filters(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "ev_pager")
+    ids = [_create(client, token, config_id, f"Round {day}", day) for day in (10, 11, 11, 12, 13)]
+    client.patch(f"/api/v1/events/{ids[-1]}/status", json={"status": "completed"}, headers=auth(token))
+
+    seen, cursor = [], None
+    while True:
+        res = client.get("/api/v1/events/", params={**RANGE, "limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert res.status_code == 200
+        seen += [e["id"] for e in res.json()]
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert [i for i in seen if i in ids] == ids[:-1]
+
+    completed = client.get("/api/v1/events/", params={**RANGE, "status": "completed"}).json()
+    assert [e["id"] for e in completed] == [ids[-1]]
+
+    narrowed = client.get("/api/v1/events/", params={
+        "date_from": "2031-03-11T00:00:00", "date_to": "2031-03-12T00:00:00",
+    }).json()
+    assert [e["id"] for e in narrowed] == ids[1:3]
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/v1/events/", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,126 @@
+"""
+Tests for GPS track simplification and the tolerance-aware map endpoints.
+"""
+import math
+from datetime import datetime, timezone
+
+from app.models.lap import Lap
+from app.models.session import Session as SessionModel
+from app.models.track_configuration import TrackConfiguration
+from app.services.leaderboard import refresh_best_laps
+from app.services.telemetry.geometry import pick_level, simplify_levels, simplify_track
+from tests.conftest import make_user, auth, seed_track_config
+
+
+def _circle(n=5000, radius_m=300.0):
+    """A closed circular lap at 25 Hz around a point near Bogotá."""
+    lat0, lon0 = 4.9, -73.9
+    dlat = radius_m / 111_195.0
+    dlon = dlat / math.cos(math.radians(lat0))
+    return [
+        [i / 25, lat0 + dlat * math.sin(2 * math.pi * i / n), lon0 + dlon * math.cos(2 * math.pi * i / n), 2600.0]
+        for i in range(n)
+    ]
+
+
+def test_straight_line_collapses_to_endpoints():
+    points = [[i, 4.9 + i * 1e-5, -73.9, 0.0] for i in range(100)]
+    assert simplify_track(points, 1.0) == [points[0], points[-1]]
+
+
+def test_coarser_tolerance_keeps_fewer_points():
+    points = _circle()
+    levels = simplify_levels(points)
+    sizes = [len(levels[k]) for k in ("1", "4", "16")]
+    assert sizes[0] < len(points)
+    assert sizes == sorted(sizes, reverse=True)
+    assert sizes[0] < 500
+    # Endpoints and point format survive simplification
+    assert levels["16"][0] == points[0]
+    assert levels["16"][-1] == points[-1]
+
+
+def test_pick_level():
+    levels = simplify_levels(_circle())
+    assert pick_level(levels, 5.0) is levels["4"]
+    assert pick_level(levels, 100.0) is levels["16"]
+    assert pick_level(levels, 0.5) is None
+
+
+def test_lap_gps_track_for():
+    points = _circle()
+    lap = Lap(lap_number=1, gps_track=points, gps_simplified=simplify_levels(points))
+    assert len(lap.gps_track_for(None)) == len(points)
+    assert len(lap.gps_track_for(5.0)) == len(simplify_levels(points)["4"])
+    assert len(lap.gps_track_for(0.5)) == len(points)
+    # Laps imported before levels existed are simplified on the fly
+    lap.gps_simplified = None
+    assert 2 < len(lap.gps_track_for(4.0)) < len(points)
+
+
+def test_track_detail_serves_simplified_best_lap(client, db):
+    config_id = seed_track_config(db)
+    make_user(client, "map_owner")
+    config = db.get(TrackConfiguration, config_id)
+    session = SessionModel(user_id=1, track_configuration_id=config_id, is_public=True,
+                           date=datetime(2025, 11, 6, tzinfo=timezone.utc))
+    db.add(session)
+    db.flush()
+    points = _circle()
+    db.add(Lap(session_id=session.id, lap_number=1, lap_time_ms=90000,
+               gps_track=points, gps_simplified=simplify_levels(points)))
+    refresh_best_laps(db, session.user_id, config_id)
+    db.commit()
+
+    res = client.get(f"/api/v1/tracks/{config.track_id}")
+    assert res.status_code == 200
+    [cfg] = res.json()["configurations"]
+    assert 2 < len(cfg["best_lap_gps"]) < 500
+
+    res = client.get(f"/api/v1/tracks/{config.track_id}", params={"gps_tolerance_m": 0})
+    [cfg] = res.json()["configurations"]
+    assert len(cfg["best_lap_gps"]) == len(points)
+
+
+def test_track_detail_query_count_does_not_grow_with_layouts(client, db):
+    from sqlalchemy import event
+
+    from tests.conftest import async_engine
+
+    config_id = seed_track_config(db)
+    token = make_user(client, "layouts_owner")
+    track_id = db.get(TrackConfiguration, config_id).track_id
+    user_id = client.get("/api/v1/users/me", headers=auth(token)).json()["id"]
+    points = _circle(n=500)
+
+    def add_layout(name):
+        config = TrackConfiguration(track_id=track_id, name=name, num_sectors=3)
+        db.add(config)
+        db.flush()
+        session = SessionModel(user_id=user_id, track_configuration_id=config.id, is_public=True,
+                               date=datetime(2025, 11, 7, tzinfo=timezone.utc))
+        db.add(session)
+        db.flush()
+        db.add(Lap(session_id=session.id, lap_number=1, lap_time_ms=80000,
+                   gps_track=points, gps_simplified=simplify_levels(points)))
+        refresh_best_laps(db, user_id, config.id)
+        db.commit()
+
+    def count_selects():
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+        event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+        try:
+            res = client.get(f"/api/v1/tracks/{track_id}")
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+        assert res.status_code == 200
+        return len(statements), res.json()["configurations"]
+
+    add_layout("Short")
+    one, _ = count_selects()
+    add_layout("Long")
+    add_layout("Club")
+    three, configs = count_selects()
+    assert three == one > 0
+    assert sum(1 for c in configs if c["best_lap_gps"]) == 3
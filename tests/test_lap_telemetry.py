@@ -0,0 +1,173 @@
+"""
+Tests for single-lap telemetry extraction: channel filtering, windows and decimation.
+"""
+import json
+
+import pytest
+
+from app.models.lap import Lap
+from app.services.telemetry.lap_telemetry import LapRef, TelemetryQuery, build_lap_telemetry
+from tests.conftest import make_user, auth, seed_track_config
+
+
+@pytest.fixture
+def lap_ref(tmp_path):
+    """A 10 s lap sampled at 10 Hz at a constant 36 km/h (10 m/s)."""
+    ts = [i / 10 for i in range(101)]
+    path = tmp_path / "lap.json"
+    path.write_text(json.dumps({
+        "lap_number": 1,
+        "lap_time_ms": 10000,
+        "channels": {
+            "speed_gps": {"unit": "km/h", "timestamps": ts, "data": [36.0] * len(ts)},
+            "throttle": {"unit": "%", "timestamps": ts, "data": [float(i) for i in range(len(ts))]},
+            "rpm": {"unit": "rpm", "timestamps": ts, "data": [5000.0] * len(ts)},
+        },
+        "gps_track": [[t, 4.9, -73.9, 2600.0] for t in ts],
+    }))
+    return LapRef(id=1, lap_number=1, lap_time_ms=10000,
+                  telemetry_file_path=str(path), telemetry_format="json", gps_track=None)
+
+
+def test_default_returns_everything(lap_ref):
+    result = build_lap_telemetry(lap_ref)
+    assert {ch.name for ch in result.channels} == {"speed_gps", "throttle", "rpm"}
+    assert len(result.distance_m) == 101
+    assert len(result.gps_track) == 101
+
+
+def test_channel_filter(lap_ref):
+    result = build_lap_telemetry(lap_ref, TelemetryQuery(channels=("throttle",)))
+    assert [ch.name for ch in result.channels] == ["throttle"]
+
+
+def test_time_window(lap_ref):
+    result = build_lap_telemetry(lap_ref, TelemetryQuery(start=2.0, end=3.0))
+    throttle = next(ch for ch in result.channels if ch.name == "throttle")
+    assert throttle.timestamps[0] == pytest.approx(2.0)
+    assert throttle.timestamps[-1] == pytest.approx(3.0)
+    assert len(throttle.data) == 11
+    assert len(result.distance_m) == 11
+    assert result.distance_m[0] == pytest.approx(20.0, rel=0.01)
+    assert result.gps_track[0][0] == pytest.approx(2.0)
+    assert len(result.gps_track) == 11
+
+
+def test_distance_window(lap_ref):
+    result = build_lap_telemetry(lap_ref, TelemetryQuery(start=49.9, end=60.1, axis="distance"))
+    throttle = next(ch for ch in result.channels if ch.name == "throttle")
+    assert throttle.timestamps[0] == pytest.approx(5.0)
+    assert throttle.timestamps[-1] == pytest.approx(6.0)
+    assert result.distance_m[0] == pytest.approx(50.0, rel=0.01)
+    assert result.distance_m[-1] == pytest.approx(60.0, rel=0.01)
+
+
+def test_decimation_keeps_endpoints(lap_ref):
+    result = build_lap_telemetry(lap_ref, TelemetryQuery(points=5))
+    throttle = next(ch for ch in result.channels if ch.name == "throttle")
+    assert len(throttle.data) == 5
+    assert throttle.timestamps[0] == pytest.approx(0.0)
+    assert throttle.timestamps[-1] == pytest.approx(10.0)
+    assert len(result.distance_m) == 5
+
+
+def test_omit_gps_and_distance(lap_ref):
+    result = build_lap_telemetry(lap_ref, TelemetryQuery(include_gps=False, include_distance=False))
+    assert result.gps_track is None
+    assert result.distance_m is None
+
+
+def test_telemetry_endpoint_query_params(client, db, lap_ref):
+    config_id = seed_track_config(db)
+    token = make_user(client, "window_owner")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-11-03T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    lap = Lap(session_id=session_id, lap_number=1, lap_time_ms=10000,
+              telemetry_file_path=lap_ref.telemetry_file_path, telemetry_format="json")
+    db.add(lap)
+    db.commit()
+
+    res = client.get(
+        f"/api/v1/laps/{lap.id}/telemetry",
+        params={"channels": "speed_gps,throttle", "start": 0, "end": 30, "axis": "distance",
+                "points": 4, "include_gps": "false"},
+        headers=auth(token),
+    )
+    assert res.status_code == 200
+    body = res.json()
+    assert sorted(ch["name"] for ch in body["channels"]) == ["speed_gps", "throttle"]
+    assert all(len(ch["data"]) == 4 for ch in body["channels"])
+    assert body["gps_track"] is None
+
+    res = client.get(f"/api/v1/laps/{lap.id}/telemetry", params={"start": 5, "end": 1},
+                     headers=auth(token))
+    assert res.status_code == 400
+
+
+def test_telemetry_etag_and_not_modified(client, db, lap_ref):
+    config_id = seed_track_config(db)
+    token = make_user(client, "etag_owner")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-11-04T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    lap = Lap(session_id=session_id, lap_number=1, lap_time_ms=10000,
+              telemetry_file_path=lap_ref.telemetry_file_path, telemetry_format="json")
+    db.add(lap)
+    db.commit()
+
+    url = f"/api/v1/laps/{lap.id}/telemetry"
+    res = client.get(url, headers={**auth(token), "Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert "immutable" in res.headers["cache-control"]
+    etag = res.headers["etag"]
+    assert res.json()["lap_id"] == lap.id
+
+    res = client.get(url, headers={**auth(token), "If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+
+    # A different slice is a different representation
+    res = client.get(url, params={"points": 3}, headers={**auth(token), "If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.headers["etag"] != etag
+
+
+def test_body_cache_is_bounded():
+    from app.services.http_cache import BodyCache, CachedBody
+
+    cache = BodyCache(max_bytes=100)
+    cache.put('"a"', CachedBody(b"x" * 30, b"x" * 10, None))
+    cache.put('"b"', CachedBody(b"x" * 30, b"x" * 10, None))
+    assert cache.get('"a"') is not None  # refreshes "a"
+    cache.put('"c"', CachedBody(b"x" * 30, b"x" * 10, None))
+    assert cache.get('"b"') is None
+    assert cache.get('"a"') is not None
+    assert cache.size_bytes <= 100
+
+
+def test_telemetry_endpoint_loads_stored_track(client, db, lap_ref):
+    config_id = seed_track_config(db)
+    token = make_user(client, "track_owner")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-11-05T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    points = [[i / 10, 4.9 + i * 1e-5, -73.9, 2600.0] for i in range(101)]
+    lap = Lap(session_id=session_id, lap_number=1, lap_time_ms=10000,
+              telemetry_file_path=lap_ref.telemetry_file_path, telemetry_format="json", gps_track=points)
+    db.add(lap)
+    db.commit()
+
+    url = f"/api/v1/laps/{lap.id}/telemetry"
+    res = client.get(url, headers=auth(token))
+    assert res.status_code == 200
+    assert len(res.json()["gps_track"]) == 101
+
+    # No simplified levels stored: the deferred full track is loaded to simplify it
+    res = client.get(url, params={"gps_tolerance_m": 5}, headers=auth(token))
+    assert res.status_code == 200
+    assert 2 <= len(res.json()["gps_track"]) < 101
@@ -0,0 +1,135 @@
+"""
+Tests for the materialized best_laps leaderboard.
+"""
+from app.models.best_lap import BestLap
+from tests.conftest import make_user, auth, seed_track_config
+
+
+def _session(client, token, config_id, **extra):
+    return client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-12-01T08:00:00Z",
+        "is_public": True,
+        **extra,
+    }, headers=auth(token)).json()["id"]
+
+
+def _lap(client, token, session_id, lap_number, lap_time_ms, **extra):
+    return client.post("/api/v1/laps/", json={
+        "session_id": session_id, "lap_number": lap_number, "lap_time_ms": lap_time_ms, **extra,
+    }, headers=auth(token)).json()["id"]
+
+
+def _entries(client, config_id, **params):
+    return client.get(f"/api/v1/leaderboard/{config_id}", params=params).json()["entries"]
+
+
+def test_best_lap_follows_lap_changes(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "lb_driver")
+    session_id = _session(client, token, config_id)
+    slow = _lap(client, token, session_id, 1, 92000)
+    fast = _lap(client, token, session_id, 2, 90500)
+    _lap(client, token, session_id, 3, 80000, is_valid=False)
+
+    [entry] = _entries(client, config_id)
+    assert entry["best_lap_ms"] == 90500
+    assert entry["user"]["username"] == "lb_driver"
+
+    client.delete(f"/api/v1/laps/{fast}", headers=auth(token))
+    [entry] = _entries(client, config_id)
+    assert entry["best_lap_ms"] == 92000
+
+    client.delete(f"/api/v1/laps/{slow}", headers=auth(token))
+    assert _entries(client, config_id) == []
+
+
+def test_visibility_and_car_category(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "lb_owner")
+    car_id = client.post("/api/v1/cars/", json={"make": "Mazda", "model": "MX-5", "category": "Roadster"},
+                         headers=auth(token)).json()["id"]
+    with_car = _session(client, token, config_id, car_id=car_id)
+    without_car = _session(client, token, config_id)
+    _lap(client, token, with_car, 1, 95000)
+    _lap(client, token, without_car, 1, 97000)
+
+    # One entry per user: their best across categories
+    [entry] = _entries(client, config_id)
+    assert (entry["car_category"], entry["best_lap_ms"]) == ("Roadster", 95000)
+    assert [e["best_lap_ms"] for e in _entries(client, config_id, car_category="")] == [97000]
+
+    client.patch(f"/api/v1/cars/{car_id}", json={"category": "Cup"}, headers=auth(token))
+    assert _entries(client, config_id, car_category="Roadster") == []
+    assert [e["best_lap_ms"] for e in _entries(client, config_id, car_category="Cup")] == [95000]
+
+    # Making a session private removes its laps from the leaderboard
+    client.patch(f"/api/v1/sessions/{with_car}", json={"is_public": False}, headers=auth(token))
+    assert [e["best_lap_ms"] for e in _entries(client, config_id)] == [97000]
+
+    client.delete(f"/api/v1/sessions/{without_car}", headers=auth(token))
+    assert _entries(client, config_id) == []
+    assert db.query(BestLap).filter_by(track_configuration_id=config_id).count() == 0
+
+
+def test_deleting_a_car_uncategorises_its_laps(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "lb_seller")
+    car_id = client.post("/api/v1/cars/", json={"make": "Lotus", "model": "Elise", "category": "Sports"},
+                         headers=auth(token)).json()["id"]
+    _lap(client, token, _session(client, token, config_id, car_id=car_id), 1, 93000)
+    assert [e["best_lap_ms"] for e in _entries(client, config_id, car_category="Sports")] == [93000]
+
+    assert client.delete(f"/api/v1/cars/{car_id}", headers=auth(token)).status_code == 204
+    assert _entries(client, config_id, car_category="Sports") == []
+    [entry] = _entries(client, config_id, car_category="")
+    assert (entry["best_lap_ms"], entry["car_category"]) == (93000, None)
+
+
+def test_active_tracks_use_best_laps(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "lb_active")
+    _lap(client, token, _session(client, token, config_id), 1, 88000)
+
+    [row] = [r for r in client.get("/api/v1/leaderboard/").json() if r["configuration_id"] == config_id]
+    assert row["best_lap_ms"] == 88000
+
+
+def test_keyset_pages_rank_each_user_once(client, db):
+    config_id = seed_track_config(db)
+    times = {}
+    for i in range(7):
+        token = make_user(client, f"lb_pager{i}")
+        # Two sessions each; only the faster lap may appear
+        for offset in (500, 0):
+            _lap(client, token, _session(client, token, config_id), 1, 90000 + i * 100 + offset)
+        times[f"lb_pager{i}"] = 90000 + i * 100
+
+    entries, cursor = [], None
+    while True:
+        body = client.get(f"/api/v1/leaderboard/{config_id}",
+                          params={"limit": 3, **({"cursor": cursor} if cursor else {})}).json()
+        entries += body["entries"]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert [e["rank"] for e in entries] == list(range(1, 8))
+    assert {e["user"]["username"]: e["best_lap_ms"] for e in entries} == times
+
+
+def test_date_and_event_filters_use_live_laps(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "lb_window")
+    event_id = client.post("/api/v1/events/", json={
+        "track_configuration_id": config_id, "name": "Window Cup",
+        "date_start": "2025-06-01T08:00:00", "date_end": "2025-06-01T18:00:00",
+    }, headers=auth(token)).json()["id"]
+    early = _session(client, token, config_id, date="2025-05-01T08:00:00Z")
+    in_event = _session(client, token, config_id, date="2025-06-01T09:00:00Z", event_id=event_id)
+    _lap(client, token, early, 1, 88000)
+    _lap(client, token, in_event, 1, 91000)
+
+    assert [e["best_lap_ms"] for e in _entries(client, config_id)] == [88000]
+    assert [e["best_lap_ms"] for e in _entries(client, config_id, event_id=event_id)] == [91000]
+    assert [e["best_lap_ms"] for e in _entries(client, config_id, date_from="2025-05-15T00:00:00Z")] == [91000]
+    assert [e["best_lap_ms"] for e in _entries(client, config_id, date_to="2025-05-15T00:00:00Z")] == [88000]
@@ -0,0 +1,77 @@
+"""
+Tests for connection pool instrumentation.
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.models.user import User
+from app.services.pool_metrics import PoolMetrics, instrumented_pool, watch_engine
+from tests.conftest import make_user, auth
+
+
+@pytest.fixture
+def pooled():
+    metrics = PoolMetrics()
+    path = os.path.join(tempfile.mkdtemp(), "pool.db")
+    engine = create_engine(
+        f"sqlite:///{path}", poolclass=instrumented_pool(QueuePool, metrics),
+        pool_size=1, max_overflow=0, pool_timeout=0.05, pool_pre_ping=True,
+    )
+    watch_engine(engine, metrics)
+    yield engine, metrics
+    engine.dispose()
+    os.remove(path)
+
+
+def test_checkouts_and_timeouts_are_recorded(pooled):
+    engine, metrics = pooled
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = metrics.snapshot(engine.pool)
+        assert (stats["checked_out"], stats["pool_size"]) == (1, 1)
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    stats = metrics.snapshot(engine.pool)
+    assert (stats["checkouts"], stats["checkout_timeouts"], stats["checked_out"]) == (1, 1, 0)
+    assert stats["wait_ms"]["buckets"]["+Inf"] == 2
+    # The timed-out checkout waited at least pool_timeout
+    assert stats["wait_ms"]["max"] >= 50
+    assert stats["wait_ms"]["buckets"]["25"] == 1
+
+
+def test_metrics_survive_dispose(pooled):
+    engine, metrics = pooled
+    engine.connect().close()
+    engine.dispose()
+    engine.connect().close()
+    assert metrics.snapshot(engine.pool)["checkouts"] == 2
+
+
+def test_pre_ping_failures_are_counted(pooled):
+    engine, metrics = pooled
+    with engine.connect() as conn:
+        raw = conn.connection.dbapi_connection
+    raw.close()  # the server dropped it while it sat in the pool
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+    stats = metrics.snapshot(engine.pool)
+    assert stats["pre_ping_failures"] == 1
+    assert stats["invalidations"] == 1
+
+
+def test_db_metrics_requires_superuser(client, db):
+    plain = make_user(client, "pool_user")
+    assert client.get("/api/v1/admin/metrics/db", headers=auth(plain)).status_code == 403
+
+    token = make_user(client, "pool_admin")
+    db.query(User).filter(User.username == "pool_admin").update({User.is_superuser: True})
+    db.commit()
+    body = client.get("/api/v1/admin/metrics/db", headers=auth(token)).json()
+    assert set(body) == {"sync", "async"}
+    assert {"checkouts", "pre_ping_failures", "wait_ms"} <= set(body["sync"])
@@ -0,0 +1,96 @@
+"""
+Tests for the min/max level-of-detail pyramid.
+"""
+import json
+import math
+
+import pytest
+
+from app.models.lap import Lap
+from app.services.telemetry.pyramid import read_pyramid, write_pyramid
+from tests.conftest import make_user, auth, seed_track_config
+
+N = 10_000
+
+
+@pytest.fixture
+def lap_data():
+    ts = [i / 25 for i in range(N)]
+    return {
+        "lap_number": 1,
+        "lap_time_ms": int(ts[-1] * 1000),
+        "channels": {
+            "speed_gps": {"unit": "km/h", "timestamps": ts, "data": [100.0] * N},
+            "throttle": {"unit": "%", "timestamps": ts,
+                         "data": [50 + 50 * math.sin(i / 100) for i in range(N)]},
+        },
+    }
+
+
+def test_levels_halve_until_small(tmp_path, lap_data):
+    write_pyramid(str(tmp_path), lap_data)
+    index = json.loads((tmp_path / "index.json").read_text())
+    throttle = next(c for c in index["channels"] if c["name"] == "throttle")
+    counts = [count for _, count, _ in throttle["levels"]]
+    buckets = [bucket for _, _, bucket in throttle["levels"]]
+    assert counts[0] == N
+    assert buckets == [2 ** k for k in range(len(buckets))]
+    assert counts[-1] <= 64
+    assert {c["name"] for c in index["channels"]} == {"speed_gps", "throttle", "distance_m"}
+
+
+def test_read_respects_width_and_preserves_extremes(tmp_path, lap_data):
+    write_pyramid(str(tmp_path), lap_data)
+    [ch] = read_pyramid(str(tmp_path), ("throttle",), None, None, width=500)
+    assert len(ch.timestamps) <= 500
+    assert ch.bucket_size > 1
+    assert max(ch.max) == pytest.approx(100.0, abs=1e-3)
+    assert min(ch.min) == pytest.approx(0.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("width", [16, 32, 63])
+def test_width_below_coarsest_level_merges_buckets(tmp_path, lap_data, width):
+    write_pyramid(str(tmp_path), lap_data)
+    [ch] = read_pyramid(str(tmp_path), ("throttle",), None, None, width=width)
+    assert len(ch.timestamps) <= width
+    assert len(ch.min) == len(ch.max) == len(ch.mean) == len(ch.timestamps)
+    assert ch.bucket_size * len(ch.timestamps) >= N
+    assert max(ch.max) == pytest.approx(100.0, abs=1e-3)
+    assert min(ch.min) == pytest.approx(0.0, abs=1e-3)
+
+
+def test_narrow_window_returns_raw_samples(tmp_path, lap_data):
+    write_pyramid(str(tmp_path), lap_data)
+    [ch] = read_pyramid(str(tmp_path), ("throttle",), 10.0, 12.0, width=500)
+    assert ch.bucket_size == 1
+    assert ch.timestamps[0] == pytest.approx(10.0, abs=0.05)
+    assert ch.timestamps[-1] == pytest.approx(12.0, abs=0.05)
+
+
+def test_missing_pyramid_returns_none(tmp_path):
+    assert read_pyramid(str(tmp_path / "nope"), None, None, None, width=100) is None
+
+
+def test_lod_endpoint_builds_pyramid_on_demand(client, db, tmp_path, lap_data):
+    config_id = seed_track_config(db)
+    token = make_user(client, "lod_owner")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id,
+        "date": "2025-11-05T08:00:00Z",
+    }, headers=auth(token)).json()["id"]
+    path = tmp_path / "lap.json"
+    path.write_text(json.dumps(lap_data))
+    lap = Lap(session_id=session_id, lap_number=1, telemetry_file_path=str(path), telemetry_format="json")
+    db.add(lap)
+    db.commit()
+
+    res = client.get(f"/api/v1/laps/{lap.id}/lod", params={"channels": "throttle", "width": 200},
+                     headers=auth(token))
+    assert res.status_code == 200
+    [ch] = res.json()["channels"]
+    assert ch["name"] == "throttle"
+    assert len(ch["timestamps"]) <= 200
+
+    res = client.get(f"/api/v1/laps/{lap.id}/lod", params={"channels": "throttle", "width": 200},
+                     headers={**auth(token), "If-None-Match": res.headers["etag"]})
+    assert res.status_code == 304
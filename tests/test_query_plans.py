@@ -0,0 +1,215 @@
+"""
+Query-plan regression tests for the hot read paths.
+
+The endpoints run against a scratch Postgres database named by TEST_POSTGRES_URL.
+Every statement they issue is captured and EXPLAINed with `enable_seqscan = off`.
+Postgres still picks a sequential scan in that mode when no index can serve the
+query, so any Seq Scan on a large table means a missing or unusable index.
+These tests are skipped when TEST_POSTGRES_URL is unset. The database is dropped
+and recreated, so never point it at real data.
+"""
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.api.pagination import encode_cursor
+from app.database import Base, async_database_url, get_async_db, get_db, get_read_db
+from app.main import app
+from app.models.car import Car
+from app.models.event import Event, EventParticipant
+from app.models.lap import Lap
+from app.models.session import Session
+from app.models.track import Track
+from app.models.track_configuration import TrackConfiguration
+from app.models.user import User
+from app.services.leaderboard import refresh_best_laps
+from app.services.response_cache import response_cache
+from tests.conftest import make_user, auth
+
+PG_URL = os.environ.get("TEST_POSTGRES_URL")
+pytestmark = pytest.mark.skipif(not PG_URL, reason="TEST_POSTGRES_URL not set")
+
+# Tables that grow with usage; small lookup tables may be scanned freely
+WATCHED = {"laps", "lap_tracks", "sessions", "best_laps", "events", "event_participants"}
+
+N_USERS = 200
+N_CONFIGS = 4
+N_SESSIONS = 4000
+LAPS_PER_SESSION = 12
+N_EVENTS = 40
+
+
+@pytest.fixture(scope="module")
+def pg():
+    # Every request must reach the database to be explained
+    response_cache.enabled = False
+    engine = create_engine(PG_URL)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    SessionPg = sessionmaker(bind=engine, autoflush=False)
+    db = SessionPg()
+
+    async_engine = create_async_engine(async_database_url(PG_URL), poolclass=NullPool)
+    AsyncSessionPg = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        yield db
+
+    async def override_get_async_db():
+        async with AsyncSessionPg() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_async_db
+    with TestClient(app) as client:
+        token = make_user(client, "plan_owner")
+        owner_id = client.get("/api/v1/users/me", headers=auth(token)).json()["id"]
+        ids = _seed(engine, db, owner_id)
+        yield (engine, async_engine.sync_engine), client, token, ids
+    app.dependency_overrides.clear()
+    db.close()
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+    response_cache.enabled = True
+
+
+def _seed(engine, db, owner_id: int) -> dict:
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"username": f"plan_user{i}", "email": f"plan_user{i}@example.com"} for i in range(N_USERS)
+        ])
+        user_ids = [owner_id] + [r.id for r in conn.execute(User.__table__.select().where(User.id != owner_id))]
+        track_id = conn.execute(insert(Track).values(name="Plan Circuit", country="Testland").returning(Track.id)).scalar_one()
+        config_ids = conn.execute(insert(TrackConfiguration).returning(TrackConfiguration.id), [
+            {"track_id": track_id, "name": f"Layout {i}", "num_sectors": 3} for i in range(N_CONFIGS)
+        ]).scalars().all()
+        car_ids = conn.execute(insert(Car).returning(Car.id), [
+            {"owner_id": u, "make": "Mazda", "model": "MX-5", "category": ("Cup", "Street")[u % 2]}
+            for u in user_ids[:50]
+        ]).scalars().all()
+        event_ids = conn.execute(insert(Event).returning(Event.id), [
+            {"organizer_id": user_ids[i % len(user_ids)], "track_configuration_id": config_ids[i % N_CONFIGS],
+             "name": f"Event {i}", "date_start": now + timedelta(days=i), "date_end": now + timedelta(days=i, hours=6),
+             "is_public": i % 4 != 0}
+            for i in range(N_EVENTS)
+        ]).scalars().all()
+        conn.execute(insert(EventParticipant), [
+            {"event_id": event_ids[i % N_EVENTS], "user_id": user_ids[i % len(user_ids)]} for i in range(2000)
+        ])
+        session_ids = conn.execute(insert(Session).returning(Session.id), [
+            {"user_id": user_ids[i % len(user_ids)], "track_configuration_id": config_ids[i % N_CONFIGS],
+             "car_id": car_ids[i % len(car_ids)] if i % 3 == 0 else None,
+             "event_id": event_ids[i % N_EVENTS] if i % 10 == 0 else None,
+             "date": now - timedelta(hours=i), "is_public": i % 2 == 0}
+            for i in range(N_SESSIONS)
+        ]).scalars().all()
+        conn.execute(insert(Lap), [
+            {"session_id": s, "lap_number": n, "lap_time_ms": 90000 + (s * 7919 + n * 104729) % 20000,
+             "is_valid": n % 7 != 0, "is_outlap": n == 1, "is_inlap": n == LAPS_PER_SESSION}
+            for s in session_ids for n in range(1, LAPS_PER_SESSION + 1)
+        ])
+
+    for user_id in user_ids:
+        for config_id in config_ids:
+            refresh_best_laps(db, user_id, config_id)
+    db.commit()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql("ANALYZE")
+
+    owned = [s for i, s in enumerate(session_ids) if i % len(user_ids) == 0]
+    # Halfway down the public feed (even-numbered sessions are public)
+    feed_cursor = encode_cursor(now - timedelta(hours=N_SESSIONS // 2), session_ids[N_SESSIONS // 2])
+    return {"track": track_id, "config": config_ids[0], "event": event_ids[1], "session": owned[0],
+            "feed_cursor": feed_cursor}
+
+
+def _plan_nodes(conn, statement: str, parameters) -> list[dict]:
+    [(plan,)] = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters).all()
+    nodes, stack = [], [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        nodes.append(node)
+        stack.extend(node.get("Plans", []))
+    return nodes
+
+
+def _seq_scans(conn, statement: str, parameters) -> set[str]:
+    return {
+        node["Relation Name"] for node in _plan_nodes(conn, statement, parameters)
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in WATCHED
+    }
+
+
+REQUESTS = {
+    "active_tracks": lambda ids: ("GET", "/api/v1/leaderboard/", None),
+    "leaderboard": lambda ids: ("GET", f"/api/v1/leaderboard/{ids['config']}", None),
+    "leaderboard_category": lambda ids: ("GET", f"/api/v1/leaderboard/{ids['config']}?car_category=Cup", None),
+    "leaderboard_event": lambda ids: ("GET", f"/api/v1/leaderboard/{ids['config']}?event_id={ids['event']}", None),
+    "track_detail": lambda ids: ("GET", f"/api/v1/tracks/{ids['track']}", None),
+    "events": lambda ids: ("GET", "/api/v1/events/", None),
+    "event_detail": lambda ids: ("GET", f"/api/v1/events/{ids['event']}", None),
+    "my_sessions": lambda ids: ("GET", "/api/v1/sessions/", None),
+    "public_sessions": lambda ids: ("GET", "/api/v1/sessions/?public_only=true", None),
+    "public_sessions_page": lambda ids: ("GET", f"/api/v1/sessions/?public_only=true&cursor={ids['feed_cursor']}", None),
+    "session_laps": lambda ids: ("GET", f"/api/v1/laps/session/{ids['session']}", None),
+    "lap_create": lambda ids: ("POST", "/api/v1/laps/",
+                               {"session_id": ids["session"], "lap_number": 99, "lap_time_ms": 85000}),
+}
+
+
+def _capture_statements(pg, name) -> list[tuple]:
+    (engine, async_sync_engine), client, token, ids = pg
+    method, url, body = REQUESTS[name](ids)
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            if conn.engine is async_sync_engine:
+                # asyncpg's $n placeholders, re-targeted at the psycopg2 connection used to EXPLAIN
+                statement = re.sub(r"\$\d+", "%s", statement.replace("%", "%%"))
+                parameters = tuple(parameters)
+            statements.append((statement, parameters))
+
+    for e in (engine, async_sync_engine):
+        event.listen(e, "before_cursor_execute", capture)
+    try:
+        res = client.request(method, url, json=body, headers=auth(token))
+    finally:
+        for e in (engine, async_sync_engine):
+            event.remove(e, "before_cursor_execute", capture)
+    assert res.status_code < 400, res.text
+    assert statements
+    return statements
+
+
+@pytest.mark.parametrize("name", REQUESTS)
+def test_no_sequential_scans(pg, name):
+    engine = pg[0][0]
+    statements = _capture_statements(pg, name)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        offenders = {s: scans for s, p in statements if (scans := _seq_scans(conn, s, p))}
+        conn.rollback()
+    assert not offenders, offenders
+
+
+@pytest.mark.parametrize("name", ["public_sessions", "public_sessions_page"])
+def test_public_feed_reads_the_index_in_order(pg, name):
+    """A feed page is the first `limit + 1` index entries, never a sort of every public session."""
+    engine = pg[0][0]
+    statements = _capture_statements(pg, name)
+    page = [(s, p) for s, p in statements if "ORDER BY sessions.date DESC" in s]
+    assert len(page) == 1
+    with engine.connect() as conn:
+        nodes = _plan_nodes(conn, *page[0])
+    assert not [n for n in nodes if n["Node Type"] in ("Sort", "Incremental Sort")], nodes
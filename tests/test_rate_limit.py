@@ -0,0 +1,83 @@
+"""
+Tests for the token-bucket rate limiter.
+"""
+import asyncio
+import math
+
+import pytest
+
+from app.services import rate_limit
+from app.services.rate_limit import Limit, LimiterUnavailable, MemoryBuckets, RateLimiter, rate_limiter
+from tests.conftest import make_user, auth
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Enable the app's limiter with fresh per-process buckets and the given limits."""
+    def configure(**specs):
+        monkeypatch.setattr(rate_limiter, "enabled", True)
+        monkeypatch.setattr(rate_limiter, "limits", {route: Limit.parse(s) for route, s in specs.items()})
+        monkeypatch.setattr(rate_limiter, "_backend", MemoryBuckets(100))
+    return configure
+
+
+def test_bucket_allows_a_burst_then_refills(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    buckets, limit = MemoryBuckets(10), Limit.parse("3/30")
+
+    async def takes(n):
+        return [await buckets.take("k", limit) for _ in range(n)]
+
+    assert asyncio.run(takes(3)) == [0, 0, 0]
+    assert asyncio.run(takes(1)) == [pytest.approx(10.0)]
+    clock[0] += 10
+    assert asyncio.run(takes(2)) == [0, pytest.approx(10.0)]
+
+
+def test_memory_buckets_are_bounded():
+    buckets, limit = MemoryBuckets(2), Limit.parse("1/60")
+    for key in ("a", "b", "c"):
+        asyncio.run(buckets.take(key, limit))
+    # "a" was evicted, so it starts again from a full bucket
+    assert asyncio.run(buckets.take("a", limit)) == 0
+    assert asyncio.run(buckets.take("c", limit)) > 0
+
+
+def test_unreachable_backend_falls_back_to_local_buckets():
+    class Down:
+        async def take(self, key, limit):
+            raise LimiterUnavailable("connection refused")
+
+    limiter = RateLimiter("memory", {"login": "1/60"}, max_keys=10)
+    limiter._backend = Down()
+    assert asyncio.run(limiter.hit("login", "ip:1.2.3.4")) == 0
+    assert asyncio.run(limiter.hit("login", "ip:1.2.3.4")) > 0
+    assert asyncio.run(limiter.hit("unlimited", "ip:1.2.3.4")) == 0
+
+
+def test_backend_is_resolved_without_blocking():
+    limiter = RateLimiter("memory", {"login": "1/60"}, max_keys=10)
+    backend = asyncio.run(limiter.connect())
+    assert isinstance(backend, MemoryBuckets)
+    assert asyncio.run(limiter.connect()) is backend
+
+
+def test_login_is_limited_per_client_ip(client, limits):
+    make_user(client, "limited_login")
+    limits(login="2/60")
+    for _ in range(2):
+        res = client.post("/api/v1/auth/login", data={"username": "limited_login", "password": "wrong"})
+        assert res.status_code == 401
+    res = client.post("/api/v1/auth/login", data={"username": "limited_login", "password": "pass123"})
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) == math.ceil(60 / 2)
+
+
+def test_buckets_are_per_user(client, limits):
+    runaway = make_user(client, "limited_runaway")
+    bystander = make_user(client, "limited_bystander")
+    limits(telemetry="2/60")
+    statuses = [client.get("/api/v1/laps/999999/telemetry", headers=auth(runaway)).status_code for _ in range(3)]
+    assert statuses == [404, 404, 429]
+    assert client.get("/api/v1/laps/999999/telemetry", headers=auth(bystander)).status_code == 404
@@ -0,0 +1,103 @@
+"""
+Tests for routing read-only endpoints to replicas.
+
+The conftest database plays the primary; a second SQLite file plays the replica.
+"""
+import asyncio
+import os
+import tempfile
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.database as database
+from app.database import PRIMARY_PIN_COOKIE, Base, Replica, get_read_db, read_replicas
+from app.main import app
+from app.models.event import Event
+from app.models.track import Track
+from tests.conftest import TestingAsyncSessionLocal, make_user
+
+
+def _event_names(client):
+    res = client.get("/api/v1/events/")
+    assert res.status_code == 200
+    return {e["name"] for e in res.json()}
+
+
+@pytest.fixture
+def routed(client, monkeypatch):
+    """Route reads through the real get_read_db, with the test database as primary."""
+    app.dependency_overrides.pop(get_read_db)
+    monkeypatch.setattr(database, "AsyncSessionLocal", TestingAsyncSessionLocal)
+
+    def use_replicas(*urls):
+        replicas = [Replica(f"replica-test-{i}", url) for i, url in enumerate(urls)]
+        monkeypatch.setattr(read_replicas, "replicas", replicas)
+        return replicas
+
+    client.cookies.clear()
+    yield client, use_replicas
+    asyncio.run(read_replicas.dispose())
+
+
+@pytest.fixture
+def replica_url():
+    path = os.path.join(tempfile.mkdtemp(), "replica.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        now = datetime.now(timezone.utc)
+        db.add(Event(organizer_id=1, track_configuration_id=1, name="Replica Cup", date_start=now, date_end=now))
+        db.add(Track(name="Replica Ring", country="Testland"))
+        db.commit()
+    engine.dispose()
+    yield f"sqlite:///{path}"
+    os.remove(path)
+
+
+def test_writes_do_not_pin_without_replicas(client):
+    client.cookies.clear()
+    res = client.post("/api/v1/auth/register", json={
+        "username": "no_replica", "email": "no_replica@example.com", "password": "pass123",
+    })
+    assert res.status_code in (200, 201)
+    assert PRIMARY_PIN_COOKIE not in res.cookies
+
+
+def test_reads_use_replica_until_a_write(routed, replica_url):
+    client, use_replicas = routed
+    use_replicas(replica_url)
+    assert "Replica Cup" in _event_names(client)
+
+    make_user(client, "replica_writer")
+    assert client.cookies.get(PRIMARY_PIN_COOKIE) == "1"
+    assert "Replica Cup" not in _event_names(client)
+
+    client.cookies.clear()
+    assert "Replica Cup" in _event_names(client)
+
+
+def test_unreachable_replica_falls_back_to_primary(routed, replica_url):
+    client, use_replicas = routed
+    missing = os.path.join(tempfile.mkdtemp(), "absent", "replica.db")
+    dead, alive = use_replicas(f"sqlite:///{missing}", replica_url)
+
+    # Whichever replica comes first, every read lands on the live one
+    for _ in range(3):
+        assert "Replica Cup" in _event_names(client)
+    assert dead.down_until > 0 and alive.down_until == 0
+
+    alive.down_until = float("inf")
+    assert "Replica Cup" not in _event_names(client)
+
+
+def test_cached_endpoints_read_the_primary(routed, replica_url):
+    # A fill from a lagging replica would be cached under the new tag version
+    client, use_replicas = routed
+    use_replicas(replica_url)
+    assert "Replica Cup" in _event_names(client)
+    res = client.get("/api/v1/tracks/")
+    assert res.status_code == 200
+    assert "Replica Ring" not in {t["name"] for t in res.json()}
@@ -0,0 +1,59 @@
+"""
+Tests for refresh-token rotation and the background sweeper.
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.core.security import hash_refresh_token
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.tasks import refresh_token_sweeper
+from tests.conftest import TestingAsyncSessionLocal, make_user
+
+
+def test_refresh_rotates_the_token(client, db):
+    make_user(client, "rotating_driver")
+    first = client.cookies.get("refresh_token")
+
+    res = client.post("/api/v1/auth/refresh")
+    assert res.status_code == 200
+    assert "access_token" in res.json()
+    second = client.cookies.get("refresh_token")
+    assert second and second != first
+    assert db.query(RefreshToken.revoked).filter(
+        RefreshToken.token_hash == hash_refresh_token(first)).scalar() is True
+
+    # The old token can be redeemed only once
+    client.cookies.set("refresh_token", first)
+    assert client.post("/api/v1/auth/refresh").status_code == 401
+    client.cookies.set("refresh_token", second)
+    assert client.post("/api/v1/auth/refresh").status_code == 200
+
+
+def test_expired_token_is_refused(client, db):
+    make_user(client, "expired_driver")
+    raw = client.cookies.get("refresh_token")
+    db.query(RefreshToken).filter(RefreshToken.token_hash == hash_refresh_token(raw)).update(
+        {RefreshToken.expires_at: datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    assert client.post("/api/v1/auth/refresh").status_code == 401
+
+
+def test_sweep_deletes_expired_and_revoked_in_batches(db):
+    user = User(username="sweep_driver", email="sweep_driver@example.com")
+    db.add(user)
+    db.flush()
+    now = datetime.now(timezone.utc)
+    for i in range(7):
+        db.add(RefreshToken(user_id=user.id, token_hash=f"sweep-expired-{i}", expires_at=now - timedelta(days=1)))
+    for i in range(4):
+        db.add(RefreshToken(user_id=user.id, token_hash=f"sweep-revoked-{i}", expires_at=now + timedelta(days=1),
+                            revoked=True))
+    db.add(RefreshToken(user_id=user.id, token_hash="sweep-live", expires_at=now + timedelta(days=1)))
+    db.commit()
+
+    removed = asyncio.run(refresh_token_sweeper.sweep(TestingAsyncSessionLocal, batch_size=3, pause_s=0))
+    assert removed >= 11
+    db.expire_all()
+    remaining = db.query(RefreshToken.token_hash).filter(RefreshToken.user_id == user.id).all()
+    assert remaining == [("sweep-live",)]
@@ -0,0 +1,176 @@
+"""
+Tests for the read-through response cache on public endpoints.
+"""
+import asyncio
+import threading
+import time
+
+from app.services.response_cache import MemoryBackend, RedisBackend, ResponseCache, invalidate_on_commit
+from tests.conftest import make_user, auth, seed_track_config
+
+
+def test_leaderboard_is_cached_until_a_lap_changes(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "rc_driver")
+    session_id = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id, "date": "2025-12-02T08:00:00Z", "is_public": True,
+    }, headers=auth(token)).json()["id"]
+    client.post("/api/v1/laps/", json={"session_id": session_id, "lap_number": 1, "lap_time_ms": 91000},
+                headers=auth(token))
+
+    first = client.get(f"/api/v1/leaderboard/{config_id}")
+    second = client.get(f"/api/v1/leaderboard/{config_id}")
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert first.json() == second.json()
+
+    client.post("/api/v1/laps/", json={"session_id": session_id, "lap_number": 2, "lap_time_ms": 89000},
+                headers=auth(token))
+    res = client.get(f"/api/v1/leaderboard/{config_id}")
+    assert res.headers["X-Cache"] == "MISS"
+    assert res.json()["entries"][0]["best_lap_ms"] == 89000
+
+
+def test_track_edits_invalidate_track_listing(client, db):
+    from app.models.track_configuration import TrackConfiguration
+
+    config = db.get(TrackConfiguration, seed_track_config(db))
+    client.get("/api/v1/tracks/")
+    assert client.get("/api/v1/tracks/").headers["X-Cache"] == "HIT"
+
+    config.name = "Renamed Layout"
+    invalidate_on_commit(db, "tracks")
+    db.commit()
+    res = client.get("/api/v1/tracks/")
+    assert res.headers["X-Cache"] == "MISS"
+    names = [c["name"] for t in res.json() if t["id"] == config.track_id for c in t["configurations"]]
+    assert names == ["Renamed Layout"]
+
+
+def _value(v):
+    async def compute():
+        return v
+    return compute
+
+
+def test_invalidation_waits_for_commit(db, monkeypatch):
+    from app.services import response_cache as module
+
+    cache = ResponseCache("memory", ttl_s=60, lock_timeout_s=1, max_entries=16)
+    monkeypatch.setattr(module, "response_cache", cache)
+
+    def get(v):
+        return asyncio.run(cache.get_or_compute("x", {}, ("t",), _value(v)))
+
+    get(1)
+    invalidate_on_commit(db, "t")
+    assert get(2) == (b"1", True)
+    db.rollback()
+    db.commit()
+    assert get(2) == (b"1", True)
+
+    invalidate_on_commit(db, "t")
+    db.commit()
+    assert get(3) == (b"3", False)
+
+
+def test_backend_is_resolved_without_blocking():
+    cache = ResponseCache("memory", ttl_s=60, lock_timeout_s=1, max_entries=16)
+    cache.invalidate("t")  # before connecting there is nothing to bump
+    backend = asyncio.run(cache.connect())
+    assert isinstance(backend, MemoryBackend)
+    assert asyncio.run(cache.connect()) is backend
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.tags = {}
+
+    def pipeline(self, transaction):
+        fake = self
+
+        class Pipeline(list):
+            def incr(self, key):
+                self.append(key)
+
+            async def execute(self):
+                for key in self:
+                    fake.tags[key] = fake.tags.get(key, 0) + 1
+
+        return Pipeline()
+
+
+def test_redis_bump_never_blocks_the_loop():
+    aclient = _FakeRedis()
+
+    async def main():
+        backend = RedisBackend(aclient, asyncio.get_running_loop())
+        backend.bump(("a",))  # after_commit of an async session: scheduled, not awaited
+        assert aclient.tags == {}
+        await asyncio.sleep(0.01)
+        assert aclient.tags == {"rc:tag:a": 1}
+
+        # A sync write endpoint's thread waits for its bump on the client's loop
+        thread = threading.Thread(target=backend.bump, args=(("a", "b"),))
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.01)
+        assert aclient.tags == {"rc:tag:a": 2, "rc:tag:b": 1}
+
+    asyncio.run(main())
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache("memory", ttl_s=0.05, lock_timeout_s=1, max_entries=16)
+
+    def get(v):
+        return asyncio.run(cache.get_or_compute("x", {"a": 1}, ("t",), _value(v)))
+
+    assert get([1]) == (b"[1]", False)
+    assert get([2]) == (b"[1]", True)
+    time.sleep(0.1)
+    assert get([3]) == (b"[3]", False)
+
+
+def test_concurrent_misses_compute_once():
+    cache = ResponseCache("memory", ttl_s=60, lock_timeout_s=5, max_entries=16)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get_or_compute("slow", {}, ("t",), compute) for _ in range(8)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [body for body, _ in results] == [b'{"ok":true}'] * 8
+    assert sum(hit for _, hit in results) == 7
+
+
+def test_failed_computation_is_shared_and_not_cached():
+    cache = ResponseCache("memory", ttl_s=60, lock_timeout_s=5, max_entries=16)
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise LookupError("gone")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_compute("bad", {}, ("t",), fail) for _ in range(3)), return_exceptions=True,
+        )
+
+    assert all(isinstance(r, LookupError) for r in asyncio.run(scenario()))
+    assert asyncio.run(cache.get_or_compute("bad", {}, ("t",), _value(1))) == (b"1", False)
+
+
+def test_memory_backend_is_bounded():
+    backend = MemoryBackend(max_entries=2)
+
+    async def scenario():
+        for key in ("a", "b", "c"):
+            await backend.set(key, key.encode(), ttl_s=60)
+        return [await backend.get(k) for k in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [None, b"b", b"c"]
@@ -0,0 +1,60 @@
+"""
+Tests for fingerprinted, precompressed static assets.
+"""
+import gzip
+import os
+import re
+
+from app.services.static_assets import IMMUTABLE, REVALIDATE, StaticAssets, static_assets
+
+
+def test_fingerprinted_url_is_immutable_and_compressed(client):
+    url = static_assets.url("js/charts.js")
+    assert re.fullmatch(r"/static/js/charts\.[0-9a-f]{12}\.js", url)
+
+    res = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["cache-control"] == IMMUTABLE
+    assert res.headers["content-encoding"] == "gzip"
+    assert res.headers["vary"] == "Accept-Encoding"
+    assert "javascript" in res.headers["content-type"]
+    assert res.content == (static_assets.directory / "js/charts.js").read_bytes()
+
+
+def test_plain_and_stale_paths_revalidate(client):
+    res = client.get("/static/css/main.css", headers={"Accept-Encoding": "identity"})
+    assert res.status_code == 200
+    assert res.headers["cache-control"] == REVALIDATE
+    assert "content-encoding" not in res.headers
+
+    again = client.get("/static/css/main.css", headers={"If-None-Match": res.headers["etag"]})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    stale = client.get("/static/css/main.000000000000.css")
+    assert stale.status_code == 200
+    assert stale.headers["cache-control"] == REVALIDATE
+
+    assert client.get("/static/css/missing.css").status_code == 404
+    assert client.get("/static/../main.py").status_code == 404
+
+
+def test_pages_link_fingerprinted_assets(client):
+    html = client.get("/compare").text
+    for path in ("css/main.css", "js/charts.js", "js/compare.js", "js/telemetry_worker.js"):
+        assert static_assets.url(path) in html
+    assert not re.search(r'"/static/[\w/]+\.(js|css)"', html)
+
+
+def test_reload_picks_up_changed_files(tmp_path):
+    asset = tmp_path / "app.js"
+    asset.write_text("let a = 1;\n" * 100)
+    assets = StaticAssets(tmp_path, reload=True)
+    before = assets.url("app.js")
+    assert gzip.decompress(assets.get("app.js").gzip) == asset.read_bytes()
+
+    # Coarse filesystem clocks can leave the mtime unchanged by a quick rewrite
+    mtime_ns = asset.stat().st_mtime_ns
+    asset.write_text("let b = 2;\n" * 100)
+    os.utime(asset, ns=(mtime_ns, mtime_ns + 1_000_000))
+    assert assets.url("app.js") != before
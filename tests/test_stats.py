@@ -0,0 +1,132 @@
+"""
+Tests for the maintained dashboard counters.
+"""
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+from app.config import get_settings
+from app.models.lap import Lap
+from app.models.session import Session
+from app.models.stats import StatsCounter
+from app.models.user import User
+from app.services import stats
+from tests.conftest import make_user, auth, seed_track_config
+
+
+def _exact(db):
+    return {name: db.scalar(query) for name, query in stats._EXACT.items()}
+
+
+def _counted(db):
+    snapshot = stats.snapshot(db)
+    return {name: snapshot[name] for name in stats._EXACT}
+
+
+def _new_session(client, token, config_id, **fields):
+    res = client.post("/api/v1/sessions/", json={
+        "track_configuration_id": config_id, "date": "2025-09-01T08:00:00Z", **fields,
+    }, headers=auth(token))
+    assert res.status_code == 201
+    return res.json()["id"]
+
+
+def test_counters_follow_inserts_updates_and_cascades(client, db):
+    config_id = seed_track_config(db)
+    token = make_user(client, "stats_driver")
+    before = _counted(db)
+    assert before == _exact(db)
+
+    public_id = _new_session(client, token, config_id, is_public=True)
+    private_id = _new_session(client, token, config_id)
+    for n in (1, 2, 3):
+        client.post("/api/v1/laps/", json={"session_id": private_id, "lap_number": n}, headers=auth(token))
+    client.patch(f"/api/v1/sessions/{private_id}", json={"is_public": True}, headers=auth(token))
+    client.patch(f"/api/v1/sessions/{public_id}", json={"is_public": False}, headers=auth(token))
+    # Deleting the session cascades to its laps through the ORM
+    assert client.delete(f"/api/v1/sessions/{private_id}", headers=auth(token)).status_code == 204
+
+    after = _counted(db)
+    assert after == _exact(db)
+    assert after["users"] == before["users"]
+    assert after["sessions"] == before["sessions"] + 1
+    assert after["laps"] == before["laps"]
+    assert after["public_sessions"] == before["public_sessions"]
+
+
+def test_rolled_back_changes_are_not_counted(db):
+    before = _counted(db)
+    db.add(User(username="stats_ghost", email="stats_ghost@example.com"))
+    db.flush()
+    assert _counted(db)["users"] == before["users"] + 1
+    db.rollback()
+    assert _counted(db) == before
+
+
+def test_dashboard(client, db):
+    token = make_user(client, "stats_admin")
+    db.query(User).filter(User.username == "stats_admin").update({User.is_superuser: True})
+    db.commit()
+
+    body = client.get("/api/v1/admin/dashboard", headers=auth(token)).json()
+    assert {k: body[k] for k in stats._EXACT} == _exact(db)
+    assert body["estimated"] == []
+    assert len(body["uploads_per_day"]) == 30
+    assert body["uploads_per_day"][-1]["day"] == datetime.now(timezone.utc).date().isoformat()
+
+
+def test_upload_records_bytes_and_day(client, db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "upload_dir", str(tmp_path))
+    config_id = seed_track_config(db)
+    token = make_user(client, "stats_uploader")
+    lap = Lap(session_id=_new_session(client, token, config_id), lap_number=1)
+    db.add(lap)
+    db.commit()
+    before = stats.snapshot(db)
+
+    payload = b"Time,Speed\n0,0\n"
+    res = client.post(f"/api/v1/laps/{lap.id}/upload", files={"file": ("lap.csv", io.BytesIO(payload), "text/csv")},
+                      headers=auth(token))
+    assert res.status_code == 200
+
+    after = stats.snapshot(db)
+    assert after["storage_bytes"] - before["storage_bytes"] == len(payload)
+    assert after["uploads_per_day"][-1]["uploads"] - before["uploads_per_day"][-1]["uploads"] == 1
+
+
+def test_missing_counter_falls_back_and_recount_repairs(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "upload_dir", str(tmp_path))
+    (tmp_path / "sessions" / "1" / "lod").mkdir(parents=True)
+    (tmp_path / "sessions" / "1" / "a.csv").write_bytes(b"x" * 10)
+    (tmp_path / "sessions" / "1" / "lod" / "level0.bin").write_bytes(b"x" * 99)
+
+    db.query(StatsCounter).filter(StatsCounter.name == stats.EVENTS).delete()
+    db.query(StatsCounter).filter(StatsCounter.name == stats.LAPS).update({StatsCounter.value: 12345})
+    # SQLite has no planner estimates; a missing counter is counted exactly
+    assert stats.snapshot(db)[stats.EVENTS] == _exact(db)[stats.EVENTS]
+    assert _counted(db)[stats.LAPS] != _exact(db)[stats.LAPS]
+
+    totals = stats.recount(db)
+    db.commit()
+    assert _counted(db) == _exact(db)
+    assert totals[stats.STORAGE_BYTES] == 10
+    assert db.query(StatsCounter).filter(StatsCounter.name == stats.LAPS).count() == 1
+
+
+@pytest.mark.parametrize("is_public", [True, False])
+def test_direct_orm_deletes_are_counted(db, is_public):
+    config_id = seed_track_config(db)
+    user = User(username=f"stats_orm_{is_public}", email=f"stats_orm_{is_public}@example.com")
+    db.add(user)
+    db.flush()
+    session = Session(user_id=user.id, track_configuration_id=config_id, is_public=is_public,
+                      date=datetime(2025, 9, 1, tzinfo=timezone.utc))
+    session.laps = [Lap(lap_number=1), Lap(lap_number=2)]
+    db.add(session)
+    db.commit()
+    assert _counted(db) == _exact(db)
+
+    db.delete(session)
+    db.commit()
+    assert _counted(db) == _exact(db)
@@ -0,0 +1,61 @@
+"""
+Tests for the compact GPS track encoding.
+"""
+import json
+
+import pytest
+
+from app.services.telemetry.track_codec import decode_levels, decode_track, encode_levels, encode_track
+
+
+def _track(n=2500):
+    return [[round(i * 0.04, 4), 4.6 + i * 1e-6, -74.08 - i * 2e-6, 2600.0 + (i % 7) * 0.1] for i in range(n)]
+
+
+def test_round_trip_within_quantisation():
+    points = _track()
+    decoded = decode_track(encode_track(points))
+    assert len(decoded) == len(points)
+    for a, b in zip(points, decoded):
+        assert b[0] == pytest.approx(a[0], abs=1e-4)
+        assert b[1] == pytest.approx(a[1], abs=1e-6)
+        assert b[2] == pytest.approx(a[2], abs=1e-6)
+        assert b[3] == pytest.approx(a[3], abs=1e-2)
+
+
+def test_much_smaller_than_json():
+    points = _track()
+    assert len(encode_track(points)) * 10 < len(json.dumps(points))
+
+
+def test_empty_and_short_points():
+    assert decode_track(encode_track([])) == []
+    # Points without altitude are padded with 0
+    assert decode_track(encode_track([[0.0, 1.0, 2.0]])) == [[0.0, 1.0, 2.0, 0.0]]
+
+
+def test_levels_round_trip():
+    levels = {"1": _track(50), "16": _track(3)}
+    decoded = decode_levels(encode_levels(levels))
+    assert list(decoded) == ["1", "16"]
+    assert [len(v) for v in decoded.values()] == [50, 3]
+
+
+def test_lap_track_loads_full_points_only_on_demand(db):
+    from sqlalchemy import inspect
+
+    from app.models.lap import Lap
+    from app.services.telemetry.geometry import simplify_levels
+
+    points = _track()
+    lap = Lap(session_id=1, lap_number=1, gps_track=points, gps_simplified=simplify_levels(points))
+    db.add(lap)
+    db.commit()
+    lap_id = lap.id
+    db.expunge_all()
+
+    lap = db.get(Lap, lap_id)
+    assert len(lap.gps_track_for(4.0)) < len(points)
+    assert "points" in inspect(lap.track).unloaded
+    assert len(lap.gps_track) == len(points)
+    assert lap.track.point_count == len(points)